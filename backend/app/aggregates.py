@@ -0,0 +1,111 @@
+# backend/app/aggregates.py
+"""
+Rebuild and verify the incrementally maintained summary tables.
+
+    python -m app.aggregates verify    # report drift, exit 1 if any
+    python -m app.aggregates rebuild   # recompute both tables from scratch
+"""
+import argparse
+import sys
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from . import cache, models
+from .database import SessionLocal, run_migrations
+
+def compute_category_stock(db: Session) -> Dict[Tuple, Tuple[int, int]]:
+    """Recompute `(total_quantity, item_count)` per category from the items table."""
+    rows = (
+        db.query(models.InventoryItem.category, func.coalesce(func.sum(models.InventoryItem.quantity), 0), func.count(models.InventoryItem.id))
+        .filter(models.InventoryItem.category.isnot(None))
+        .group_by(models.InventoryItem.category)
+        .all()
+    )
+    return {(category,): (int(total), int(count)) for category, total, count in rows}
+
+def compute_daily_shipment_totals(db: Session) -> Dict[Tuple, Tuple[int, int]]:
+    """
+    Recompute `(total_quantity, shipment_count)` per delivery date and status
+    from the shipments table and its archive, which the summary keeps counting.
+    """
+    totals: Dict[Tuple, Tuple[int, int]] = {}
+    for model in (models.Shipment, models.ShipmentArchive):
+        status = func.coalesce(model.status, "")
+        rows = (
+            db.query(model.estimated_delivery_date, status, func.coalesce(func.sum(model.quantity), 0), func.count(model.id))
+            .filter(model.estimated_delivery_date.isnot(None))
+            .group_by(model.estimated_delivery_date, status)
+            .all()
+        )
+        for delivery_date, row_status, total, count in rows:
+            previous_total, previous_count = totals.get((delivery_date, row_status), (0, 0))
+            totals[(delivery_date, row_status)] = (previous_total + int(total), previous_count + int(count))
+    return totals
+
+def _stored_category_stock(db: Session) -> Dict[Tuple, Tuple[int, int]]:
+    rows = db.query(models.CategoryStock).filter(models.CategoryStock.item_count != 0).all()
+    return {(row.category,): (row.total_quantity, row.item_count) for row in rows}
+
+def _stored_daily_shipment_totals(db: Session) -> Dict[Tuple, Tuple[int, int]]:
+    rows = db.query(models.DailyShipmentTotal).filter(models.DailyShipmentTotal.shipment_count != 0).all()
+    return {(row.delivery_date, row.status): (row.total_quantity, row.shipment_count) for row in rows}
+
+def _diff(table: str, expected: Dict, stored: Dict) -> List[str]:
+    return [
+        f"{table}{list(key)}: stored={stored.get(key)} expected={expected.get(key)}"
+        for key in sorted(set(expected) | set(stored), key=str)
+        if expected.get(key) != stored.get(key)
+    ]
+
+def verify(db: Session) -> List[str]:
+    """Return a description of every summary row that disagrees with the base tables."""
+    return (
+        _diff("category_stock", compute_category_stock(db), _stored_category_stock(db))
+        + _diff("daily_shipment_totals", compute_daily_shipment_totals(db), _stored_daily_shipment_totals(db))
+    )
+
+def rebuild(db: Session):
+    """Replace both summary tables with totals recomputed from the base tables."""
+    db.query(models.CategoryStock).delete()
+    db.query(models.DailyShipmentTotal).delete()
+    db.add_all(
+        models.CategoryStock(category=category, total_quantity=total, item_count=count)
+        for (category,), (total, count) in compute_category_stock(db).items()
+    )
+    db.add_all(
+        models.DailyShipmentTotal(delivery_date=delivery_date, status=status, total_quantity=total, shipment_count=count)
+        for (delivery_date, status), (total, count) in compute_daily_shipment_totals(db).items()
+    )
+    db.commit()
+    cache.invalidate(cache.ANALYTICS)
+
+def ensure_built(db: Session):
+    """Build the summary tables once for a database created before they existed."""
+    summaries_empty = db.query(models.CategoryStock).first() is None and db.query(models.DailyShipmentTotal).first() is None
+    if summaries_empty and (db.query(models.InventoryItem.id).first() or db.query(models.Shipment.id).first()):
+        rebuild(db)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify the analytics summary tables.")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    args = parser.parse_args(argv)
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            rebuild(db)
+            print("Summary tables rebuilt.")
+            return 0
+        drift = verify(db)
+        for line in drift:
+            print(line)
+        print(f"{len(drift)} drifted summary row(s).")
+        return 1 if drift else 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
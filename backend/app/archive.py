@@ -0,0 +1,94 @@
+# backend/app/archive.py
+"""
+Move old delivered shipments out of the live shipments table.
+
+    python -m app.archive                          # Delivered shipments older than ARCHIVE_AFTER_DAYS (90)
+    python -m app.archive --older-than-days 30 --dry-run
+
+Rows move to shipments_archive with their original ids, one batch per
+transaction, so the job can run next to live traffic. The daily summary keeps
+counting archived shipments, and list/export endpoints read the archive only
+when asked for a window that reaches back into it. On PostgreSQL the job also
+creates the coming months' partitions, so run it regularly (e.g. nightly from cron).
+"""
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from . import cache, crud, events, models, partitions
+from .database import SessionLocal, run_migrations
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 90))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 5000))
+
+# Columns copied as-is; archived_at is filled in by the archive table.
+_COLUMNS = [column.key for column in models.Shipment.__table__.columns]
+
+def _candidates(db: Session, cutoff: date):
+    return db.query(models.Shipment.id).filter(
+        models.Shipment.status.in_(crud.ARCHIVED_STATUSES),
+        models.Shipment.estimated_delivery_date < cutoff,
+    )
+
+def count_archivable(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS, today: Optional[date] = None) -> int:
+    """Count the shipments `archive_shipments` would move."""
+    cutoff = (today or date.today()) - timedelta(days=older_than_days)
+    return _candidates(db, cutoff).count()
+
+def archive_shipments(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE,
+                      today: Optional[date] = None) -> int:
+    """
+    Move delivered shipments whose delivery date is more than `older_than_days`
+    ago into the archive; returns the number moved. Ledger rows and the daily
+    summary are left alone: the shipments' stock effect is already final.
+    """
+    cutoff = (today or date.today()) - timedelta(days=older_than_days)
+    delivery_date = models.Shipment.estimated_delivery_date
+    oldest, newest = _candidates(db, cutoff).with_entities(func.min(delivery_date), func.max(delivery_date)).one()
+    partitions.ensure_monthly_partitions(db, "shipments_archive", oldest, newest)
+    db.commit()
+
+    moved = 0
+    while True:
+        # Rows being edited are skipped (PostgreSQL) and picked up by the next run.
+        ids = [shipment_id for (shipment_id,) in
+               _candidates(db, cutoff).order_by(models.Shipment.id).limit(batch_size).with_for_update(skip_locked=True)]
+        if not ids:
+            break
+        source = select(*[models.Shipment.__table__.c[key] for key in _COLUMNS]).where(models.Shipment.id.in_(ids))
+        db.execute(insert(models.ShipmentArchive).from_select(_COLUMNS, source))
+        db.execute(delete(models.Shipment).where(models.Shipment.id.in_(ids)))
+        events.emit(db, "shipment.archived", count=len(ids), first_id=ids[0], last_id=ids[-1])
+        db.commit()
+        moved += len(ids)
+    if moved:
+        cache.invalidate(cache.SHIPMENTS)
+    return moved
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Archive old delivered shipments.")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many shipments would move.")
+    args = parser.parse_args(argv)
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            print(f"{count_archivable(db, args.older_than_days)} shipment(s) would be archived.")
+            return 0
+        partitions.ensure_upcoming_partitions(db)
+        db.commit()
+        print(f"{archive_shipments(db, args.older_than_days, args.batch_size)} shipment(s) archived.")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# backend/app/async_crud.py
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from . import models
+from .crud import (
+    ARCHIVED_STATUSES, ITEM_SORT_KEYS, SHIPMENT_SORT_KEYS, SUPPLIER_SORT_KEYS, ArchivePart, _archive_union, _filter_daily_totals,
+    _item_options, _merge_alerts, _next_page, _order_by_sort, _seek, _shipment_options, _stock_alert_columns, _stockout_criteria,
+)
+
+# Async counterparts of the read and analytics queries in crud.py, used when
+# ASYNC_DATABASE is enabled. Writes stay on the sync session.
+
+# --- List Queries ---
+# Row mode only: list endpoints select flat `rows` (a `projections.RowQuery`) and encode them without ORM objects.
+
+async def count_rows(db: AsyncSession, model, criteria: Iterable = ()) -> int:
+    """Count the rows of a table matching `criteria` without joining any relationships."""
+    result = await db.execute(select(func.count(model.id)).where(*criteria))
+    return result.scalar()
+
+async def _offset_page(db: AsyncSession, statement, id_column, sort_keys: Dict, sort: str, skip: int, limit: int) -> List:
+    result = await db.execute(_order_by_sort(statement, id_column, sort_keys, sort).offset(skip).limit(limit))
+    return result.all()
+
+async def _keyset_page(db: AsyncSession, statement, id_column, sort_keys: Dict, sort: str, cursor: Optional[str], limit: int) -> Tuple[List, Optional[str]]:
+    """Async counterpart of `crud._keyset_page`: one page after `cursor`, and the cursor for the next."""
+    column, statement = _seek(statement, id_column, sort_keys, sort, cursor)
+    result = await db.execute(_order_by_sort(statement, id_column, sort_keys, sort).limit(limit + 1))
+    return _next_page(result.all(), column, limit)
+
+# --- Inventory Item Queries ---
+
+async def get_items(db: AsyncSession, rows, skip: int = 0, limit: int = 100, sort: str = "id", criteria: Iterable = ()) -> List:
+    """Retrieve one offset page of inventory items as flat `rows`."""
+    return await _offset_page(db, rows.select().where(*criteria), models.InventoryItem.id, ITEM_SORT_KEYS, sort, skip, limit)
+
+async def get_items_keyset(db: AsyncSession, rows, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", criteria: Iterable = ()):
+    """Retrieve one keyset page of inventory items as flat `rows`, and the cursor for the next page."""
+    return await _keyset_page(db, rows.select().where(*criteria), models.InventoryItem.id, ITEM_SORT_KEYS, sort, cursor, limit)
+
+async def get_item(db: AsyncSession, item_id: int, options: Optional[list] = None):
+    """Retrieve a single inventory item by ID with eager loading, or with the given loader `options`."""
+    result = await db.execute(
+        select(models.InventoryItem).options(*_item_options(options)).where(models.InventoryItem.id == item_id)
+    )
+    return result.scalars().first()
+
+# --- Supplier Queries ---
+
+async def get_supplier(db: AsyncSession, supplier_id: int, options: Optional[list] = None):
+    """Retrieve a single supplier by ID."""
+    result = await db.execute(select(models.Supplier).options(*(options or [])).where(models.Supplier.id == supplier_id))
+    return result.scalars().first()
+
+async def get_suppliers(db: AsyncSession, rows, skip: int = 0, limit: int = 100, sort: str = "id", criteria: Iterable = ()) -> List:
+    """Retrieve one offset page of suppliers as flat `rows`."""
+    return await _offset_page(db, rows.select().where(*criteria), models.Supplier.id, SUPPLIER_SORT_KEYS, sort, skip, limit)
+
+async def get_suppliers_keyset(db: AsyncSession, rows, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", criteria: Iterable = ()):
+    """Retrieve one keyset page of suppliers as flat `rows`, and the cursor for the next page."""
+    return await _keyset_page(db, rows.select().where(*criteria), models.Supplier.id, SUPPLIER_SORT_KEYS, sort, cursor, limit)
+
+# --- Shipment Queries ---
+
+async def archive_needed(db: AsyncSession, start_date: Optional[date] = None, status: Optional[str] = None, include_archived: bool = False) -> bool:
+    """Whether a shipment read must include the archive; see `crud.archive_needed`."""
+    if status is not None and status not in ARCHIVED_STATUSES:
+        return False
+    if include_archived:
+        return True
+    if start_date is None:
+        return False
+    result = await db.execute(select(func.max(models.ShipmentArchive.estimated_delivery_date)))
+    newest = result.scalar()
+    return newest is not None and start_date <= newest
+
+def _shipment_list_statement(rows, criteria: Iterable, archive: Optional[ArchivePart]):
+    if archive is not None:
+        combined, sort_keys = _archive_union(rows, criteria, archive, SHIPMENT_SORT_KEYS)
+        return select(*combined.c), combined.c.id, sort_keys
+    return rows.select().where(*criteria), models.Shipment.id, SHIPMENT_SORT_KEYS
+
+async def get_shipments(db: AsyncSession, rows, skip: int = 0, limit: int = 100, sort: str = "id", criteria: Iterable = (),
+                        archive: Optional[ArchivePart] = None) -> List:
+    """Retrieve one offset page of shipments as flat `rows`, with the `archive` rows too when given."""
+    statement, id_column, sort_keys = _shipment_list_statement(rows, criteria, archive)
+    return await _offset_page(db, statement, id_column, sort_keys, sort, skip, limit)
+
+async def get_shipments_keyset(db: AsyncSession, rows, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", criteria: Iterable = (),
+                               archive: Optional[ArchivePart] = None):
+    """Retrieve one keyset page of shipments (and any `archive` rows) as flat `rows`, and the cursor for the next page."""
+    statement, id_column, sort_keys = _shipment_list_statement(rows, criteria, archive)
+    return await _keyset_page(db, statement, id_column, sort_keys, sort, cursor, limit)
+
+async def get_shipment(db: AsyncSession, shipment_id: int, options: Optional[list] = None):
+    """Retrieve a single shipment by ID with eager loading, or with the given loader `options`."""
+    result = await db.execute(
+        select(models.Shipment).options(*_shipment_options(options)).where(models.Shipment.id == shipment_id)
+    )
+    return result.scalars().first()
+
+# --- Analytics Queries ---
+
+async def get_stock_by_category(db: AsyncSession) -> Dict[str, int]:
+    """Total stock per category, read from the incrementally maintained summary table."""
+    result = await db.execute(
+        select(models.CategoryStock.category, models.CategoryStock.total_quantity)
+        .where(models.CategoryStock.item_count > 0)
+    )
+    return {category: int(total) for category, total in result.all()}
+
+async def get_daily_shipments(db: AsyncSession, start_date: Optional[date] = None, end_date: Optional[date] = None, status: Optional[str] = None) -> Dict[str, int]:
+    """Total shipped quantity per estimated delivery date, read from the daily summary table."""
+    query = (
+        select(models.DailyShipmentTotal.delivery_date, func.sum(models.DailyShipmentTotal.total_quantity))
+        .where(models.DailyShipmentTotal.shipment_count > 0)
+    )
+    query = _filter_daily_totals(query, start_date, end_date, status)
+    result = await db.execute(query.group_by(models.DailyShipmentTotal.delivery_date).order_by(models.DailyShipmentTotal.delivery_date))
+    return {delivery_date.isoformat(): int(total) for delivery_date, total in result.all()}
+
+def _alert_select(rows):
+    if rows is not None:
+        return rows.select()
+    return select(models.InventoryItem).options(joinedload(models.InventoryItem.supplier))
+
+async def get_low_stock_items(db: AsyncSession, threshold: int = 10, rows=None):
+    """
+    Retrieve items whose quantity is below the given threshold, followed by their
+    forecast columns, as (item, ...) tuples or flat `rows`.
+    """
+    result = await db.execute(
+        _alert_select(rows)
+        .outerjoin(models.ItemForecast, models.ItemForecast.item_id == models.InventoryItem.id)
+        .add_columns(*_stock_alert_columns())
+        .where(models.InventoryItem.quantity < threshold)
+    )
+    return result.all()
+
+async def has_forecasts(db: AsyncSession) -> bool:
+    """Whether `python -m app.forecasting` has fitted any demand rates yet."""
+    result = await db.execute(select(models.ItemForecast.item_id).limit(1))
+    return result.first() is not None
+
+async def get_stockout_alerts(db: AsyncSession, days: int, limit: int = 100, rows=None, threshold: Optional[int] = None):
+    """
+    Retrieve items whose forecast demand uses up their stock within `days`, plus
+    items without a usable forecast below `threshold` (LOW_STOCK_THRESHOLD by
+    default), fewest days of cover first, as (item, ...) tuples or flat `rows`.
+    """
+    forecast = models.ItemForecast
+    groups = []
+    for criteria, order, tiebreak in _stockout_criteria(days, threshold):
+        result = await db.execute(
+            _alert_select(rows)
+            .outerjoin(forecast, forecast.item_id == models.InventoryItem.id)
+            .add_columns(*_stock_alert_columns(), order.label("alert_order"))
+            .where(*criteria)
+            .order_by(order, tiebreak)
+            .limit(limit)
+        )
+        groups.append(result.all())
+    return _merge_alerts(groups, limit)
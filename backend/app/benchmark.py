@@ -0,0 +1,383 @@
+# backend/app/benchmark.py
+"""
+Benchmark every endpoint in main.py at fixed concurrency and record p50/p95/p99
+latency, throughput and peak RSS as a JSON baseline.
+
+    python -m app.benchmark                                            # fresh SQLite dataset, in-process (ASGI)
+    python -m app.benchmark --mode both --concurrency 32 --output benchmarks/baseline.json
+    python -m app.benchmark --database-url postgresql://localhost/bench --compare benchmarks/baseline.json
+
+Without --database-url, a deterministic dataset is generated with app.datagen
+into a temporary SQLite file. `asgi` drives the app in this process through
+httpx's ASGI transport; `uvicorn` starts a server and drives it over HTTP.
+The response cache is disabled unless --cache is given, so query cost is what
+gets measured. With --compare, exits 1 when any scenario's p95 latency grew
+by more than --max-regression against the baseline.
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    # Builds (url, request kwargs) for one request; pool-backed scenarios pop a fresh id each time.
+    build: Callable[[random.Random], tuple]
+
+# --- Scenarios ---
+
+def _image_bytes(color) -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (320, 240), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+def _write_reference_images(directory: str):
+    """A tiny reference catalogue so /predict_image/ runs a real model instead of the no-model fallback."""
+    from PIL import Image
+
+    for label, color in [("Laptop", (200, 30, 30)), ("Mouse", (30, 200, 30)), ("Monitor", (20, 20, 220))]:
+        os.makedirs(os.path.join(directory, label), exist_ok=True)
+        Image.new("RGB", (64, 64), color).save(os.path.join(directory, label, "reference.png"))
+
+def scenarios(counts: Dict[str, int], pools: Dict[str, List[int]]) -> List[Scenario]:
+    """One scenario per endpoint (and per notable parameter combination) in main.py."""
+    items, suppliers, shipments, warehouses = counts["items"], counts["suppliers"], counts["shipments"], counts["warehouses"]
+    today = date.today()
+    image = _image_bytes((30, 190, 40))
+    run, serial = time.time_ns(), itertools.count()
+
+    def item_id(rng):
+        return rng.randint(1, items)
+
+    def shipment_body(rng, status="Pending"):
+        return {"item_id": item_id(rng), "quantity": rng.randint(1, 5), "origin": "Pune", "destination": "Mumbai",
+                "status": status, "estimated_delivery_date": str(today + timedelta(days=rng.randint(1, 30)))}
+
+    def item_body(rng):
+        return {"name": f"Bench Item {rng.randint(1, 10**9)}", "quantity": rng.randint(0, 200), "category": "Hardware",
+                "price": round(rng.uniform(1, 100), 2), "supplier_id": rng.randint(1, suppliers)}
+
+    def supplier_body(rng):
+        # Supplier names are unique, so they must not repeat across runs against the same database.
+        suffix = f"{run}-{next(serial)}"
+        return {"name": f"Bench Supplier {suffix}", "email": f"bench{suffix}@example.com"}
+
+    def pooled(name):
+        return lambda: pools[name].pop()
+
+    next_supplier, next_item, next_shipment = pooled("suppliers"), pooled("items"), pooled("shipments")
+    replayed_shipment = shipment_body(random.Random(run))
+
+    return [
+        Scenario("root", "GET", lambda rng: ("/", {})),
+        Scenario("health_db", "GET", lambda rng: ("/health/db", {})),
+        Scenario("metrics", "GET", lambda rng: ("/metrics", {})),
+        # Inventory
+        Scenario("list_items", "GET", lambda rng: ("/items/", {"params": {"skip": rng.randint(0, max(items - 100, 0)), "limit": 100}})),
+        Scenario("list_items_keyset", "GET", lambda rng: ("/items/", {"params": {"cursor": "", "limit": 100, "sort": "name", "include_total": True}})),
+        Scenario("list_items_projection", "GET", lambda rng: ("/items/", {"params": {"fields": "id,name,quantity", "limit": 100}})),
+        Scenario("list_items_search", "GET", lambda rng: ("/items/", {"params": {"q": rng.choice(["monitor", "drill", "coffee", "vest"]), "limit": 20}})),
+        Scenario("list_items_filters", "GET", lambda rng: ("/items/", {"params": {"category": "Hardware", "max_quantity": 10, "limit": 100}})),
+        Scenario("get_item", "GET", lambda rng: (f"/items/{item_id(rng)}", {})),
+        Scenario("create_item", "POST", lambda rng: ("/items/", {"json": item_body(rng)})),
+        Scenario("bulk_create_items", "POST", lambda rng: ("/items/bulk", {"json": [item_body(rng) for _ in range(50)]})),
+        Scenario("update_item", "PUT", lambda rng: (f"/items/{next_item()}", {"json": item_body(rng)})),
+        Scenario("list_stock_movements", "GET", lambda rng: (f"/items/{item_id(rng)}/stock_movements", {})),
+        Scenario("create_stock_movement", "POST", lambda rng: (f"/items/{item_id(rng)}/stock_movements", {"json": {"quantity_delta": rng.randint(1, 5), "reason": "received"}})),
+        Scenario("delete_item", "DELETE", lambda rng: (f"/items/{next_item()}", {})),
+        # Suppliers
+        Scenario("list_suppliers", "GET", lambda rng: ("/suppliers/", {"params": {"limit": 100}})),
+        Scenario("list_suppliers_search", "GET", lambda rng: ("/suppliers/", {"params": {"q": rng.choice(["summit", "atlas", "harbor"]), "limit": 20}})),
+        Scenario("get_supplier", "GET", lambda rng: (f"/suppliers/{rng.randint(1, suppliers)}", {})),
+        Scenario("create_supplier", "POST", lambda rng: ("/suppliers/", {"json": supplier_body(rng)})),
+        Scenario("bulk_create_suppliers", "POST", lambda rng: ("/suppliers/bulk", {"json": [supplier_body(rng) for _ in range(50)]})),
+        Scenario("update_supplier", "PUT", lambda rng: (f"/suppliers/{next_supplier()}", {"json": supplier_body(rng)})),
+        Scenario("delete_supplier", "DELETE", lambda rng: (f"/suppliers/{next_supplier()}", {})),
+        # Shipments
+        Scenario("list_shipments", "GET", lambda rng: ("/shipments/", {"params": {"skip": rng.randint(0, max(shipments - 100, 0)), "limit": 100}})),
+        Scenario("list_shipments_keyset", "GET", lambda rng: ("/shipments/", {"params": {"cursor": "", "limit": 100, "sort": "-estimated_delivery_date"}})),
+        Scenario("list_shipments_expand", "GET", lambda rng: ("/shipments/", {"params": {"expand": "item", "fields": "id,status,item.name", "limit": 100}})),
+        Scenario("list_shipments_filters", "GET", lambda rng: ("/shipments/", {"params": {"status": "Delayed", "start_date": str(today - timedelta(days=30)), "end_date": str(today), "limit": 100}})),
+        Scenario("list_shipments_archive_window", "GET", lambda rng: ("/shipments/", {"params": {"start_date": str(today - timedelta(days=300)), "end_date": str(today - timedelta(days=200)), "limit": 100}})),
+        Scenario("get_shipment", "GET", lambda rng: (f"/shipments/{rng.randint(1, shipments)}", {})),
+        Scenario("create_shipment", "POST", lambda rng: ("/shipments/", {"json": shipment_body(rng)})),
+        Scenario("create_shipment_idempotent", "POST", lambda rng: ("/shipments/", {"json": shipment_body(rng), "headers": {"Idempotency-Key": f"bench-{run}-{next(serial)}"}})),
+        # Every request after the first replays the stored response.
+        Scenario("create_shipment_retry", "POST", lambda rng: ("/shipments/", {"json": replayed_shipment, "headers": {"Idempotency-Key": f"bench-retry-{run}"}})),
+        Scenario("bulk_create_shipments", "POST", lambda rng: ("/shipments/bulk", {"json": [shipment_body(rng) for _ in range(50)]})),
+        Scenario("update_shipment", "PUT", lambda rng: (f"/shipments/{next_shipment()}", {"json": shipment_body(rng)})),
+        Scenario("delete_shipment", "DELETE", lambda rng: (f"/shipments/{next_shipment()}", {})),
+        # Warehouses
+        Scenario("list_warehouses", "GET", lambda rng: ("/warehouses/", {})),
+        Scenario("list_warehouse_items", "GET", lambda rng: (f"/warehouses/{rng.randint(1, warehouses)}/items", {"params": {"skip": rng.randint(0, 1000), "limit": 100}})),
+        Scenario("list_warehouse_items_low", "GET", lambda rng: (f"/warehouses/{rng.randint(1, warehouses)}/items", {"params": {"max_quantity": 5, "limit": 100}})),
+        Scenario("list_warehouse_shipments", "GET", lambda rng: (f"/warehouses/{rng.randint(1, warehouses)}/shipments", {"params": {"limit": 100}})),
+        # Export (bounded so each request streams a realistic slice, not the whole table)
+        Scenario("export_items_csv", "GET", lambda rng: ("/export/items", {"params": {"format": "csv", "supplier_id": rng.randint(1, suppliers)}})),
+        Scenario("export_shipments_ndjson", "GET", lambda rng: ("/export/shipments", {"params": {"start_date": str(today), "end_date": str(today), "include_relations": True}})),
+        # No worker runs during the benchmark, so this measures queueing only.
+        Scenario("submit_export_job", "POST", lambda rng: ("/jobs/", {"json": {"kind": "export.items", "params": {"supplier_id": rng.randint(1, suppliers)}}})),
+        Scenario("read_jobs", "GET", lambda rng: ("/jobs/", {"params": {"status": "queued", "limit": 20}})),
+        # AI & analytics
+        Scenario("predict_image", "POST", lambda rng: ("/predict_image/", {"files": {"file": ("bench.jpg", image, "image/jpeg")}})),
+        Scenario("predict_image_batch", "POST", lambda rng: ("/predict_image/batch", {"files": [("files", (f"bench{i}.jpg", image, "image/jpeg")) for i in range(8)]})),
+        Scenario("low_stock_alerts", "GET", lambda rng: ("/analytics/low_stock_alerts/", {"params": {"days": 14}})),
+        Scenario("low_stock_alerts_threshold", "GET", lambda rng: ("/analytics/low_stock_alerts/", {"params": {"threshold": 5}})),
+        Scenario("stock_by_category", "GET", lambda rng: ("/analytics/stock_by_category/", {})),
+        Scenario("daily_shipments", "GET", lambda rng: ("/analytics/daily_shipments/", {"params": {"start_date": str(today - timedelta(days=90))}})),
+    ]
+
+async def _create_pools(client: httpx.AsyncClient, size: int, counts: Dict[str, int]) -> Dict[str, List[int]]:
+    """Rows for update/delete scenarios, created up front so they never touch the generated dataset."""
+    tag = random.randint(1, 10**9)
+    suppliers = [{"name": f"Pool Supplier {tag}-{i}", "email": f"pool{tag}-{i}@example.com"} for i in range(size * 2)]
+    items = [{"name": f"Pool Item {i}", "quantity": 0, "category": "Hardware", "price": 1.0} for i in range(size * 2)]
+    pools = {}
+    for name, path, rows in [("suppliers", "/suppliers/bulk", suppliers), ("items", "/items/bulk", items)]:
+        response = await client.post(path, json=rows)
+        response.raise_for_status()
+        pools[name] = [new_id for new_id in response.json()["ids"] if new_id is not None]
+    shipments = [
+        {"item_id": random.randint(1, counts["items"]), "quantity": 1, "origin": "Pune", "destination": "Mumbai",
+         "status": "Pending", "estimated_delivery_date": str(date.today())}
+        for _ in range(size * 2)
+    ]
+    response = await client.post("/shipments/bulk", json=shipments)
+    response.raise_for_status()
+    pools["shipments"] = [new_id for new_id in response.json()["ids"] if new_id is not None]
+    return pools
+
+# --- Measurement ---
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def _peak_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Peak resident set size of `pid` (from /proc) or of this process."""
+    if pid is not None:
+        try:
+            with open(f"/proc/{pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            return None
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int, warmup: int, seed: int) -> Dict:
+    """Send `warmup` then `requests` requests at `concurrency` and summarise the measured ones."""
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        url, kwargs = scenario.build(rng)
+        await client.request(scenario.method, url, **kwargs)
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            url, kwargs = scenario.build(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, url, **kwargs)
+                await response.aread()
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(_percentile(latencies, 0.50), 2),
+        "p95_ms": round(_percentile(latencies, 0.95), 2),
+        "p99_ms": round(_percentile(latencies, 0.99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+    }
+
+async def run_all(client: httpx.AsyncClient, args, counts: Dict[str, int], rss: Callable[[], Optional[float]]) -> Dict:
+    per_scenario = args.warmup + args.requests
+    pools = await _create_pools(client, per_scenario, counts)
+    results = {}
+    for index, scenario in enumerate(scenarios(counts, pools)):
+        if args.only and not any(name in scenario.name for name in args.only):
+            continue
+        result = await run_scenario(client, scenario, args.requests, args.concurrency, args.warmup, args.seed + index)
+        result["peak_rss_mb"] = rss()
+        results[scenario.name] = result
+        print(f"  {scenario.name:<28} p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms"
+              f"  {result['throughput_rps']:>8.1f} req/s  errors {result['errors']}")
+    return results
+
+async def _run_asgi(args, counts):
+    # Imported here so the environment prepared by main() is in place before the app configures itself.
+    from .main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        return await run_all(client, args, counts, _peak_rss_mb)
+
+async def _run_uvicorn(args, counts, env):
+    port = args.port
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=env,
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            for _ in range(300):
+                try:
+                    if (await client.get("/health/ready")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            return await run_all(client, args, counts, lambda: _peak_rss_mb(server.pid))
+    finally:
+        server.terminate()
+        server.wait()
+
+# --- Baselines ---
+
+def compare(results: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """Describe every scenario whose p95 grew by more than `max_regression` (a fraction) over the baseline."""
+    regressions = []
+    for mode, scenarios_ in results.items():
+        for name, result in scenarios_.items():
+            previous = baseline.get("results", {}).get(mode, {}).get(name)
+            if not previous or not previous["p95_ms"]:
+                continue
+            ratio = result["p95_ms"] / previous["p95_ms"]
+            if ratio > 1 + max_regression:
+                regressions.append(f"{mode}/{name}: p95 {previous['p95_ms']} -> {result['p95_ms']} ms ({ratio:.2f}x)")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every API endpoint and record a JSON baseline.")
+    parser.add_argument("--database-url", help="Existing dataset to benchmark (written to by write scenarios). Defaults to a fresh generated SQLite file.")
+    parser.add_argument("--warehouses", type=int, default=5)
+    parser.add_argument("--suppliers", type=int, default=500)
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--shipments", type=int, default=200000)
+    parser.add_argument("--mode", choices=["asgi", "uvicorn", "both"], default="asgi")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="Run only scenarios whose name contains one of these strings.")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache enabled.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--compare", help="Baseline JSON to compare p95 latencies against.")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="warehouse-bench-")
+    url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    reference_dir = os.path.join(workdir, "reference_images")
+    _write_reference_images(reference_dir)
+    env = {
+        **os.environ,
+        "DATABASE_URL": url,
+        "CACHE_BACKEND": os.environ.get("CACHE_BACKEND", "memory") if args.cache else "none",
+        "INFERENCE_REFERENCE_DIR": reference_dir,
+    }
+    # The app reads its configuration at import time, so it must see the benchmark environment first.
+    os.environ.update(env)
+
+    from . import datagen
+
+    if args.database_url is None:
+        print(f"Generating {args.warehouses} warehouses, {args.suppliers} suppliers, {args.items} items, {args.shipments} shipments...")
+        datagen.load(url, args.suppliers, args.items, args.shipments, seed=args.seed, progress=lambda line: print(f"  {line}"),
+                     warehouses=args.warehouses)
+    counts = _table_counts(url)
+
+    results = {}
+    if args.mode in ("asgi", "both"):
+        print("ASGI (in-process):")
+        results["asgi"] = asyncio.run(_run_asgi(args, counts))
+    if args.mode in ("uvicorn", "both"):
+        print(f"uvicorn ({args.workers} worker(s)):")
+        results["uvicorn"] = asyncio.run(_run_uvicorn(args, counts, env))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": url.split(":", 1)[0],
+            "counts": counts,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "workers": args.workers,
+            "cache": args.cache,
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(regressions)} regression(s) beyond {args.max_regression:.0%}.")
+        return 1 if regressions else 0
+    return 0
+
+def _table_counts(url: str) -> Dict[str, int]:
+    from sqlalchemy import create_engine, func, select
+
+    from . import models
+
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            return {
+                name: conn.execute(select(func.count()).select_from(model)).scalar()
+                for name, model in [("suppliers", models.Supplier), ("items", models.InventoryItem), ("shipments", models.Shipment),
+                                    ("warehouses", models.Warehouse)]
+            }
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    sys.exit(main())
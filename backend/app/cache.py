@@ -0,0 +1,327 @@
+# backend/app/cache.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.exc import DBAPIError
+from starlette.concurrency import run_in_threadpool
+
+from . import instrumentation, models
+from .database import engine
+
+# Response cache for read endpoints. Entries are keyed by request URL plus the
+# current version of every namespace the response depends on; writes bump the
+# namespace version, which orphans stale entries without scanning for them.
+# Versions are shared by every process writing to the database: the memory
+# backend keeps them in the cache_versions table and the Redis backend in
+# Redis, so writes from other API workers, job workers and the CLIs
+# invalidate this worker's entries too. The memory backend reuses the table
+# it read for CACHE_VERSIONS_TTL_SECONDS, so a hit costs no round trip. If
+# the version store cannot be reached, requests bypass the cache rather than fail.
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # memory | redis | none
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 60))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+# Redis socket timeout, and how long to bypass Redis after it failed.
+CACHE_TIMEOUT_SECONDS = float(os.getenv("CACHE_TIMEOUT_SECONDS", 0.25))
+CACHE_RETRY_SECONDS = float(os.getenv("CACHE_RETRY_SECONDS", 5))
+# How long the memory backend reuses the cache_versions it read; other processes' writes show after at most this long.
+CACHE_VERSIONS_TTL_SECONDS = float(os.getenv("CACHE_VERSIONS_TTL_SECONDS", 1))
+
+# --- Namespaces ---
+# Each namespace has a row in cache_versions (migration 0011); a new one needs a migration adding its row.
+ITEMS = "items"
+SUPPLIERS = "suppliers"
+SHIPMENTS = "shipments"
+ANALYTICS = "analytics"
+WAREHOUSES = "warehouses"
+
+# Headers that list endpoints set and that must be replayed from the cache.
+_CACHED_HEADERS = ("X-Next-Cursor", "X-Total-Count")
+
+# --- Namespace Versions ---
+
+class LocalVersions:
+    """Namespace versions held in this process only; for a cache nothing else writes behind."""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def versions(self, namespaces: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(namespace, 0) for namespace in namespaces)
+
+    peek = versions
+
+    def bump(self, namespaces: Iterable[str]):
+        with self._lock:
+            for namespace in namespaces:
+                self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+class DatabaseVersions:
+    """
+    Namespace versions in the cache_versions table. The whole table (one row per
+    namespace) is read at most once per `ttl` seconds and reused in between.
+    """
+
+    def __init__(self, bind, ttl: float = CACHE_VERSIONS_TTL_SECONDS):
+        self.bind = bind
+        self.ttl = ttl
+        self.table = models.CacheVersion.__table__
+        self._current: Dict[str, int] = {}
+        self._read_at: Optional[float] = None
+        self._bumps = 0
+        self._lock = threading.Lock()
+
+    def peek(self, namespaces: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        """The versions read less than `ttl` ago, or None when they must be read again."""
+        with self._lock:
+            if self._read_at is None or time.monotonic() - self._read_at >= self.ttl:
+                return None
+            return tuple(self._current.get(namespace, 0) for namespace in namespaces)
+
+    def versions(self, namespaces: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        namespaces = tuple(namespaces)
+        known = self.peek(namespaces)
+        if known is not None:
+            return known
+        with self._lock:
+            read_at, bumps = time.monotonic(), self._bumps
+        try:
+            with self.bind.connect() as connection:
+                current = dict(connection.execute(select(self.table.c.namespace, self.table.c.version)).all())
+        except DBAPIError as e:
+            logger.warning("Cache versions unavailable, bypassing the cache: %s", e.orig)
+            return None
+        with self._lock:
+            # A read that overlapped a bump here may predate it; keep it for this request only.
+            if bumps == self._bumps:
+                self._current, self._read_at = current, read_at
+        return tuple(current.get(namespace, 0) for namespace in namespaces)
+
+    def bump(self, namespaces: Iterable[str]):
+        namespaces = tuple(namespaces)
+        try:
+            with self.bind.begin() as connection:
+                connection.execute(
+                    update(self.table).where(self.table.c.namespace.in_(namespaces)).values(version=self.table.c.version + 1)
+                )
+        except DBAPIError as e:
+            logger.warning("Cache invalidation of %s failed: %s", ", ".join(namespaces), e.orig)
+        # This process reads its own writes: the next lookup fetches the new versions.
+        with self._lock:
+            self._read_at = None
+            self._bumps += 1
+
+# --- Backends ---
+
+class MemoryCache:
+    """Thread-safe in-process LRU with a per-entry TTL, over shared or local namespace versions."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, versions=None):
+        self.max_entries = max_entries
+        self.version_store = versions or LocalVersions()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, namespaces: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        return self.version_store.versions(namespaces)
+
+    def peek(self, namespaces: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        return self.version_store.peek(namespaces)
+
+    def bump(self, namespaces: Iterable[str]):
+        self.version_store.bump(namespaces)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisCache:
+    """
+    Cache backed by any Redis-compatible client exposing get/set/incr/mget
+    (redis-py, or fakeredis for local runs). While the client raises one of
+    `errors`, calls are skipped for CACHE_RETRY_SECONDS and requests fall
+    through to the database.
+    """
+
+    def __init__(self, client, prefix: str = "warehouse:cache", errors: Tuple[type, ...] = (OSError,)):
+        self.client = client
+        self.prefix = prefix
+        self.errors = errors
+        self._retry_at = 0.0
+
+    def _call(self, method, *args, **kwargs):
+        if time.monotonic() < self._retry_at:
+            return None
+        try:
+            return method(*args, **kwargs)
+        except self.errors as e:
+            self._retry_at = time.monotonic() + CACHE_RETRY_SECONDS
+            logger.warning("Redis cache unavailable, bypassing it for %ss: %s", CACHE_RETRY_SECONDS, e)
+            return None
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._call(self.client.get, f"{self.prefix}:e:{key}")
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl: int):
+        self._call(self.client.set, f"{self.prefix}:e:{key}", value, ex=ttl)
+
+    def peek(self, namespaces: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        # Versions always come from Redis.
+        return None
+
+    def versions(self, namespaces: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        values = self._call(self.client.mget, [f"{self.prefix}:v:{namespace}" for namespace in namespaces])
+        return None if values is None else tuple(int(value or 0) for value in values)
+
+    def bump(self, namespaces: Iterable[str]):
+        # A bump lost while Redis is down leaves older entries live until CACHE_TTL_SECONDS.
+        for namespace in namespaces:
+            if self._call(self.client.incr, f"{self.prefix}:v:{namespace}") is None:
+                break
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.prefix}:*"):
+            self.client.delete(key)
+
+def _create_backend():
+    if CACHE_BACKEND == "none":
+        return None
+    if CACHE_BACKEND == "redis":
+        # Imported lazily so redis is only required when this backend is selected.
+        import redis
+        client = redis.Redis.from_url(CACHE_URL, socket_timeout=CACHE_TIMEOUT_SECONDS, socket_connect_timeout=CACHE_TIMEOUT_SECONDS)
+        return RedisCache(client, errors=(redis.RedisError, OSError))
+    return MemoryCache(versions=DatabaseVersions(engine))
+
+backend = _create_backend()
+
+def set_backend(new_backend):
+    """Swap the cache backend, e.g. for a RedisCache over a fake client."""
+    global backend
+    backend = new_backend
+
+@contextmanager
+def versions_in(bind):
+    """
+    Within the block, bump shared versions in `bind`'s database instead of the app's,
+    for tools writing to another database; `None` skips invalidation (scratch databases).
+    """
+    global backend
+    previous = backend
+    if bind is None:
+        backend = None
+    elif isinstance(previous, MemoryCache) and isinstance(previous.version_store, DatabaseVersions):
+        backend = MemoryCache(versions=DatabaseVersions(bind))
+    try:
+        yield
+    finally:
+        backend = previous
+
+def invalidate(*namespaces: str):
+    """Invalidate every cached response that depends on any of `namespaces`."""
+    if backend is not None and namespaces:
+        backend.bump(namespaces)
+
+# --- HTTP Helpers ---
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _cache_key(request: Request, namespaces: Tuple[str, ...], versions: Optional[Tuple[int, ...]] = None) -> Optional[str]:
+    if versions is None:
+        versions = backend.versions(namespaces)
+    if versions is None:
+        return None
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    return f"{request.url.path}?{query}|" + ",".join(f"{ns}={v}" for ns, v in zip(namespaces, versions))
+
+def _respond(request: Request, body: bytes, etag: str, headers: Dict[str, str]) -> Response:
+    headers = {**headers, "ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _lookup(request: Request, namespaces: Tuple[str, ...], versions: Optional[Tuple[int, ...]] = None):
+    if backend is None:
+        return None, None
+    key = _cache_key(request, namespaces, versions)
+    if key is None:
+        return None, None
+    cached = backend.get(key)
+    return key, (json.loads(cached) if cached is not None else None)
+
+def _store(key: Optional[str], body: bytes, response: Optional[Response]):
+    etag = _etag(body)
+    headers = {}
+    if response is not None:
+        headers = {name: response.headers[name] for name in _CACHED_HEADERS if name in response.headers}
+    if key is not None:
+        backend.set(key, json.dumps({"body": body.decode(), "etag": etag, "headers": headers}), CACHE_TTL_SECONDS)
+    return etag, headers
+
+def cached_json(request: Request, namespaces: Tuple[str, ...], compute: Callable, encode: Callable[[object], bytes],
+                response: Optional[Response] = None) -> Response:
+    """
+    Serve `compute()` encoded by `encode` from the cache when possible, with an
+    ETag so clients revalidating via If-None-Match get a 304. Headers that
+    `compute` sets on `response` (pagination cursors, totals) are cached too.
+    """
+    key, entry = _lookup(request, namespaces)
+    if entry is not None:
+        return _respond(request, entry["body"].encode(), entry["etag"], entry["headers"])
+    result = compute()
+    with instrumentation.serializing():
+        body = encode(result)
+    etag, headers = _store(key, body, response)
+    return _respond(request, body, etag, headers)
+
+async def cached_json_async(request: Request, namespaces: Tuple[str, ...], compute: Callable, encode: Callable[[object], bytes],
+                            response: Optional[Response] = None) -> Response:
+    """Async variant of `cached_json` for endpoints whose `compute` is a coroutine function."""
+    versions = backend.peek(namespaces) if backend is not None else None
+    if versions is not None or backend is None:
+        key, entry = _lookup(request, namespaces, versions)
+    else:
+        # Reading the versions is a database or Redis round trip, so it runs off the event loop.
+        key, entry = await run_in_threadpool(_lookup, request, namespaces)
+    if entry is not None:
+        return _respond(request, entry["body"].encode(), entry["etag"], entry["headers"])
+    result = await compute()
+    with instrumentation.serializing():
+        body = encode(result)
+    etag, headers = _store(key, body, response)
+    return _respond(request, body, etag, headers)
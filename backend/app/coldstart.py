@@ -0,0 +1,175 @@
+# backend/app/coldstart.py
+"""
+Measure how long a fresh API process takes to import, serve and answer its
+first requests, once per STARTUP_PREWARM mode.
+
+    python -m app.coldstart                                  # fresh SQLite dataset, 5 runs of each mode
+    python -m app.coldstart --runs 10 --prewarm off background --output benchmarks/coldstart.json
+    python -m app.coldstart --database-url postgresql://localhost/bench --workers 2
+
+Each run starts `python -m app.serve` and records:
+
+    import_ms     `import app.main` in a separate interpreter
+    listen_ms     process start until GET / answers
+    ready_ms      process start until /health/ready answers 200
+    first_ms      mean latency of the first request to each of COLD_PATHS, sent once ready
+    warm_ms       median latency of those paths after --warm more requests each
+
+The response cache is disabled unless --cache is given, so first_ms shows the
+cost of empty pools and cold statement caches rather than a cache miss.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Read endpoints requested first; the list views use a different page size than the prewarm requests.
+COLD_PATHS = (
+    "/items/?limit=20",
+    "/shipments/?limit=20",
+    "/suppliers/?limit=20",
+    "/items/2",
+    "/analytics/stock_by_category/",
+    "/analytics/low_stock_alerts/",
+)
+START_TIMEOUT_SECONDS = 60
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def measure_import(env: Dict[str, str]) -> float:
+    """Milliseconds to import the app in a fresh interpreter."""
+    code = "import time; started = time.perf_counter(); import app.main; print((time.perf_counter() - started) * 1000)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+def _wait_for(client: httpx.Client, path: str, started: float, server: subprocess.Popen) -> float:
+    while time.perf_counter() - started < START_TIMEOUT_SECONDS:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            if client.get(path).status_code == 200:
+                return (time.perf_counter() - started) * 1000
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise RuntimeError(f"{path} did not answer within {START_TIMEOUT_SECONDS}s")
+
+def _timed_get(client: httpx.Client, path: str) -> float:
+    started = time.perf_counter()
+    client.get(path).raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+def run_once(env: Dict[str, str], args) -> Dict[str, float]:
+    """Start one server and time it up to its warm requests."""
+    port = _free_port()
+    command = [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(args.workers), "--server", args.server]
+    started = time.perf_counter()
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            listen_ms = _wait_for(client, "/", started, server)
+            ready_ms = _wait_for(client, "/health/ready", started, server)
+            first = [_timed_get(client, path) for path in COLD_PATHS]
+            warm = [_timed_get(client, path) for _ in range(args.warm) for path in COLD_PATHS]
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "listen_ms": listen_ms,
+        "ready_ms": ready_ms,
+        "first_ms": statistics.fmean(first),
+        "warm_ms": statistics.median(warm) if warm else 0.0,
+    }
+
+def summarize(runs: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        metric: {
+            "median": round(statistics.median(values), 2),
+            "p95": round(_percentile(values, 0.95), 2),
+        }
+        for metric in runs[0]
+        for values in [[run[metric] for run in runs]]
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure API cold-start time per STARTUP_PREWARM mode.")
+    parser.add_argument("--database-url", help="Existing, migrated dataset to start against. Defaults to a fresh generated SQLite file.")
+    parser.add_argument("--suppliers", type=int, default=200)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--shipments", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5, help="Server starts per mode.")
+    parser.add_argument("--warm", type=int, default=5, help="Requests per path after the first one.")
+    parser.add_argument("--prewarm", nargs="+", choices=["off", "background", "blocking"], default=["off", "background", "blocking"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--server", choices=["auto", "gunicorn", "uvicorn"], default="auto")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache enabled.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='warehouse-coldstart-'), 'coldstart.db')}"
+    env = {
+        **os.environ,
+        "DATABASE_URL": url,
+        "CACHE_BACKEND": os.environ.get("CACHE_BACKEND", "memory") if args.cache else "none",
+        "MIGRATE_ON_STARTUP": "false",
+    }
+    if args.database_url is None:
+        from . import datagen
+
+        print(f"Generating {args.suppliers} suppliers, {args.items} items, {args.shipments} shipments...")
+        datagen.load(url, args.suppliers, args.items, args.shipments, seed=args.seed, progress=lambda line: print(f"  {line}"))
+
+    results = {}
+    for mode in args.prewarm:
+        mode_env = {**env, "STARTUP_PREWARM": mode}
+        runs = []
+        for _ in range(args.runs):
+            run = run_once(mode_env, args)
+            run["import_ms"] = measure_import(mode_env)
+            runs.append(run)
+        results[mode] = summarize(runs)
+        line = "  ".join(f"{metric} {values['median']:>8.1f}" for metric, values in results[mode].items())
+        print(f"  {mode:<11} (median ms)  {line}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": url.split(":", 1)[0],
+            "runs": args.runs,
+            "workers": args.workers,
+            "server": args.server,
+            "cache": args.cache,
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,84 +1,427 @@
 # backend/app/crud.py
 
+import base64
+import json
+import os
+from datetime import date
+from collections import defaultdict
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Date, and_, case, exists, func, insert, or_, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy.exc import IntegrityError
-from . import models, schemas
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from . import cache, events, models, partitions, projections, schemas, search
+
+# Cached responses affected by writes to each table, including responses that nest the row.
+ITEM_CACHE_NAMESPACES = (cache.ITEMS, cache.SHIPMENTS, cache.ANALYTICS)
+SUPPLIER_CACHE_NAMESPACES = (cache.SUPPLIERS, cache.ITEMS, cache.SHIPMENTS, cache.ANALYTICS)
+SHIPMENT_CACHE_NAMESPACES = (cache.SHIPMENTS, cache.ITEMS, cache.ANALYTICS)
+WAREHOUSE_CACHE_NAMESPACES = (cache.WAREHOUSES,)
+
+# Warehouse that holds stock no other warehouse was named for: item quantity edits, shipments without an origin.
+DEFAULT_WAREHOUSE_ID = int(os.getenv("DEFAULT_WAREHOUSE_ID", 1))
+
+# Default window of /analytics/low_stock_alerts/, in days of forecast demand.
+FORECAST_HORIZON_DAYS = int(os.getenv("FORECAST_HORIZON_DAYS", 14))
+
+# --- Keyset Pagination ---
+
+# Columns each list endpoint may be sorted by; `id` is always the tiebreaker.
+ITEM_SORT_KEYS = {
+    "id": models.InventoryItem.id,
+    "name": models.InventoryItem.name,
+    "category": models.InventoryItem.category,
+}
+SUPPLIER_SORT_KEYS = {
+    "id": models.Supplier.id,
+    "name": models.Supplier.name,
+}
+SHIPMENT_SORT_KEYS = {
+    "id": models.Shipment.id,
+    "estimated_delivery_date": models.Shipment.estimated_delivery_date,
+}
+
+def encode_cursor(sort_value, last_id: int) -> str:
+    """Encode the position after the last returned row as an opaque cursor."""
+    if isinstance(sort_value, date):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, last_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[object, int]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return sort_value, int(last_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def _resolve_sort(sort_keys: Dict, sort: str):
+    """Map a `sort` parameter such as `name` or `-name` to (column, descending)."""
+    descending = sort.startswith("-")
+    key = sort.lstrip("-")
+    if key not in sort_keys:
+        raise ValueError(f"Invalid sort key '{key}'; expected one of: {', '.join(sort_keys)}")
+    return sort_keys[key], descending
+
+def _order_by_sort(query, id_column, sort_keys: Dict, sort: str):
+    """Order a query by the requested sort key with `id` as a stable tiebreaker."""
+    column, descending = _resolve_sort(sort_keys, sort)
+    if column is id_column:
+        return query.order_by(id_column.desc() if descending else id_column)
+    if descending:
+        return query.order_by(column.desc(), id_column.desc())
+    return query.order_by(column, id_column)
+
+def _keyset_page(query, id_column, sort_keys: Dict, sort: str, cursor: Optional[str], limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page seeking past `cursor` instead of using OFFSET, so every page
+    costs the same regardless of depth. Rows whose sort column is NULL are not
+    reachable when sorting by a column other than `id`.
+    """
+    column, query = _seek(query, id_column, sort_keys, sort, cursor)
+    rows = _order_by_sort(query, id_column, sort_keys, sort).limit(limit + 1).all()
+    return _next_page(rows, column, limit)
+
+def _seek(query, id_column, sort_keys: Dict, sort: str, cursor: Optional[str]):
+    """The sort column, and `query` (an ORM query or a Core select) filtered to the rows after `cursor`."""
+    column, descending = _resolve_sort(sort_keys, sort)
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        if isinstance(column.type, Date) and sort_value is not None:
+            sort_value = date.fromisoformat(sort_value)
+        if column is id_column:
+            query = query.filter(id_column < last_id if descending else id_column > last_id)
+        elif descending:
+            query = query.filter(or_(column < sort_value, and_(column == sort_value, id_column < last_id)))
+        else:
+            query = query.filter(or_(column > sort_value, and_(column == sort_value, id_column > last_id)))
+    if column is not id_column:
+        query = query.filter(column.isnot(None))
+    return column, query
+
+def _next_page(rows: List, column, limit: int) -> Tuple[List, Optional[str]]:
+    """Trim the extra row a keyset query fetched and encode the cursor after the last one kept."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, column.key), last.id)
+    return rows, next_cursor
+
+def count_rows(db: Session, model, criteria: Iterable = ()) -> int:
+    """Count the rows of a table matching `criteria` without joining any relationships."""
+    return db.query(func.count(model.id)).filter(*criteria).scalar()
+
+# --- List Filters ---
+
+def _contains(column, value: str):
+    return column.ilike(search.like_pattern(value), escape="\\")
+
+def item_criteria(db: Session, filters: Optional[schemas.InventoryItemFilters] = None) -> List:
+    """WHERE clauses for the inventory item list filters."""
+    if filters is None:
+        return []
+    item = models.InventoryItem
+    criteria = []
+    if filters.q and search.has_terms(filters.q):
+        criteria.append(item.id.in_(search.matching_item_ids(db, filters.q)))
+    if filters.category is not None:
+        criteria.append(item.category == filters.category)
+    if filters.supplier_id is not None:
+        criteria.append(item.supplier_id == filters.supplier_id)
+    if filters.min_quantity is not None:
+        criteria.append(item.quantity >= filters.min_quantity)
+    if filters.max_quantity is not None:
+        criteria.append(item.quantity <= filters.max_quantity)
+    if filters.min_price is not None:
+        criteria.append(item.price >= filters.min_price)
+    if filters.max_price is not None:
+        criteria.append(item.price <= filters.max_price)
+    return criteria
+
+def supplier_criteria(db: Session, filters: Optional[schemas.SupplierFilters] = None) -> List:
+    """WHERE clauses for the supplier list filters."""
+    if filters is None or not filters.q or not search.has_terms(filters.q):
+        return []
+    return [models.Supplier.id.in_(search.matching_supplier_ids(db, filters.q))]
+
+def shipment_criteria(db: Session, filters: Optional[schemas.ShipmentFilters] = None, model=models.Shipment) -> List:
+    """WHERE clauses for the shipment list filters, on live shipments or on `models.ShipmentArchive`."""
+    if filters is None:
+        return []
+    shipment = model
+    criteria = []
+    if filters.q and search.has_terms(filters.q):
+        criteria.append(shipment.item_id.in_(search.matching_item_ids(db, filters.q)))
+    if filters.item_id is not None:
+        criteria.append(shipment.item_id == filters.item_id)
+    if filters.status is not None:
+        criteria.append(shipment.status == filters.status)
+    if filters.start_date is not None:
+        criteria.append(shipment.estimated_delivery_date >= filters.start_date)
+    if filters.end_date is not None:
+        criteria.append(shipment.estimated_delivery_date <= filters.end_date)
+    if filters.origin:
+        criteria.append(_contains(shipment.origin, filters.origin))
+    if filters.destination:
+        criteria.append(_contains(shipment.destination, filters.destination))
+    return criteria
+
+# --- Shipment Archive ---
+
+class ArchivePart(NamedTuple):
+    """Archived rows a list query reads alongside the live table: the archive model and its filters."""
+    model: type
+    criteria: list
+
+# Statuses the archive holds; `python -m app.archive` only moves delivered shipments.
+ARCHIVED_STATUSES = ("Delivered",)
+
+def archive_needed(db: Session, start_date: Optional[date] = None, status: Optional[str] = None, include_archived: bool = False) -> bool:
+    """
+    Whether a shipment read must include the archive: when asked to, or when
+    its delivery window starts on or before the newest archived shipment.
+    Reads without a start date stay on the live table.
+    """
+    if status is not None and status not in ARCHIVED_STATUSES:
+        return False
+    if include_archived:
+        return True
+    if start_date is None:
+        return False
+    newest = db.query(func.max(models.ShipmentArchive.estimated_delivery_date)).scalar()
+    return newest is not None and start_date <= newest
+
+def _with_archive(db: Session, model, rows, criteria: Iterable, archive: ArchivePart, sort_keys: Dict):
+    """
+    A row-mode query over the live and archived rows together (UNION ALL),
+    with the id column and sort keys to order and page the combined rows by.
+    UNION ALL matches columns by position, so the archive side selects the
+    live side's columns in the live side's order.
+    """
+    combined, keys = _archive_union(rows, criteria, archive, sort_keys)
+    return db.query(*combined.c), combined.c.id, keys
+
+def _archive_union(rows, criteria: Iterable, archive: ArchivePart, sort_keys: Dict):
+    """The UNION ALL subquery behind `_with_archive`, and the sort keys mapped onto its columns."""
+    live = rows.select().filter(*criteria)
+    archived = projections.retarget(rows, archive.model).select().filter(*archive.criteria)
+    combined = union_all(live, archived).subquery()
+    # Only the requested sort key is selected (see `projections.row_query`'s `always_load`).
+    keys = {key: combined.c[column.key] for key, column in sort_keys.items() if column.key in combined.c}
+    return combined, keys
+
+# --- Loader Options ---
+
+def _item_options(options: Optional[list] = None) -> list:
+    """Loader options for item reads: the caller's projection, or the full supplier join."""
+    return options if options is not None else [joinedload(models.InventoryItem.supplier)]
+
+def _shipment_options(options: Optional[list] = None) -> list:
+    """Loader options for shipment reads: the caller's projection, or the full item and supplier joins."""
+    return options if options is not None else [joinedload(models.Shipment.item).joinedload(models.InventoryItem.supplier)]
+
+def _list_query(db: Session, model, options: list, rows=None):
+    """An ORM query for `model` with loader `options`, or in row mode (a `projections.RowQuery`) plain row tuples."""
+    if rows is None:
+        return db.query(model).options(*options)
+    query = db.query(*rows.columns).select_from(model)
+    for relation in rows.joins:
+        query = query.outerjoin(relation)
+    return query
+
+# --- Conditional Updates ---
+
+class VersionConflict(ValueError):
+    """The row has been updated since the version the client sent in If-Match."""
+
+def _version_criteria(model, expected_version: Optional[int]) -> list:
+    """WHERE criteria that limit an UPDATE to `expected_version`, or nothing for an unconditional one."""
+    return [] if expected_version is None else [model.version == expected_version]
+
+# Attempts at a version-guarded update before giving up to a concurrent writer (non-PostgreSQL databases).
+UPDATE_RETRIES = 3
+
+def _update_returning_previous(db: Session, model, row_id: int, values: dict, expected_version: Optional[int],
+                               previous_keys: Iterable[str], criteria: Iterable = ()):
+    """
+    Update one row to `values`, bumping its version, and return `(row, previous)`
+    with the row as updated and the `previous_keys` columns as they were, or None
+    when no row matched. On PostgreSQL this is a single UPDATE ... RETURNING that
+    reads a locked pre-image in a CTE. SQLite cannot return CTE columns from an
+    UPDATE, so it reads the pre-image first and guards the UPDATE on the version
+    it read, retrying when another write got in between.
+    """
+    previous_keys = list(previous_keys)
+    columns = [model.__table__.c[key] for key in previous_keys]
+    statement = (
+        update(model)
+        .values(**values, version=model.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        previous = select(model.id, *columns).where(model.id == row_id).with_for_update().cte("previous")
+        row = db.execute(
+            statement.where(model.id == previous.c.id, *_version_criteria(model, expected_version), *criteria)
+            .returning(model, *[previous.c[key] for key in previous_keys])
+        ).first()
+        return None if row is None else (row[0], dict(zip(previous_keys, row[1:])))
+    for _ in range(UPDATE_RETRIES):
+        current = db.execute(select(model.version, *columns).where(model.id == row_id)).first()
+        if current is None or (expected_version is not None and current.version != expected_version):
+            return None
+        row = db.execute(statement.where(model.id == row_id, model.version == current.version, *criteria).returning(model)).first()
+        if row is not None:
+            return row[0], dict(zip(previous_keys, current[1:]))
+    return None
+
+def _missing_or_conflict(db: Session, model, row_id: int, expected_version: Optional[int]):
+    """
+    After a conditional UPDATE matched no row: return None when the row does not
+    exist, otherwise raise VersionConflict. Only this failure path reads the row.
+    """
+    db.rollback()
+    current = db.query(model.version).filter(model.id == row_id).scalar()
+    if current is None:
+        return None
+    if expected_version is None:
+        raise VersionConflict(f"{model.__tablename__} {row_id} kept changing during the update; retry")
+    raise VersionConflict(f"{model.__tablename__} {row_id} is at version {current}, not {expected_version}")
 
 # --- Inventory Item CRUD ---
 
-def get_item(db: Session, item_id: int):
-    """Retrieve a single inventory item by ID with eager loading."""
-    return db.query(models.InventoryItem).options(joinedload(models.InventoryItem.supplier)).filter(models.InventoryItem.id == item_id).first()
+def get_item(db: Session, item_id: int, options: Optional[list] = None):
+    """Retrieve a single inventory item by ID with eager loading, or with the given loader `options`."""
+    query = db.query(models.InventoryItem).options(*_item_options(options))
+    return query.filter(models.InventoryItem.id == item_id).first()
 
-def get_items(db: Session, skip: int = 0, limit: int = 100):
-    """Retrieve all inventory items with eager loading of supplier relationships."""
-    return db.query(models.InventoryItem).options(joinedload(models.InventoryItem.supplier)).offset(skip).limit(limit).all()
+def get_items(db: Session, skip: int = 0, limit: int = 100, sort: str = "id", options: Optional[list] = None, criteria: Iterable = (), rows=None):
+    """Retrieve all inventory items with eager loading of supplier relationships, or as flat `rows`."""
+    query = _list_query(db, models.InventoryItem, _item_options(options), rows).filter(*criteria)
+    return _order_by_sort(query, models.InventoryItem.id, ITEM_SORT_KEYS, sort).offset(skip).limit(limit).all()
+
+def get_items_keyset(db: Session, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", options: Optional[list] = None, criteria: Iterable = (), rows=None):
+    """Retrieve one keyset page of inventory items and the cursor for the next page."""
+    query = _list_query(db, models.InventoryItem, _item_options(options), rows).filter(*criteria)
+    return _keyset_page(query, models.InventoryItem.id, ITEM_SORT_KEYS, sort, cursor, limit)
 
 def create_item(db: Session, item: schemas.InventoryItemCreate):
     """Create a new inventory item with validation."""
     try:
         db_item = models.InventoryItem(**item.dict())
         db.add(db_item)
+        db.flush()
+        apply_item_deltas(db, added=[item.dict()])
+        movements = _initial_movements([{**item.dict(), "id": db_item.id}])
+        _apply_warehouse_deltas(db, movements, check_stock=False)
+        _record_movements(db, movements)
+        events.emit(db, "item.created", id=db_item.id, name=item.name, category=item.category, quantity=item.quantity)
         db.commit()
+        cache.invalidate(*ITEM_CACHE_NAMESPACES)
         db.refresh(db_item)
         return db_item
     except IntegrityError:
         db.rollback()
         raise ValueError("Item with this name already exists or invalid supplier_id")
 
-def update_item(db: Session, item_id: int, item: schemas.InventoryItemCreate):
-    """Update an existing inventory item."""
+def update_item(db: Session, item_id: int, item: schemas.InventoryItemCreate, expected_version: Optional[int] = None):
+    """
+    Update an existing inventory item, only at `expected_version` when given.
+    The UPDATE returns the previous category and quantity along with the row,
+    so a shipment posted meanwhile cannot be lost from the adjustment.
+    """
     try:
-        db_item = db.query(models.InventoryItem).filter(models.InventoryItem.id == item_id).first()
-        if db_item:
-            for key, value in item.dict().items():
-                setattr(db_item, key, value)
-            db.commit()
-            db.refresh(db_item)
+        updated = _update_returning_previous(db, models.InventoryItem, item_id, item.dict(), expected_version, ("category", "quantity"))
+        if updated is None:
+            return _missing_or_conflict(db, models.InventoryItem, item_id, expected_version)
+        db_item, previous = updated
+        apply_item_deltas(db, added=[item.dict()], removed=[previous])
+        delta = item.quantity - (previous["quantity"] or 0)
+        if delta:
+            # Direct quantity edits adjust the default warehouse's shelf.
+            movements = [{"item_id": item_id, "warehouse_id": DEFAULT_WAREHOUSE_ID, "shipment_id": None, "quantity_delta": delta, "reason": "adjustment"}]
+            _apply_warehouse_deltas(db, movements)
+            _record_movements(db, movements)
+            update_days_of_cover(db, [item_id])
+        events.emit(db, "item.updated", id=item_id, **item.dict())
+        events.emit_quantity_change(db, item_id, previous["quantity"] or 0, item.quantity)
+        db.commit()
+        cache.invalidate(*ITEM_CACHE_NAMESPACES)
         return db_item
+    except ValueError:
+        db.rollback()
+        raise
     except IntegrityError:
         db.rollback()
         raise ValueError("Invalid data provided for update")
 
 def delete_item(db: Session, item_id: int):
     """Delete an inventory item."""
-    db_item = db.query(models.InventoryItem).filter(models.InventoryItem.id == item_id).first()
+    # The supplier is loaded up front: the deleted row is detached once committed, but the response still nests it.
+    db_item = db.query(models.InventoryItem).options(*_item_options()).filter(models.InventoryItem.id == item_id).first()
     if db_item:
+        apply_item_deltas(db, removed=[_item_aggregate_values(db_item)])
+        # The item's ledger history goes with it.
+        db.query(models.StockSnapshot).filter(models.StockSnapshot.item_id == item_id).delete(synchronize_session=False)
+        db.query(models.StockMovement).filter(models.StockMovement.item_id == item_id).delete(synchronize_session=False)
+        db.query(models.WarehouseStock).filter(models.WarehouseStock.item_id == item_id).delete(synchronize_session=False)
+        db.query(models.ItemForecast).filter(models.ItemForecast.item_id == item_id).delete(synchronize_session=False)
         db.delete(db_item)
+        events.emit(db, "item.deleted", id=item_id)
         db.commit()
+        cache.invalidate(*ITEM_CACHE_NAMESPACES)
     return db_item
 
 # --- Supplier CRUD ---
 
-def get_supplier(db: Session, supplier_id: int):
+def get_supplier(db: Session, supplier_id: int, options: Optional[list] = None):
     """Retrieve a single supplier by ID."""
-    return db.query(models.Supplier).filter(models.Supplier.id == supplier_id).first()
+    return db.query(models.Supplier).options(*(options or [])).filter(models.Supplier.id == supplier_id).first()
 
-def get_suppliers(db: Session, skip: int = 0, limit: int = 100):
-    """Retrieve all suppliers."""
-    return db.query(models.Supplier).offset(skip).limit(limit).all()
+def get_suppliers(db: Session, skip: int = 0, limit: int = 100, sort: str = "id", options: Optional[list] = None, criteria: Iterable = (), rows=None):
+    """Retrieve all suppliers, as ORM objects or flat `rows`."""
+    query = _list_query(db, models.Supplier, options or [], rows).filter(*criteria)
+    return _order_by_sort(query, models.Supplier.id, SUPPLIER_SORT_KEYS, sort).offset(skip).limit(limit).all()
+
+def get_suppliers_keyset(db: Session, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", options: Optional[list] = None, criteria: Iterable = (), rows=None):
+    """Retrieve one keyset page of suppliers and the cursor for the next page."""
+    query = _list_query(db, models.Supplier, options or [], rows).filter(*criteria)
+    return _keyset_page(query, models.Supplier.id, SUPPLIER_SORT_KEYS, sort, cursor, limit)
 
 def create_supplier(db: Session, supplier: schemas.SupplierCreate):
     """Create a new supplier with validation."""
     try:
         db_supplier = models.Supplier(**supplier.dict())
         db.add(db_supplier)
+        db.flush()
+        events.emit(db, "supplier.created", id=db_supplier.id, name=supplier.name)
         db.commit()
+        cache.invalidate(*SUPPLIER_CACHE_NAMESPACES)
         db.refresh(db_supplier)
         return db_supplier
     except IntegrityError:
         db.rollback()
         raise ValueError("Supplier with this name or email already exists")
 
-def update_supplier(db: Session, supplier_id: int, supplier: schemas.SupplierCreate):
-    """Update an existing supplier."""
+def update_supplier(db: Session, supplier_id: int, supplier: schemas.SupplierCreate, expected_version: Optional[int] = None):
+    """Update an existing supplier with a single UPDATE ... RETURNING, only at `expected_version` when given."""
     try:
-        db_supplier = db.query(models.Supplier).filter(models.Supplier.id == supplier_id).first()
-        if db_supplier:
-            for key, value in supplier.dict().items():
-                setattr(db_supplier, key, value)
-            db.commit()
-            db.refresh(db_supplier)
+        db_supplier = db.execute(
+            update(models.Supplier)
+            .where(models.Supplier.id == supplier_id, *_version_criteria(models.Supplier, expected_version))
+            .values(**supplier.dict(), version=models.Supplier.version + 1)
+            .returning(models.Supplier)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if db_supplier is None:
+            return _missing_or_conflict(db, models.Supplier, supplier_id, expected_version)
+        events.emit(db, "supplier.updated", id=supplier_id, name=supplier.name)
+        db.commit()
+        cache.invalidate(*SUPPLIER_CACHE_NAMESPACES)
         return db_supplier
     except IntegrityError:
         db.rollback()
@@ -89,59 +432,639 @@ def delete_supplier(db: Session, supplier_id: int):
     db_supplier = db.query(models.Supplier).filter(models.Supplier.id == supplier_id).first()
     if db_supplier:
         db.delete(db_supplier)
+        events.emit(db, "supplier.deleted", id=supplier_id)
         db.commit()
+        cache.invalidate(*SUPPLIER_CACHE_NAMESPACES)
     return db_supplier
 
 # --- Shipment CRUD ---
 
-def get_shipment(db: Session, shipment_id: int):
-    """Retrieve a single shipment by ID with eager loading."""
-    return db.query(models.Shipment).options(joinedload(models.Shipment.item).joinedload(models.InventoryItem.supplier)).filter(models.Shipment.id == shipment_id).first()
+def get_shipment(db: Session, shipment_id: int, options: Optional[list] = None):
+    """Retrieve a single shipment by ID with eager loading, or with the given loader `options`."""
+    query = db.query(models.Shipment).options(*_shipment_options(options))
+    return query.filter(models.Shipment.id == shipment_id).first()
+
+def _shipment_list_query(db: Session, options: Optional[list], criteria: Iterable, rows, archive: Optional[ArchivePart]):
+    if archive is not None:
+        return _with_archive(db, models.Shipment, rows, criteria, archive, SHIPMENT_SORT_KEYS)
+    query = _list_query(db, models.Shipment, _shipment_options(options), rows).filter(*criteria)
+    return query, models.Shipment.id, SHIPMENT_SORT_KEYS
+
+def get_shipments(db: Session, skip: int = 0, limit: int = 100, sort: str = "id", options: Optional[list] = None, criteria: Iterable = (), rows=None,
+                  archive: Optional[ArchivePart] = None):
+    """
+    Retrieve all shipments with eager loading of item and supplier relationships,
+    or as flat `rows`, which may include the `archive` rows too.
+    """
+    query, id_column, sort_keys = _shipment_list_query(db, options, criteria, rows, archive)
+    return _order_by_sort(query, id_column, sort_keys, sort).offset(skip).limit(limit).all()
 
-def get_shipments(db: Session, skip: int = 0, limit: int = 100):
-    """Retrieve all shipments with eager loading of item and supplier relationships."""
-    return db.query(models.Shipment).options(joinedload(models.Shipment.item).joinedload(models.InventoryItem.supplier)).offset(skip).limit(limit).all()
+def get_shipments_keyset(db: Session, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", options: Optional[list] = None, criteria: Iterable = (), rows=None,
+                         archive: Optional[ArchivePart] = None):
+    """Retrieve one keyset page of shipments (and any `archive` rows) and the cursor for the next page."""
+    query, id_column, sort_keys = _shipment_list_query(db, options, criteria, rows, archive)
+    return _keyset_page(query, id_column, sort_keys, sort, cursor, limit)
 
 def create_shipment(db: Session, shipment: schemas.ShipmentCreate):
     """Create a new shipment with validation."""
     try:
-        # Validate that the referenced item exists
-        item = db.query(models.InventoryItem).filter(models.InventoryItem.id == shipment.item_id).first()
-        if not item:
+        # Validate that the referenced item exists; only its id is loaded, so the response nests the item as committed.
+        if db.query(models.InventoryItem.id).filter(models.InventoryItem.id == shipment.item_id).first() is None:
             raise ValueError("Referenced item does not exist")
-        
-        db_shipment = models.Shipment(**shipment.dict())
+        values = _shipment_values(shipment)
+        _check_warehouses(db, [values["origin_warehouse_id"], values["destination_warehouse_id"]])
+
+        db_shipment = models.Shipment(**values)
         db.add(db_shipment)
+        db.flush()
+        apply_shipment_deltas(db, added=[values])
+        post_movements(db, _shipment_movements(db_shipment.id, None, values))
+        events.emit(db, "shipment.created", id=db_shipment.id, item_id=shipment.item_id, quantity=shipment.quantity, status=shipment.status)
         db.commit()
+        cache.invalidate(*SHIPMENT_CACHE_NAMESPACES)
         db.refresh(db_shipment)
         return db_shipment
+    except ValueError:
+        db.rollback()
+        raise
     except IntegrityError:
         db.rollback()
         raise ValueError("Invalid shipment data provided")
 
-def update_shipment(db: Session, shipment_id: int, shipment: schemas.ShipmentCreate):
-    """Update an existing shipment."""
+def _shipment_references(values: dict) -> list:
+    """EXISTS criteria for the item and warehouses a shipment names, checked inside its UPDATE."""
+    criteria = [exists().where(models.InventoryItem.id == values["item_id"])]
+    for warehouse_id in {values["origin_warehouse_id"], values["destination_warehouse_id"]} - {None}:
+        criteria.append(exists().where(models.Warehouse.id == warehouse_id))
+    return criteria
+
+def update_shipment(db: Session, shipment_id: int, shipment: schemas.ShipmentCreate, expected_version: Optional[int] = None):
+    """
+    Update an existing shipment, only at `expected_version` when given. The
+    UPDATE checks the referenced item and warehouses and returns the previous
+    values along with the row, so two concurrent status transitions cannot
+    both move stock.
+    """
     try:
-        # Validate that the referenced item exists
-        item = db.query(models.InventoryItem).filter(models.InventoryItem.id == shipment.item_id).first()
-        if not item:
-            raise ValueError("Referenced item does not exist")
-            
-        db_shipment = db.query(models.Shipment).filter(models.Shipment.id == shipment_id).first()
-        if db_shipment:
-            for key, value in shipment.dict().items():
-                setattr(db_shipment, key, value)
-            db.commit()
-            db.refresh(db_shipment)
+        values = _shipment_values(shipment)
+        updated = _update_returning_previous(db, models.Shipment, shipment_id, values, expected_version, _SHIPMENT_AGGREGATE_KEYS,
+                                             _shipment_references(values))
+        if updated is None:
+            # Diagnosed in the order the checks used to run: the references, then the shipment itself.
+            db.rollback()
+            if db.query(models.InventoryItem.id).filter(models.InventoryItem.id == shipment.item_id).first() is None:
+                raise ValueError("Referenced item does not exist")
+            _check_warehouses(db, [values["origin_warehouse_id"], values["destination_warehouse_id"]])
+            return _missing_or_conflict(db, models.Shipment, shipment_id, expected_version)
+        db_shipment, previous = updated
+        apply_shipment_deltas(db, added=[values], removed=[previous])
+        post_movements(db, _shipment_movements(shipment_id, previous, values))
+        events.emit(db, "shipment.updated", id=shipment_id, **values)
+        if shipment.status != previous["status"]:
+            events.emit(db, "shipment.status_changed", id=shipment_id, item_id=shipment.item_id,
+                        status=shipment.status, previous_status=previous["status"])
+        db.commit()
+        cache.invalidate(*SHIPMENT_CACHE_NAMESPACES)
         return db_shipment
+    except ValueError:
+        db.rollback()
+        raise
     except IntegrityError:
         db.rollback()
         raise ValueError("Invalid data provided for update")
 
 def delete_shipment(db: Session, shipment_id: int):
     """Delete a shipment."""
-    db_shipment = db.query(models.Shipment).filter(models.Shipment.id == shipment_id).first()
+    # Relations are loaded up front: the deleted row is detached once committed, but the response still nests them.
+    db_shipment = db.query(models.Shipment).options(*_shipment_options()).filter(models.Shipment.id == shipment_id).first()
     if db_shipment:
+        previous = _shipment_aggregate_values(db_shipment)
+        apply_shipment_deltas(db, removed=[previous])
+        post_movements(db, _shipment_movements(shipment_id, previous, None), check_stock=False)
         db.delete(db_shipment)
+        events.emit(db, "shipment.deleted", id=shipment_id)
         db.commit()
-    return db_shipment
\ No newline at end of file
+        cache.invalidate(*SHIPMENT_CACHE_NAMESPACES)
+    return db_shipment
+
+# --- Warehouse CRUD ---
+
+def _check_warehouses(db: Session, warehouse_ids: Iterable[Optional[int]]):
+    """Raise ValueError unless every given (non-null) warehouse id exists."""
+    wanted = {warehouse_id for warehouse_id in warehouse_ids if warehouse_id is not None}
+    if wanted and db.query(func.count(models.Warehouse.id)).filter(models.Warehouse.id.in_(wanted)).scalar() != len(wanted):
+        raise ValueError("Referenced warehouse does not exist")
+
+def _shipment_values(shipment: schemas.ShipmentCreate) -> dict:
+    """Column values for a shipment, which leaves from the default warehouse unless it names an origin."""
+    values = shipment.dict()
+    values["origin_warehouse_id"] = values.get("origin_warehouse_id") or DEFAULT_WAREHOUSE_ID
+    return values
+
+def get_warehouse(db: Session, warehouse_id: int):
+    """Retrieve a single warehouse by ID."""
+    return db.query(models.Warehouse).filter(models.Warehouse.id == warehouse_id).first()
+
+def get_warehouses(db: Session, skip: int = 0, limit: int = 100):
+    """Retrieve all warehouses."""
+    return db.query(models.Warehouse).order_by(models.Warehouse.id).offset(skip).limit(limit).all()
+
+def create_warehouse(db: Session, warehouse: schemas.WarehouseCreate):
+    """Create a new warehouse, with its own stock partition on PostgreSQL."""
+    try:
+        db_warehouse = models.Warehouse(**warehouse.dict())
+        db.add(db_warehouse)
+        db.flush()
+        partitions.create_stock_partition(db, db_warehouse.id)
+        events.emit(db, "warehouse.created", id=db_warehouse.id, name=warehouse.name)
+        db.commit()
+        cache.invalidate(*WAREHOUSE_CACHE_NAMESPACES)
+        db.refresh(db_warehouse)
+        return db_warehouse
+    except IntegrityError:
+        db.rollback()
+        raise ValueError("Warehouse with this name already exists")
+
+def update_warehouse(db: Session, warehouse_id: int, warehouse: schemas.WarehouseCreate):
+    """Update an existing warehouse."""
+    try:
+        db_warehouse = db.query(models.Warehouse).filter(models.Warehouse.id == warehouse_id).first()
+        if db_warehouse:
+            for key, value in warehouse.dict().items():
+                setattr(db_warehouse, key, value)
+            events.emit(db, "warehouse.updated", id=warehouse_id, name=warehouse.name)
+            db.commit()
+            cache.invalidate(*WAREHOUSE_CACHE_NAMESPACES)
+            db.refresh(db_warehouse)
+        return db_warehouse
+    except IntegrityError:
+        db.rollback()
+        raise ValueError("Invalid data provided for update")
+
+def get_warehouse_stock(db: Session, warehouse_id: int, skip: int = 0, limit: int = 100, max_quantity: Optional[int] = None, rows=None):
+    """
+    Retrieve one warehouse's stock rows with their items, by item id. The
+    warehouse_id filter lets PostgreSQL prune to that warehouse's partition.
+    """
+    stock = models.WarehouseStock
+    query = _list_query(db, stock, [joinedload(stock.item).joinedload(models.InventoryItem.supplier)], rows)
+    query = query.filter(stock.warehouse_id == warehouse_id)
+    if max_quantity is not None:
+        query = query.filter(stock.quantity <= max_quantity)
+    return query.order_by(stock.item_id).offset(skip).limit(limit).all()
+
+def get_warehouse_shipments(db: Session, warehouse_id: int, skip: int = 0, limit: int = 100, status: Optional[str] = None, rows=None):
+    """Retrieve shipments leaving from or arriving at a warehouse, newest first."""
+    query = _list_query(db, models.Shipment, _shipment_options(), rows).filter(
+        or_(models.Shipment.origin_warehouse_id == warehouse_id, models.Shipment.destination_warehouse_id == warehouse_id)
+    )
+    if status is not None:
+        query = query.filter(models.Shipment.status == status)
+    return query.order_by(models.Shipment.id.desc()).offset(skip).limit(limit).all()
+
+# --- Analytics Queries ---
+
+def _filter_shipments(query, start_date: Optional[date] = None, end_date: Optional[date] = None, status: Optional[str] = None, model=models.Shipment):
+    """Apply the optional delivery-date window and status filters to a (live or archived) shipments query."""
+    if start_date is not None:
+        query = query.filter(model.estimated_delivery_date >= start_date)
+    if end_date is not None:
+        query = query.filter(model.estimated_delivery_date <= end_date)
+    if status is not None:
+        query = query.filter(model.status == status)
+    return query
+
+def _filter_daily_totals(query, start_date: Optional[date] = None, end_date: Optional[date] = None, status: Optional[str] = None):
+    """Apply the optional delivery-date window and status filters to a daily-totals query."""
+    if start_date is not None:
+        query = query.filter(models.DailyShipmentTotal.delivery_date >= start_date)
+    if end_date is not None:
+        query = query.filter(models.DailyShipmentTotal.delivery_date <= end_date)
+    if status is not None:
+        query = query.filter(models.DailyShipmentTotal.status == status)
+    return query
+
+def get_stock_by_category(db: Session) -> Dict[str, int]:
+    """Total stock per category, read from the incrementally maintained summary table."""
+    rows = (
+        db.query(models.CategoryStock.category, models.CategoryStock.total_quantity)
+        .filter(models.CategoryStock.item_count > 0)
+        .all()
+    )
+    return {category: int(total) for category, total in rows}
+
+def get_daily_shipments(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None, status: Optional[str] = None) -> Dict[str, int]:
+    """Total shipped quantity per estimated delivery date, read from the daily summary table."""
+    query = (
+        db.query(models.DailyShipmentTotal.delivery_date, func.sum(models.DailyShipmentTotal.total_quantity))
+        .filter(models.DailyShipmentTotal.shipment_count > 0)
+    )
+    query = _filter_daily_totals(query, start_date, end_date, status)
+    rows = query.group_by(models.DailyShipmentTotal.delivery_date).order_by(models.DailyShipmentTotal.delivery_date).all()
+    return {delivery_date.isoformat(): int(total) for delivery_date, total in rows}
+
+def _stock_alert_columns() -> tuple:
+    """The forecast columns returned after each alerted item; days of cover is NULL for items with no demand."""
+    forecast = models.ItemForecast
+    return forecast.daily_demand, forecast.reorder_point, forecast.days_of_cover
+
+def get_low_stock_items(db: Session, threshold: int = 10, rows=None):
+    """
+    Retrieve items whose quantity is below the given threshold, followed by their
+    forecast columns, as (item, ...) tuples or flat `rows`.
+    """
+    query = (
+        _list_query(db, models.InventoryItem, [joinedload(models.InventoryItem.supplier)], rows)
+        .outerjoin(models.ItemForecast, models.ItemForecast.item_id == models.InventoryItem.id)
+        .add_columns(*_stock_alert_columns())
+    )
+    return query.filter(models.InventoryItem.quantity < threshold).all()
+
+def has_forecasts(db: Session) -> bool:
+    """Whether `python -m app.forecasting` has fitted any demand rates yet."""
+    return db.query(models.ItemForecast.item_id).first() is not None
+
+def _stockout_criteria(days: int, threshold: Optional[int]) -> tuple:
+    """
+    The forecast and fallback alert filters, each with its sort column. Items with
+    no forecast row or no demand (NULL days of cover) alert below the static
+    threshold instead: with zero cover once out of stock, otherwise at the horizon.
+    """
+    forecast = models.ItemForecast
+    threshold = events.LOW_STOCK_THRESHOLD if threshold is None else threshold
+    unknown_cover = case((models.InventoryItem.quantity <= 0, 0.0), else_=float(days))
+    return (
+        ((forecast.days_of_cover < days,), forecast.days_of_cover, forecast.item_id),
+        ((forecast.days_of_cover.is_(None), models.InventoryItem.quantity < threshold), unknown_cover, models.InventoryItem.id),
+    )
+
+def _merge_alerts(groups: Iterable[list], limit: int) -> list:
+    """Merge alert rows ordered by their trailing sort column and drop that column."""
+    merged = sorted(chain.from_iterable(groups), key=lambda row: row[-1])
+    return [tuple(row[:-1]) for row in merged[:limit]]
+
+def get_stockout_alerts(db: Session, days: int, limit: int = 100, rows=None, threshold: Optional[int] = None):
+    """
+    Retrieve items whose forecast demand uses up their stock within `days`, plus
+    items without a usable forecast below `threshold` (LOW_STOCK_THRESHOLD by
+    default), fewest days of cover first, as (item, ...) tuples or flat `rows`.
+    """
+    forecast = models.ItemForecast
+    groups = []
+    # Two indexed queries, ix_item_forecasts_days_of_cover and ix_items_quantity, instead of one sorted scan.
+    for criteria, order, tiebreak in _stockout_criteria(days, threshold):
+        groups.append(
+            _list_query(db, models.InventoryItem, [joinedload(models.InventoryItem.supplier)], rows)
+            .outerjoin(forecast, forecast.item_id == models.InventoryItem.id)
+            .add_columns(*_stock_alert_columns(), order.label("alert_order"))
+            .filter(*criteria)
+            .order_by(order, tiebreak)
+            .limit(limit)
+            .all()
+        )
+    return _merge_alerts(groups, limit)
+
+# --- Aggregate Maintenance ---
+
+def update_days_of_cover(db: Session, item_ids: Optional[Iterable[int]] = None):
+    """Recompute the stored days of cover of the given items' forecasts (every forecast by default) in the caller's transaction."""
+    forecast = models.ItemForecast
+    quantity = select(models.InventoryItem.quantity).where(models.InventoryItem.id == forecast.item_id).scalar_subquery()
+    stmt = update(forecast).values(days_of_cover=quantity / func.nullif(forecast.daily_demand, 0))
+    if item_ids is not None:
+        stmt = stmt.where(forecast.item_id.in_(list(item_ids)))
+    db.execute(stmt.execution_options(synchronize_session=False))
+
+def _item_aggregate_values(db_item) -> dict:
+    """Snapshot the columns of an item that feed the category summary."""
+    return {"category": db_item.category, "quantity": db_item.quantity}
+
+# Columns of a shipment that feed the daily summary and the stock ledger.
+_SHIPMENT_AGGREGATE_KEYS = ("estimated_delivery_date", "status", "quantity", "item_id", "origin_warehouse_id", "destination_warehouse_id")
+
+def _shipment_aggregate_values(db_shipment) -> dict:
+    """Snapshot the columns of a shipment that feed the daily summary and the stock ledger."""
+    return {key: getattr(db_shipment, key) for key in _SHIPMENT_AGGREGATE_KEYS}
+
+def _upsert_deltas(db: Session, model, key_columns: Tuple[str, ...], total_column: str, count_column: str, deltas: Dict):
+    """Add `(total, count)` deltas to summary rows with INSERT ... ON CONFLICT DO UPDATE, in the caller's transaction."""
+    rows = [
+        {**dict(zip(key_columns, key)), total_column: total, count_column: count}
+        for key, (total, count) in deltas.items() if total or count
+    ]
+    if not rows:
+        return
+    stmt = _insert_for(db, model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={
+            total_column: getattr(model, total_column) + stmt.excluded[total_column],
+            count_column: getattr(model, count_column) + stmt.excluded[count_column],
+        },
+    )
+    db.execute(stmt, rows)
+
+def apply_item_deltas(db: Session, added: Iterable[dict] = (), removed: Iterable[dict] = ()):
+    """Apply the category-stock changes caused by adding and removing item rows."""
+    deltas = defaultdict(lambda: [0, 0])
+    for values, sign in [(row, 1) for row in added] + [(row, -1) for row in removed]:
+        if values.get("category") is None:
+            continue
+        delta = deltas[(values["category"],)]
+        delta[0] += sign * (values.get("quantity") or 0)
+        delta[1] += sign
+    _upsert_deltas(db, models.CategoryStock, ("category",), "total_quantity", "item_count", deltas)
+
+def apply_shipment_deltas(db: Session, added: Iterable[dict] = (), removed: Iterable[dict] = ()):
+    """Apply the daily-shipment changes caused by adding and removing shipment rows."""
+    deltas = defaultdict(lambda: [0, 0])
+    for values, sign in [(row, 1) for row in added] + [(row, -1) for row in removed]:
+        if values.get("estimated_delivery_date") is None:
+            continue
+        delta = deltas[(values["estimated_delivery_date"], values.get("status") or "")]
+        delta[0] += sign * (values.get("quantity") or 0)
+        delta[1] += sign
+    _upsert_deltas(db, models.DailyShipmentTotal, ("delivery_date", "status"), "total_quantity", "shipment_count", deltas)
+
+# --- Stock Ledger ---
+
+# Shipment statuses in which the goods have left on-hand stock.
+DISPATCHED_STATUSES = ("In Transit", "Delayed", "Delivered")
+
+def _record_movements(db: Session, movements: List[dict]):
+    """Append rows to the stock ledger in the caller's transaction."""
+    if movements:
+        db.execute(insert(models.StockMovement), movements)
+
+def _initial_movements(items: Iterable[dict]) -> List[dict]:
+    """Opening ledger rows, in the default warehouse, for newly inserted items (each dict carries its `id`)."""
+    return [
+        {"item_id": item["id"], "warehouse_id": DEFAULT_WAREHOUSE_ID, "shipment_id": None, "quantity_delta": item["quantity"], "reason": "initial"}
+        for item in items if item.get("quantity")
+    ]
+
+def _shipment_stock_effect(values: Optional[dict]) -> Dict[Tuple[int, int], int]:
+    """
+    Stock a shipment in state `values` holds, per (warehouse_id, item_id): once
+    dispatched it is off the origin's shelf, and once delivered to a destination
+    warehouse it is on that warehouse's shelf.
+    """
+    effect = defaultdict(int)
+    if values and values.get("status") in DISPATCHED_STATUSES:
+        quantity = values.get("quantity") or 0
+        effect[(values.get("origin_warehouse_id") or DEFAULT_WAREHOUSE_ID, values["item_id"])] -= quantity
+        if values["status"] == "Delivered" and values.get("destination_warehouse_id"):
+            effect[(values["destination_warehouse_id"], values["item_id"])] += quantity
+    return effect
+
+def _shipment_movements(shipment_id: Optional[int], before: Optional[dict], after: Optional[dict]) -> List[dict]:
+    """Ledger rows for a shipment changing from `before` to `after`."""
+    deltas = defaultdict(int)
+    for key, quantity in _shipment_stock_effect(after).items():
+        deltas[key] += quantity
+    for key, quantity in _shipment_stock_effect(before).items():
+        deltas[key] -= quantity
+    return [
+        {"item_id": item_id, "warehouse_id": warehouse_id, "shipment_id": shipment_id, "quantity_delta": delta, "reason": "shipment"}
+        for (warehouse_id, item_id), delta in sorted(deltas.items()) if delta
+    ]
+
+def _apply_warehouse_deltas(db: Session, movements: Iterable[dict], check_stock: bool = True):
+    """
+    Add net movements to per-warehouse stock rows, in the caller's transaction.
+    With `check_stock`, each decrement is one atomic conditional UPDATE that
+    fails rather than take a warehouse below zero; everything else is a single
+    batched INSERT ... ON CONFLICT DO UPDATE.
+    """
+    totals = defaultdict(int)
+    for movement in movements:
+        totals[(movement.get("warehouse_id") or DEFAULT_WAREHOUSE_ID, movement["item_id"])] += movement["quantity_delta"]
+    stock = models.WarehouseStock
+    upserts = []
+    # Rows are locked in key order so concurrent multi-row writers cannot deadlock.
+    for (warehouse_id, item_id), delta in sorted(totals.items()):
+        if not delta:
+            continue
+        if check_stock and delta < 0:
+            row = db.execute(
+                update(stock)
+                .where(stock.warehouse_id == warehouse_id, stock.item_id == item_id, stock.quantity >= -delta)
+                .values(quantity=stock.quantity + delta)
+                .returning(stock.quantity)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if row is None:
+                raise ValueError(f"Insufficient stock for item {item_id} in warehouse {warehouse_id}")
+        else:
+            upserts.append({"warehouse_id": warehouse_id, "item_id": item_id, "quantity": delta})
+    if upserts:
+        stmt = _insert_for(db, stock)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["warehouse_id", "item_id"],
+            set_={"quantity": stock.quantity + stmt.excluded.quantity},
+        )
+        db.execute(stmt, upserts)
+
+def _apply_stock_deltas(db: Session, movements: Iterable[dict], check_stock: bool = True):
+    """
+    Add each item's net movement to its on-hand quantity with one atomic
+    `UPDATE ... SET quantity = quantity + :delta` per item, in the caller's
+    transaction, along with the per-warehouse rows. With `check_stock`, a
+    decrement below zero (overall or at the warehouse) raises ValueError.
+    """
+    _apply_warehouse_deltas(db, movements, check_stock)
+    totals = defaultdict(int)
+    for movement in movements:
+        totals[movement["item_id"]] += movement["quantity_delta"]
+    quantity = func.coalesce(models.InventoryItem.quantity, 0)
+    category_deltas = defaultdict(lambda: [0, 0])
+    # Items are updated in id order so concurrent multi-item writers cannot deadlock.
+    for item_id in sorted(totals):
+        delta = totals[item_id]
+        if not delta:
+            continue
+        stmt = (
+            update(models.InventoryItem)
+            .where(models.InventoryItem.id == item_id)
+            .values(quantity=quantity + delta, version=models.InventoryItem.version + 1)
+            .returning(models.InventoryItem.category, models.InventoryItem.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if check_stock and delta < 0:
+            stmt = stmt.where(quantity >= -delta)
+        row = db.execute(stmt).first()
+        if row is None:
+            if db.query(models.InventoryItem.id).filter(models.InventoryItem.id == item_id).first() is None:
+                raise ValueError("Referenced item does not exist")
+            raise ValueError(f"Insufficient stock for item {item_id}")
+        if row.category is not None:
+            category_deltas[(row.category,)][0] += delta
+        events.emit_quantity_change(db, item_id, row.quantity - delta, row.quantity)
+    _upsert_deltas(db, models.CategoryStock, ("category",), "total_quantity", "item_count", category_deltas)
+    changed = [item_id for item_id in sorted(totals) if totals[item_id]]
+    if changed:
+        update_days_of_cover(db, changed)
+
+def post_movements(db: Session, movements: List[dict], check_stock: bool = True):
+    """Apply ledger movements to on-hand quantities and append them to the ledger, in the caller's transaction."""
+    _apply_stock_deltas(db, movements, check_stock)
+    _record_movements(db, movements)
+
+def create_stock_movement(db: Session, item_id: int, movement: schemas.StockMovementCreate):
+    """Post a manual movement (receipt, write-off, correction) against an item's stock at one warehouse."""
+    try:
+        values = {**movement.dict(), "warehouse_id": movement.warehouse_id or DEFAULT_WAREHOUSE_ID}
+        _check_warehouses(db, [values["warehouse_id"]])
+        db_movement = models.StockMovement(item_id=item_id, **values)
+        _apply_stock_deltas(db, [{"item_id": item_id, **values}])
+        db.add(db_movement)
+        db.commit()
+    except ValueError:
+        db.rollback()
+        raise
+    cache.invalidate(*ITEM_CACHE_NAMESPACES)
+    db.refresh(db_movement)
+    return db_movement
+
+def get_stock_movements(db: Session, item_id: int, skip: int = 0, limit: int = 100):
+    """Retrieve an item's ledger, newest first."""
+    return (
+        db.query(models.StockMovement)
+        .filter(models.StockMovement.item_id == item_id)
+        .order_by(models.StockMovement.id.desc())
+        .offset(skip).limit(limit).all()
+    )
+
+# --- Bulk Operations ---
+
+# Rows per executemany batch; a failing batch is retried row by row.
+BULK_CHUNK_SIZE = 1000
+
+def _insert_for(db: Session, model):
+    """Return an INSERT construct for the session's dialect (needed for ON CONFLICT)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    return insert(model)
+
+def _bulk_insert(db: Session, model, rows: List[Tuple[int, dict]], result: schemas.BulkResult, cache_namespaces: Tuple[str, ...],
+                 upsert_on: Optional[str] = None, on_inserted: Optional[Callable[[List[dict]], None]] = None):
+    """
+    Insert `(index, values)` pairs in batched executemany statements, recording
+    the new ids by input index. A batch that fails is replayed one row at a time
+    inside savepoints so only the offending rows are reported as errors.
+    `on_inserted` receives the inserted rows, with their new `id`, before the final commit.
+    """
+    stmt = _insert_for(db, model)
+    if upsert_on:
+        if not hasattr(stmt, "on_conflict_do_update"):
+            raise ValueError("Upsert is only supported on PostgreSQL and SQLite")
+        update_columns = {key: stmt.excluded[key] for key in rows[0][1] if key != upsert_on} if rows else {}
+        update_columns["version"] = model.version + 1
+        stmt = stmt.on_conflict_do_update(index_elements=[upsert_on], set_=update_columns)
+    stmt = stmt.returning(model.id, sort_by_parameter_order=True)
+
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        chunk = rows[start:start + BULK_CHUNK_SIZE]
+        try:
+            with db.begin_nested():
+                new_ids = db.execute(stmt, [values for _, values in chunk]).scalars().all()
+            for (index, _), new_id in zip(chunk, new_ids):
+                result.ids[index] = new_id
+        except DBAPIError:
+            for index, values in chunk:
+                try:
+                    with db.begin_nested():
+                        result.ids[index] = db.execute(stmt, [values]).scalar_one()
+                except DBAPIError as e:
+                    result.errors.append(schemas.BulkRowError(index=index, detail=str(e.orig)))
+    if on_inserted is not None:
+        on_inserted([{**values, "id": result.ids[index]} for index, values in rows if result.ids[index] is not None])
+    db.commit()
+    cache.invalidate(*cache_namespaces)
+    result.succeeded = sum(1 for new_id in result.ids if new_id is not None)
+    result.errors.sort(key=lambda error: error.index)
+    return result
+
+def _on_items_inserted(db: Session, inserted: List[dict]):
+    apply_item_deltas(db, added=inserted)
+    movements = _initial_movements(inserted)
+    _apply_warehouse_deltas(db, movements, check_stock=False)
+    _record_movements(db, movements)
+    events.emit(db, "item.bulk_created", count=len(inserted))
+
+def bulk_create_items(db: Session, items: List[Tuple[int, schemas.InventoryItemCreate]], result: schemas.BulkResult):
+    """Insert many inventory items in batches."""
+    return _bulk_insert(db, models.InventoryItem, [(index, item.dict()) for index, item in items], result, ITEM_CACHE_NAMESPACES,
+                        on_inserted=lambda inserted: _on_items_inserted(db, inserted))
+
+def bulk_create_suppliers(db: Session, suppliers: List[Tuple[int, schemas.SupplierCreate]], result: schemas.BulkResult, upsert_on: Optional[str] = None):
+    """Insert many suppliers in batches, optionally upserting on the unique `name` or `email`."""
+    return _bulk_insert(db, models.Supplier, [(index, supplier.dict()) for index, supplier in suppliers], result, SUPPLIER_CACHE_NAMESPACES,
+                        upsert_on=upsert_on, on_inserted=lambda inserted: events.emit(db, "supplier.bulk_created", count=len(inserted)))
+
+def _on_shipments_inserted(db: Session, inserted: List[dict]):
+    apply_shipment_deltas(db, added=inserted)
+    post_movements(db, [movement for row in inserted for movement in _shipment_movements(row["id"], None, row)], check_stock=False)
+    events.emit(db, "shipment.bulk_created", count=len(inserted))
+
+def bulk_create_shipments(db: Session, shipments: List[Tuple[int, schemas.ShipmentCreate]], result: schemas.BulkResult):
+    """
+    Insert many shipments in batches, rejecting rows that reference missing items.
+    Dispatched rows move stock like single creates, but imports record history
+    as given, so they are not checked against on-hand stock.
+    """
+    item_ids = {shipment.item_id for _, shipment in shipments}
+    existing = set()
+    item_id_list = list(item_ids)
+    for start in range(0, len(item_id_list), BULK_CHUNK_SIZE):
+        chunk = item_id_list[start:start + BULK_CHUNK_SIZE]
+        existing.update(row[0] for row in db.query(models.InventoryItem.id).filter(models.InventoryItem.id.in_(chunk)))
+    warehouse_ids = {row[0] for row in db.query(models.Warehouse.id)}
+    rows = []
+    for index, shipment in shipments:
+        values = _shipment_values(shipment)
+        if shipment.item_id not in existing:
+            result.errors.append(schemas.BulkRowError(index=index, detail="Referenced item does not exist"))
+        elif not {values["origin_warehouse_id"], values["destination_warehouse_id"]} - {None} <= warehouse_ids:
+            result.errors.append(schemas.BulkRowError(index=index, detail="Referenced warehouse does not exist"))
+        else:
+            rows.append((index, values))
+    return _bulk_insert(db, models.Shipment, rows, result, SHIPMENT_CACHE_NAMESPACES,
+                        on_inserted=lambda inserted: _on_shipments_inserted(db, inserted))
+
+# --- Streaming Export Queries ---
+
+# Rows fetched per round trip from the server-side cursor during exports.
+EXPORT_BATCH_SIZE = 1000
+
+def iter_items(db: Session, category: Optional[str] = None, supplier_id: Optional[int] = None, include_relations: bool = False):
+    """Iterate over inventory items in id order, fetching them in batches from a server-side cursor."""
+    query = db.query(models.InventoryItem)
+    if include_relations:
+        query = query.options(joinedload(models.InventoryItem.supplier))
+    if category is not None:
+        query = query.filter(models.InventoryItem.category == category)
+    if supplier_id is not None:
+        query = query.filter(models.InventoryItem.supplier_id == supplier_id)
+    return query.order_by(models.InventoryItem.id).yield_per(EXPORT_BATCH_SIZE)
+
+def iter_shipments(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None, status: Optional[str] = None, include_relations: bool = False,
+                   include_archived: bool = False):
+    """
+    Iterate over shipments in id order, fetching them in batches from a
+    server-side cursor, then over archived ones when the window reaches them.
+    """
+    sources = [models.Shipment]
+    if archive_needed(db, start_date, status, include_archived):
+        sources.append(models.ShipmentArchive)
+    queries = []
+    for model in sources:
+        query = db.query(model)
+        if include_relations:
+            query = query.options(joinedload(model.item).joinedload(models.InventoryItem.supplier))
+        query = _filter_shipments(query, start_date, end_date, status, model)
+        queries.append(query.order_by(model.id).yield_per(EXPORT_BATCH_SIZE))
+    return chain.from_iterable(queries)
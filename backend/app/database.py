@@ -4,26 +4,87 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from . import engine_config, instrumentation
+
 # Use the DATABASE_URL from environment variables for production,
 # but fall back to SQLite for local development.
 SQLALCHEMY_DATABASE_URL = os.getenv(
     "DATABASE_URL", "sqlite:///./warehouse.db"
 )
 
-# If using postgres, the "connect_args" are not needed.
-engine_args = {}
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine_args["connect_args"] = {"check_same_thread": False}
+# Opt-in async engine for read endpoints (asyncpg on Postgres, aiosqlite locally).
+ASYNC_DATABASE = os.getenv("ASYNC_DATABASE", "false").lower() in ("1", "true", "yes")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_args)
+# Pool sizing and per-dialect connect hooks are configured in engine_config.
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_config.engine_kwargs(SQLALCHEMY_DATABASE_URL))
+engine_config.install_connect_hooks(engine)
+instrumentation.install(engine)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects are not expired on commit: writes build their responses from UPDATE ... RETURNING rows,
+# which a post-commit reload would just fetch again.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
+# --- Schema Migrations ---
+
+# Alembic revisions whose tables identify a database created by create_all before migrations existed.
+_CREATE_ALL_REVISIONS = [("items", "0001"), ("category_stock", "0002")]
+
+def run_migrations(revision: str = "head", bind=None):
+    """
+    Upgrade the schema with Alembic (on `bind`, default the app engine).
+    Databases created by the old create_all call are stamped at the revision
+    matching the tables they already have.
+    """
+    # Imported lazily so Alembic is only loaded when migrations actually run.
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import inspect
+
+    config = Config(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini"))
+    with (bind or engine).begin() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables:
+            existing = [rev for table, rev in _CREATE_ALL_REVISIONS if table in tables]
+            if existing:
+                command.stamp(config, existing[-1])
+        command.upgrade(config, revision)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# --- Async Engine ---
+
+def to_async_url(url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver."""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg://", 1)
+    return url
+
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DATABASE:
+    # Imported lazily so the async drivers are only required when enabled.
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_config.engine_kwargs(ASYNC_DATABASE_URL))
+    engine_config.install_connect_hooks(async_engine.sync_engine)
+    instrumentation.install(async_engine.sync_engine, "async")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency for endpoints that can run on either engine.
+get_read_db = get_async_db if ASYNC_DATABASE else get_db
@@ -0,0 +1,255 @@
+# backend/app/datagen.py
+"""
+Offline synthetic dataset generator: writes realistic warehouses, suppliers,
+items, shipments and their stock ledger straight into the database with
+batched executemany inserts, no API or network involved.
+
+    python -m app.datagen --items 1000000 --shipments 2000000              # the app's DATABASE_URL
+    python -m app.datagen --warehouses 20 --reset
+    python -m app.datagen --database-url postgresql://localhost/bench --reset
+
+Output is deterministic for a given --seed and row counts. Rows get ids
+1..N, so the target must be empty; --reset drops and recreates the schema.
+Warehouse 1 is the default one the migrations create; each item is stocked at
+one home warehouse and some shipments are transfers to another.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+from sqlalchemy import bindparam, create_engine, insert, text, update
+from sqlalchemy.orm import sessionmaker
+
+from . import aggregates, cache, crud, engine_config, forecasting, models, partitions, search
+from .database import SQLALCHEMY_DATABASE_URL, run_migrations
+
+CATALOGUE = {
+    "Electronics": (["Laptop", "Monitor", "Keyboard", "Mouse", "Webcam", "Headset", "Router", "Docking Station"], (15, 2500)),
+    "Office Supplies": (["Stapler", "Notebook", "Desk Organizer", "Whiteboard", "Label Maker", "Paper Shredder"], (2, 300)),
+    "Hardware": (["Drill", "Socket Set", "Tape Measure", "Workbench", "Ladder", "Cable Reel"], (5, 900)),
+    "Apparel": (["Safety Vest", "Work Gloves", "Hard Hat", "Steel-Toe Boots", "Rain Jacket"], (5, 250)),
+    "Groceries": (["Coffee Beans", "Bottled Water", "Granola Bars", "Green Tea", "Paper Cups"], (1, 60)),
+}
+ADJECTIVES = ["Compact", "Pro", "Heavy-Duty", "Wireless", "Ergonomic", "Premium", "Standard", "Eco", "Ultra", "Portable"]
+COMPANY_WORDS = ["Global", "Summit", "Northwind", "Apex", "Blue River", "Ironclad", "Pioneer", "Harbor", "Keystone", "Atlas"]
+COMPANY_KINDS = ["Logistics", "Supply Co", "Industries", "Trading", "Distribution", "Wholesale", "Manufacturing"]
+FIRST_NAMES = ["Aarav", "Maya", "Liam", "Sofia", "Noah", "Priya", "Ethan", "Chloe", "Omar", "Hana", "Lucas", "Zara"]
+LAST_NAMES = ["Patel", "Garcia", "Smith", "Nguyen", "Kim", "Okafor", "Rossi", "Müller", "Silva", "Cohen", "Sato"]
+CITIES = ["Mumbai", "Pune", "Chicago", "Rotterdam", "Shenzhen", "Hamburg", "Dallas", "Singapore", "Toronto", "Lyon"]
+TRANSFER_SHARE = 0.1  # Shipments that go to another warehouse rather than a customer
+
+def _warehouses(count: int) -> Iterator[Dict]:
+    # Id 1 is the default warehouse the migrations create.
+    for i in range(2, count + 1):
+        city = CITIES[(i - 2) % len(CITIES)]
+        yield {"id": i, "name": f"{city} DC {i}", "location": city}
+
+def _suppliers(rng: random.Random, count: int) -> Iterator[Dict]:
+    for i in range(1, count + 1):
+        name = f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_KINDS)} {i}"
+        yield {
+            "id": i,
+            "name": name,
+            "contact_person": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "email": f"{name.lower().replace(' ', '.')}@example.com",
+            "phone": f"+1-555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        }
+
+def _items(rng: random.Random, count: int, suppliers: int, warehouses: int, quantities: List[int], homes: List[int]) -> Iterator[Dict]:
+    categories = list(CATALOGUE)
+    for i in range(1, count + 1):
+        category = rng.choice(categories)
+        nouns, (low, high) = CATALOGUE[category]
+        # Mostly modest stock with a long tail, so low-stock alerts fire for a realistic share of items.
+        quantity = min(int(rng.expovariate(1 / 120)), 5000)
+        quantities.append(quantity)
+        homes.append(rng.randint(1, warehouses))
+        yield {
+            "id": i,
+            "name": f"{rng.choice(ADJECTIVES)} {rng.choice(nouns)} {rng.choice('ABCDEFGHKMX')}-{rng.randint(100, 9999)}",
+            "quantity": quantity,
+            "category": category,
+            "price": round(rng.uniform(low, high), 2),
+            "supplier_id": rng.randint(1, suppliers) if suppliers else None,
+        }
+
+def _status(rng: random.Random, days_from_today: int) -> str:
+    if days_from_today < -14:
+        return rng.choices(["Delivered", "Delayed"], weights=[97, 3])[0]
+    if days_from_today < 0:
+        return rng.choices(["Delivered", "In Transit", "Delayed"], weights=[60, 30, 10])[0]
+    return rng.choices(["Pending", "In Transit", "Delayed"], weights=[55, 40, 5])[0]
+
+def _shipments(rng: random.Random, count: int, items: int, warehouses: int, homes: List[int], dispatched: List[int],
+               received: Dict, movements: List[Dict]) -> Iterator[Dict]:
+    today = date.today()
+    for i in range(1, count + 1):
+        # Skewed towards low ids: a minority of items account for most shipments.
+        item_id = int(items * rng.random() ** 2) + 1
+        days = rng.randint(-365, 30)
+        quantity = rng.randint(1, 50)
+        status = _status(rng, days)
+        origin, destination = rng.sample(CITIES, 2)
+        home = homes[item_id - 1]
+        target = None
+        if warehouses > 1 and rng.random() < TRANSFER_SHARE:
+            target = rng.choice([w for w in range(1, warehouses + 1) if w != home])
+        if status in crud.DISPATCHED_STATUSES:
+            dispatched[item_id - 1] += quantity
+            movements.append({"item_id": item_id, "warehouse_id": home, "shipment_id": i, "quantity_delta": -quantity, "reason": "shipment"})
+            if status == "Delivered" and target is not None:
+                received[(target, item_id)] = received.get((target, item_id), 0) + quantity
+                movements.append({"item_id": item_id, "warehouse_id": target, "shipment_id": i, "quantity_delta": quantity, "reason": "shipment"})
+        yield {
+            "id": i,
+            "item_id": item_id,
+            "quantity": quantity,
+            "origin": origin,
+            "destination": destination,
+            "status": status,
+            "estimated_delivery_date": today + timedelta(days=days),
+            "origin_warehouse_id": home,
+            "destination_warehouse_id": target,
+        }
+
+def _insert_batches(db, model, rows: Iterator[Dict], batch_size: int, pending: List[Dict] = None) -> int:
+    """Insert `rows` in executemany batches, committing each; `pending` ledger rows are flushed alongside."""
+    total, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += _flush(db, model, batch, pending)
+            batch = []
+    if batch:
+        total += _flush(db, model, batch, pending)
+    return total
+
+def _flush(db, model, batch: List[Dict], pending: List[Dict] = None) -> int:
+    db.execute(insert(model), batch)
+    if pending:
+        db.execute(insert(models.StockMovement), pending)
+        pending.clear()
+    db.commit()
+    return len(batch)
+
+def generate(session_factory, suppliers: int, items: int, shipments: int, seed: int = 42, batch_size: int = 10000, progress=print,
+             warehouses: int = 1):
+    """
+    Write a synthetic dataset into empty tables, with a stock ledger that
+    replays to every item's and every warehouse's quantity, then rebuild the
+    summary tables and demand forecasts.
+    """
+    rng = random.Random(seed)
+    db = session_factory()
+    try:
+        started = time.perf_counter()
+        progress(f"warehouses: {_insert_batches(db, models.Warehouse, _warehouses(warehouses), batch_size) + 1}")
+        for warehouse_id in range(2, warehouses + 1):
+            partitions.create_stock_partition(db, warehouse_id)
+        db.commit()
+        progress(f"suppliers: {_insert_batches(db, models.Supplier, _suppliers(rng, suppliers), batch_size)}")
+        quantities: List[int] = []
+        homes: List[int] = []
+        progress(f"items: {_insert_batches(db, models.InventoryItem, _items(rng, items, suppliers, warehouses, quantities, homes), batch_size)}")
+        dispatched = [0] * items
+        received: Dict = {}
+        movements: List[Dict] = []
+        shipment_rows = _shipments(rng, shipments, items, warehouses, homes, dispatched, received, movements)
+        progress(f"shipments: {_insert_batches(db, models.Shipment, shipment_rows, batch_size, movements)}")
+        # Opening balances, at each item's home warehouse: today's quantity plus everything that has shipped since.
+        opening = (
+            {"item_id": i + 1, "warehouse_id": homes[i], "shipment_id": None, "quantity_delta": quantity + dispatched[i], "reason": "initial"}
+            for i, quantity in enumerate(quantities) if quantity + dispatched[i]
+        )
+        progress(f"opening balances: {_insert_batches(db, models.StockMovement, opening, batch_size)}")
+        stock = [
+            {"warehouse_id": homes[i], "item_id": i + 1, "quantity": quantity} for i, quantity in enumerate(quantities) if quantity
+        ] + [
+            {"warehouse_id": warehouse_id, "item_id": item_id, "quantity": quantity} for (warehouse_id, item_id), quantity in sorted(received.items())
+        ]
+        progress(f"warehouse stock: {_insert_batches(db, models.WarehouseStock, iter(stock), batch_size)}")
+        # Delivered transfers add to the receiving warehouse, so those items hold more than their home quantity.
+        extra = {}
+        for (_, item_id), quantity in received.items():
+            extra[item_id] = extra.get(item_id, 0) + quantity
+        if extra:
+            db.execute(
+                update(models.InventoryItem.__table__)
+                .where(models.InventoryItem.id == bindparam("item"))
+                .values(quantity=models.InventoryItem.quantity + bindparam("extra")),
+                [{"item": item_id, "extra": quantity} for item_id, quantity in sorted(extra.items())],
+            )
+            db.commit()
+        aggregates.rebuild(db)
+        forecasting.rebuild(db)
+        progress(f"done in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+def _reset(engine):
+    with engine.begin() as conn:
+        search.drop_search_objects(conn)
+        models.Base.metadata.drop_all(conn)
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+def _sync_sequences(engine):
+    """Explicit ids leave PostgreSQL sequences behind; move them past the generated rows."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table in ("warehouses", "suppliers", "items", "shipments", "stock_movements"):
+            conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}"))
+
+def load(url: str, suppliers: int, items: int, shipments: int, seed: int = 42, batch_size: int = 10000, reset: bool = False, progress=print,
+         warehouses: int = 1):
+    """Migrate the database at `url`, fill it with `generate` and refresh search indexes and planner statistics."""
+    engine = create_engine(url, **engine_config.engine_kwargs(url))
+    engine_config.install_connect_hooks(engine)
+    try:
+        if reset:
+            _reset(engine)
+        run_migrations(bind=engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        with session_factory() as db:
+            if db.query(models.InventoryItem.id).first() or db.query(models.Supplier.id).first():
+                raise ValueError("Target database already has data; pass --reset to replace it")
+        # Search triggers would fire once per row; the index is rebuilt in one pass afterwards instead.
+        with engine.begin() as conn:
+            search.drop_search_objects(conn)
+        # The rebuilds invalidate cached analytics of the target database, not of DATABASE_URL.
+        with cache.versions_in(engine):
+            generate(session_factory, suppliers, items, shipments, seed, batch_size, progress, warehouses)
+        with engine.begin() as conn:
+            search.create_search_objects(conn)
+            conn.execute(text("ANALYZE"))
+        _sync_sequences(engine)
+    finally:
+        engine.dispose()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a large synthetic warehouse dataset offline.")
+    parser.add_argument("--database-url", default=SQLALCHEMY_DATABASE_URL, help="Target database (default: DATABASE_URL).")
+    parser.add_argument("--warehouses", type=int, default=5, help="Warehouses, including the default one.")
+    parser.add_argument("--suppliers", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--shipments", type=int, default=500000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate the schema first.")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.warehouses < 1:
+            raise ValueError("--warehouses must be at least 1")
+        load(args.database_url, args.suppliers, args.items, args.shipments, args.seed, args.batch_size, args.reset,
+             warehouses=args.warehouses)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
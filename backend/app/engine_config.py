@@ -0,0 +1,95 @@
+# backend/app/engine_config.py
+import os
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Engine and connection tuning, driven entirely by environment variables so the
+# same build can run on a laptop (SQLite) and on Render (PostgreSQL).
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+# --- Pool Settings (PostgreSQL and file-backed SQLite) ---
+POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)          # seconds to wait for a free connection
+POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)        # seconds before a connection is replaced
+POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+# --- PostgreSQL Session Settings ---
+STATEMENT_TIMEOUT_MS = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)  # 0 disables the timeout
+APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "warehouse-api")
+
+# --- SQLite PRAGMAs ---
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+SQLITE_CACHE_SIZE = _env_int("SQLITE_CACHE_SIZE", -20000)       # negative values are KiB
+SQLITE_MMAP_SIZE = _env_int("SQLITE_MMAP_SIZE", 268435456)
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and (":memory:" in url or url.rstrip("/").endswith("sqlite:"))
+
+def connect_args(url: str) -> Dict:
+    """DBAPI connect arguments for the driver named in `url`."""
+    if _is_sqlite(url):
+        return {"check_same_thread": False}
+    if url.startswith("postgresql+asyncpg"):
+        settings = {"application_name": APPLICATION_NAME}
+        if STATEMENT_TIMEOUT_MS:
+            settings["statement_timeout"] = str(STATEMENT_TIMEOUT_MS)
+        return {"server_settings": settings}
+    if url.startswith("postgres"):
+        args = {"application_name": APPLICATION_NAME}
+        if STATEMENT_TIMEOUT_MS:
+            args["options"] = f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"
+        return args
+    return {}
+
+def engine_kwargs(url: str) -> Dict:
+    """Keyword arguments for `create_engine` / `create_async_engine`."""
+    kwargs = {"connect_args": connect_args(url), "pool_pre_ping": POOL_PRE_PING}
+    # In-memory SQLite uses a single shared connection, so pool sizing does not apply.
+    if not _is_memory_sqlite(url):
+        kwargs.update(
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+        )
+    return kwargs
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply WAL and cache PRAGMAs to every new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+def install_connect_hooks(engine: Engine) -> Engine:
+    """Register per-dialect connect hooks; pass `async_engine.sync_engine` for async engines."""
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+def pool_status(engine: Engine) -> Dict:
+    """Current pool usage, for health checks and metrics."""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    for metric in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, metric):
+            status[metric] = getattr(pool, metric)()
+    if "size" in status:
+        status["max_overflow"] = MAX_OVERFLOW
+    return status
@@ -0,0 +1,162 @@
+# backend/app/events.py
+import asyncio
+import importlib.util
+import itertools
+import json
+import logging
+import os
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import event, make_url, text
+from sqlalchemy.orm import Session
+
+from .database import SQLALCHEMY_DATABASE_URL
+
+# Change feed behind /events. Write paths call `emit` inside their transaction;
+# events are published once the session commits and dropped on rollback. One
+# in-process broadcaster fans them out to per-subscriber bounded queues. On
+# PostgreSQL, `emit` issues pg_notify instead (also delivered only on commit)
+# and every worker LISTENs, so subscribers see writes from every API worker,
+# job worker and CLI.
+
+logger = logging.getLogger(__name__)
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 256))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+# auto picks postgres on a PostgreSQL database (asyncpg required), else none. With none, events stay in
+# the process that wrote them: subscribers miss writes made by other API workers, job workers and CLIs.
+EVENTS_BRIDGE = os.getenv("EVENTS_BRIDGE", "auto")  # auto | postgres | none
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "warehouse_events")
+LOW_STOCK_THRESHOLD = int(os.getenv("LOW_STOCK_THRESHOLD", 10))
+
+_PENDING = "pending_events"
+
+def _resolve_bridge(setting: str) -> str:
+    if setting != "auto":
+        return setting
+    if make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() != "postgresql":
+        return "none"
+    if importlib.util.find_spec("asyncpg") is None:
+        logger.warning("asyncpg is not installed; /events only sees writes made by this process")
+        return "none"
+    return "postgres"
+
+BRIDGE = _resolve_bridge(EVENTS_BRIDGE)
+
+class Broadcaster:
+    """
+    Fans events out to subscriber queues on the event loop that serves them.
+    A subscriber that falls `queue_size` events behind has its backlog replaced
+    by a single `resync` event, telling it to refetch rather than buffering
+    without bound.
+    """
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ids = itertools.count(1)
+        self._listener = None
+
+    def subscribe(self) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if BRIDGE == "postgres" and (self._listener is None or self._listener.done()):
+            self._listener = self._loop.create_task(_listen(self))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event_type: str, data: dict):
+        """Deliver an event to every subscriber; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(event_type, data)
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, event_type, data)
+        except RuntimeError:
+            pass  # The serving loop has shut down.
+
+    def _deliver(self, event_type: str, data: dict):
+        message = {"id": next(self._ids), "type": event_type, "data": data}
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"id": message["id"], "type": "resync", "data": {}})
+
+broadcaster = Broadcaster()
+
+# --- Publishing From Write Paths ---
+
+def emit(db: Session, event_type: str, **data):
+    """Queue an event to publish when `db` commits; it is discarded if the transaction rolls back."""
+    if BRIDGE == "postgres" and db.get_bind().dialect.name == "postgresql":
+        payload = json.dumps({"type": event_type, "data": data}, default=str)
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": EVENTS_CHANNEL, "payload": payload})
+        return
+    db.info.setdefault(_PENDING, []).append((event_type, data))
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session):
+    for event_type, data in session.info.pop(_PENDING, []):
+        broadcaster.publish(event_type, data)
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+def emit_quantity_change(db: Session, item_id: int, previous: int, quantity: int):
+    """Emit `item.quantity_changed`, plus `item.low_stock` when the change crosses below LOW_STOCK_THRESHOLD."""
+    if previous == quantity:
+        return
+    emit(db, "item.quantity_changed", id=item_id, quantity=quantity, delta=quantity - previous)
+    if quantity < LOW_STOCK_THRESHOLD <= previous:
+        emit(db, "item.low_stock", id=item_id, quantity=quantity, threshold=LOW_STOCK_THRESHOLD)
+
+# --- Postgres LISTEN/NOTIFY Bridge ---
+
+async def _listen(target: Broadcaster):
+    """Relay NOTIFY payloads from every worker into this worker's broadcaster, reconnecting on failure."""
+    # Imported lazily so asyncpg is only required when the bridge is enabled.
+    import asyncpg
+    from .database import engine
+
+    dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+    def relay(connection, pid, channel, payload):
+        message = json.loads(payload)
+        target.publish(message["type"], message["data"])
+
+    while target._subscribers:
+        try:
+            connection = await asyncpg.connect(dsn)
+            try:
+                await connection.add_listener(EVENTS_CHANNEL, relay)
+                while target._subscribers and not connection.is_closed():
+                    await asyncio.sleep(EVENTS_HEARTBEAT_SECONDS)
+            finally:
+                await connection.close()
+        except (OSError, asyncpg.PostgresError):
+            await asyncio.sleep(1)
+
+# --- Wire Formats ---
+
+def matches(message: dict, types: Optional[Iterable[str]]) -> bool:
+    """Whether a subscriber filtering on type prefixes (e.g. `item.`, `shipment.status_changed`) wants `message`."""
+    return not types or message["type"] == "resync" or any(message["type"].startswith(prefix) for prefix in types)
+
+def format_sse(message: dict) -> str:
+    return f"id: {message['id']}\nevent: {message['type']}\ndata: {json.dumps(message['data'], default=str)}\n\n"
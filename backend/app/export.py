@@ -0,0 +1,89 @@
+# backend/app/export.py
+
+import csv
+import io
+import json
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .database import SessionLocal
+
+# Media types for the supported export formats.
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Relations that are expanded one level further when a parent relation is exported.
+_NESTED_RELATIONS = {"item": ("supplier",)}
+
+def row_to_dict(obj, relations: Iterable[str] = (), keys: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Convert an ORM object's columns, or just `keys` in that order, and any
+    named, loaded relations into a plain dict.
+    """
+    keys = [column.key for column in obj.__table__.columns] if keys is None else keys
+    row = {key: getattr(obj, key) for key in keys}
+    for relation in relations:
+        related = getattr(obj, relation)
+        row[relation] = None if related is None else row_to_dict(related, _NESTED_RELATIONS.get(relation, ()))
+    return row
+
+def csv_columns(model, relations: Iterable[str] = (), prefix: str = "") -> List[str]:
+    """Dotted CSV header for a model's columns plus those of the named relations."""
+    columns = [f"{prefix}{column.key}" for column in model.__table__.columns]
+    for relation in relations:
+        related_model = model.__mapper__.relationships[relation].mapper.class_
+        columns += csv_columns(related_model, _NESTED_RELATIONS.get(relation, ()), f"{prefix}{relation}.")
+    return columns
+
+def _flatten(row: Dict, prefix: str = "") -> Dict:
+    """Flatten nested relation dicts into dotted CSV column names, e.g. `supplier.name`."""
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def _encode_ndjson(rows: Iterator[Dict], columns: List[str]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, default=str) + "\n"
+
+def _encode_csv(rows: Iterator[Dict], columns: List[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(_flatten(row))
+        # Flush roughly every 64 KiB so memory stays flat regardless of table size
+        if buffer.tell() >= 65536:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def encode_rows(objs: Iterable, fmt: str, model, relations: Iterable[str] = ()) -> Iterator[str]:
+    """
+    Encode ORM objects as rows of `model` (with the named relations) as NDJSON
+    or CSV text chunks. Objects of a table sharing its columns, such as archived
+    shipments, are written with `model`'s columns only, in its order.
+    """
+    relations = tuple(relations)
+    keys = [column.key for column in model.__table__.columns]
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    return encode((row_to_dict(obj, relations, keys) for obj in objs), csv_columns(model, relations))
+
+def stream_export(query_factory: Callable, fmt: str, model, relations: Iterable[str] = ()) -> Iterator[str]:
+    """
+    Stream the rows of `query_factory(db)` encoded as NDJSON or CSV.
+
+    The generator opens its own session because it keeps running after the
+    endpoint has returned, when request-scoped dependencies may already be closed.
+    """
+    db = SessionLocal()
+    try:
+        yield from encode_rows(query_factory(db), fmt, model, relations)
+    finally:
+        db.close()
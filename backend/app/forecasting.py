@@ -0,0 +1,157 @@
+# backend/app/forecasting.py
+"""
+Fit per-item demand rates and reorder points from shipment history.
+
+    python -m app.forecasting refresh    # fold in the days since the last refresh (run daily, e.g. from cron)
+    python -m app.forecasting rebuild    # refit every item from FORECAST_HISTORY_DAYS of history
+
+Demand is the quantity of dispatched shipments per item and delivery date;
+transfers between warehouses move stock rather than consume it and are left out.
+Each item keeps an exponentially weighted mean and variance of its daily demand
+in item_forecasts, so a refresh only reads the shipments of the days since the
+last one and advances every item's averages at once with NumPy. Shipments
+added or edited for days already folded in are picked up by the next rebuild.
+"""
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from . import cache, crud, models
+from .database import SessionLocal, run_migrations
+
+FORECAST_HISTORY_DAYS = int(os.getenv("FORECAST_HISTORY_DAYS", 180))
+# Smoothing span: recent days weigh most, a day FORECAST_SPAN_DAYS back about a seventh as much.
+FORECAST_SPAN_DAYS = int(os.getenv("FORECAST_SPAN_DAYS", 28))
+# Days between placing a reorder and the stock arriving.
+FORECAST_LEAD_TIME_DAYS = float(os.getenv("FORECAST_LEAD_TIME_DAYS", 7))
+# Standard deviations of lead-time demand held as safety stock (1.65 ~ 95% service level).
+FORECAST_SERVICE_Z = float(os.getenv("FORECAST_SERVICE_Z", 1.65))
+
+def _alpha() -> float:
+    return 2.0 / (FORECAST_SPAN_DAYS + 1)
+
+def demand_matrix(db: Session, item_ids: np.ndarray, start: date, end: date) -> np.ndarray:
+    """
+    Units shipped per item (rows, in sorted `item_ids` order) and day from
+    `start` through `end` (columns), summed in the database and scattered with NumPy.
+    """
+    matrix = np.zeros((len(item_ids), (end - start).days + 1))
+    models_to_read = [models.Shipment]
+    if crud.archive_needed(db, start_date=start):
+        models_to_read.append(models.ShipmentArchive)
+    for model in models_to_read:
+        rows = (
+            db.query(model.item_id, model.estimated_delivery_date, func.sum(model.quantity))
+            .filter(
+                model.item_id.isnot(None),
+                model.status.in_(crud.DISPATCHED_STATUSES),
+                model.destination_warehouse_id.is_(None),
+                model.estimated_delivery_date.between(start, end),
+                model.quantity > 0,
+            )
+            .group_by(model.item_id, model.estimated_delivery_date)
+            .all()
+        )
+        if not rows or not len(item_ids):
+            continue
+        shipped_items, days, quantities = zip(*rows)
+        shipped_items = np.array(shipped_items, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(item_ids, shipped_items), len(item_ids) - 1)
+        known = item_ids[positions] == shipped_items
+        offsets = np.array([(day - start).days for day in days])
+        np.add.at(matrix, (positions[known], offsets[known]), np.array(quantities, dtype=np.float64)[known])
+    return matrix
+
+def advance(mean: np.ndarray, variance: np.ndarray, demand: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Fold each day (column) of `demand` into every item's weighted mean and variance."""
+    alpha = _alpha()
+    for day in demand.T:
+        difference = day - mean
+        increment = alpha * difference
+        mean = mean + increment
+        variance = (1 - alpha) * (variance + difference * increment)
+    return mean, variance
+
+def reorder_points(mean: np.ndarray, variance: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Safety stock and reorder point: expected lead-time demand plus FORECAST_SERVICE_Z deviations of it."""
+    safety_stock = FORECAST_SERVICE_Z * np.sqrt(variance * FORECAST_LEAD_TIME_DAYS)
+    return safety_stock, mean * FORECAST_LEAD_TIME_DAYS + safety_stock
+
+def _item_ids(db: Session) -> np.ndarray:
+    return np.array([item_id for (item_id,) in db.query(models.InventoryItem.id).order_by(models.InventoryItem.id)], dtype=np.int64)
+
+def _store(db: Session, item_ids: np.ndarray, mean: np.ndarray, variance: np.ndarray, through: date):
+    """Replace item_forecasts with the given state in one transaction."""
+    safety_stock, reorder_point = reorder_points(mean, variance)
+    db.execute(delete(models.ItemForecast))
+    if len(item_ids):
+        db.execute(insert(models.ItemForecast), [
+            {"item_id": item_id, "daily_demand": item_mean, "demand_variance": item_variance,
+             "safety_stock": item_safety, "reorder_point": item_reorder, "computed_through": through}
+            for item_id, item_mean, item_variance, item_safety, item_reorder
+            in zip(item_ids.tolist(), mean.tolist(), variance.tolist(), safety_stock.tolist(), reorder_point.tolist())
+        ])
+        crud.update_days_of_cover(db)
+    db.commit()
+    cache.invalidate(cache.ANALYTICS)
+
+def rebuild(db: Session, today: Optional[date] = None) -> date:
+    """Refit every item from the last FORECAST_HISTORY_DAYS complete days; returns the last day covered."""
+    through = (today or date.today()) - timedelta(days=1)
+    item_ids = _item_ids(db)
+    start = through - timedelta(days=FORECAST_HISTORY_DAYS - 1)
+    mean, variance = advance(np.zeros(len(item_ids)), np.zeros(len(item_ids)), demand_matrix(db, item_ids, start, through))
+    _store(db, item_ids, mean, variance, through)
+    return through
+
+def refresh(db: Session, today: Optional[date] = None) -> date:
+    """
+    Fold the complete days since the last refresh into the stored averages;
+    items added since start from zero demand. Rebuilds when nothing is stored yet.
+    """
+    through = (today or date.today()) - timedelta(days=1)
+    stored = db.query(
+        models.ItemForecast.item_id, models.ItemForecast.daily_demand,
+        models.ItemForecast.demand_variance, models.ItemForecast.computed_through,
+    ).all()
+    if not stored:
+        return rebuild(db, today)
+    last = min(row.computed_through for row in stored)
+    if last >= through:
+        return last
+
+    item_ids = _item_ids(db)
+    stored_ids = np.array([row.item_id for row in stored], dtype=np.int64)
+    positions = np.searchsorted(item_ids, stored_ids)
+    kept = positions < len(item_ids)
+    kept[kept] = item_ids[positions[kept]] == stored_ids[kept]
+    mean, variance = np.zeros(len(item_ids)), np.zeros(len(item_ids))
+    mean[positions[kept]] = np.array([row.daily_demand for row in stored])[kept]
+    variance[positions[kept]] = np.array([row.demand_variance for row in stored])[kept]
+
+    mean, variance = advance(mean, variance, demand_matrix(db, item_ids, last + timedelta(days=1), through))
+    _store(db, item_ids, mean, variance, through)
+    return through
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Refresh or rebuild the per-item demand forecasts.")
+    parser.add_argument("command", choices=["refresh", "rebuild"])
+    args = parser.parse_args(argv)
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        through = refresh(db) if args.command == "refresh" else rebuild(db)
+        print(f"Forecasts for {db.query(models.ItemForecast).count()} item(s) cover shipments through {through}.")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
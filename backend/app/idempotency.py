@@ -0,0 +1,163 @@
+# backend/app/idempotency.py
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from . import models
+from .database import SessionLocal
+
+# Retry-safe writes: a POST, PUT or DELETE sent with an Idempotency-Key header
+# runs once. Its response is stored in idempotency_keys and replayed, with
+# Idempotent-Replayed: true, to any retry carrying the same key. A key reused
+# for a different method, path or body gets 422; a retry that arrives while
+# the first request is still running gets 409. Server errors are not stored,
+# so those requests can be retried. Keys expire after IDEMPOTENCY_TTL_SECONDS.
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 3600))
+# How often each worker deletes expired keys, piggybacked on a stored response.
+IDEMPOTENCY_EVICT_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_EVICT_INTERVAL_SECONDS", 300))
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENT_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+# Response headers stored with the body; CORS and timing headers are added again on replay.
+STORED_HEADERS = (b"content-type", b"etag", b"location")
+
+_last_eviction = 0.0
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def fingerprint(method: str, path: str, query: bytes, body: bytes) -> str:
+    """Hash of what makes two requests the same request."""
+    digest = hashlib.sha256(f"{method} {path}?".encode())
+    digest.update(query)
+    digest.update(b"\n")
+    digest.update(body)
+    return digest.hexdigest()
+
+def claim(key: str, request_fingerprint: str) -> Optional[models.IdempotencyKey]:
+    """
+    Record `key` as in flight and return None, or return the existing row when
+    the key is already taken. An expired row is replaced.
+    """
+    with SessionLocal() as db:
+        cutoff = _now() - timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)
+        db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key == key, models.IdempotencyKey.created_at < cutoff).delete()
+        db.add(models.IdempotencyKey(key=key, fingerprint=request_fingerprint, created_at=_now()))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+        existing = db.get(models.IdempotencyKey, key)
+        # Evicted between the insert and the read: report it as in flight rather than run the write twice.
+        return existing or models.IdempotencyKey(key=key, fingerprint=request_fingerprint)
+
+def complete(key: str, status_code: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+    """Store the response of the request that claimed `key`."""
+    stored = [[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers if name.lower() in STORED_HEADERS]
+    with SessionLocal() as db:
+        db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key == key).update(
+            {"status_code": status_code, "headers": json.dumps(stored), "body": body}, synchronize_session=False
+        )
+        db.commit()
+    global _last_eviction
+    if time.monotonic() - _last_eviction >= IDEMPOTENCY_EVICT_INTERVAL_SECONDS:
+        _last_eviction = time.monotonic()
+        evict_expired()
+
+def release(key: str):
+    """Forget `key` so the request can be retried, after it failed without a storable response."""
+    with SessionLocal() as db:
+        db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key == key).delete(synchronize_session=False)
+        db.commit()
+
+def evict_expired() -> int:
+    """Delete keys older than IDEMPOTENCY_TTL_SECONDS; returns how many were removed."""
+    cutoff = _now() - timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)
+    with SessionLocal() as db:
+        removed = db.query(models.IdempotencyKey).filter(models.IdempotencyKey.created_at < cutoff).delete(synchronize_session=False)
+        db.commit()
+    return removed
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+class IdempotencyMiddleware:
+    """ASGI middleware that runs a write carrying an Idempotency-Key once and replays its response to retries."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            return await self.app(scope, receive, send)
+        key = Headers(scope=scope).get("idempotency-key")
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return await JSONResponse({"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"}, status_code=400)(scope, receive, send)
+
+        body = await _read_body(receive)
+        request_fingerprint = fingerprint(scope["method"], scope["path"], scope.get("query_string", b""), body)
+        existing = await run_in_threadpool(claim, key, request_fingerprint)
+        if existing is not None:
+            return await self._replay(existing, request_fingerprint, scope, receive, send)
+
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": None, "headers": [], "body": []}
+
+        async def send_capturing(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_capturing)
+        except BaseException:
+            await run_in_threadpool(release, key)
+            raise
+        if response["status"] is None or response["status"] >= 500:
+            await run_in_threadpool(release, key)
+        else:
+            await run_in_threadpool(complete, key, response["status"], response["headers"], b"".join(response["body"]))
+
+    async def _replay(self, existing: models.IdempotencyKey, request_fingerprint: str, scope, receive, send):
+        if existing.fingerprint != request_fingerprint:
+            response = JSONResponse({"detail": "Idempotency-Key was already used for a different request"}, status_code=422)
+        elif existing.status_code is None:
+            response = JSONResponse({"detail": "A request with this Idempotency-Key is still in progress"}, status_code=409)
+        else:
+            headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(existing.headers or "[]")]
+            headers += [(b"content-length", str(len(existing.body or b"")).encode()), (b"idempotent-replayed", b"true")]
+            await send({"type": "http.response.start", "status": existing.status_code, "headers": headers})
+            await send({"type": "http.response.body", "body": existing.body or b""})
+            return
+        await response(scope, receive, send)
@@ -0,0 +1,253 @@
+# backend/app/index_advisor.py
+"""
+Index advisor: seed a scratch database with a large synthetic dataset, run
+every read query crud.py emits, EXPLAIN each one and flag full table scans.
+
+    python -m app.index_advisor                       # scratch SQLite file
+    python -m app.index_advisor --database-url postgresql://localhost/advisor --items 200000
+
+The target database is dropped and recreated, so never point it at real data.
+Exits with status 1 when an unbounded sequential scan is found.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from . import aggregates, cache, crud, engine_config, forecasting, jobs, models, projections, schemas, search
+
+# Small tables that are expected to be scanned in full.
+SMALL_TABLES = {"category_stock", "daily_shipment_totals"}
+
+CATEGORIES = ["Electronics", "Office Supplies", "Hardware", "Apparel", "Groceries"]
+STATUSES = ["Pending", "In Transit", "Delivered", "Delayed"]
+WAREHOUSES = 5
+
+# --- Dataset ---
+
+def seed(session_factory, suppliers: int, items: int, shipments: int, batch_size: int = 10000):
+    """Insert a synthetic dataset with executemany batches, then rebuild the summary tables."""
+    rng = random.Random(42)
+    today = date.today()
+    db = session_factory()
+    try:
+        def insert_rows(model, rows):
+            for start in range(0, len(rows), batch_size):
+                db.execute(insert(model), rows[start:start + batch_size])
+
+        insert_rows(models.Warehouse, [{"id": i, "name": f"Warehouse {i}"} for i in range(1, WAREHOUSES + 1)])
+        insert_rows(models.Supplier, [
+            {"id": i, "name": f"Supplier {i}", "email": f"supplier{i}@example.com"} for i in range(1, suppliers + 1)
+        ])
+        insert_rows(models.InventoryItem, [
+            {"id": i, "name": f"Item {i}", "quantity": rng.randint(0, 500), "category": rng.choice(CATEGORIES),
+             "price": round(rng.uniform(1, 1000), 2), "supplier_id": rng.randint(1, suppliers)}
+            for i in range(1, items + 1)
+        ])
+        insert_rows(models.WarehouseStock, [
+            {"warehouse_id": rng.randint(1, WAREHOUSES), "item_id": i, "quantity": rng.randint(0, 500)} for i in range(1, items + 1)
+        ])
+        insert_rows(models.Shipment, [
+            {"id": i, "item_id": rng.randint(1, items), "quantity": rng.randint(1, 50), "origin": "Warehouse A",
+             "destination": "Warehouse B", "status": rng.choice(STATUSES),
+             "estimated_delivery_date": today + timedelta(days=rng.randint(-365, 30)),
+             "origin_warehouse_id": rng.randint(1, WAREHOUSES), "destination_warehouse_id": rng.choice([None, None, None, 2])}
+            for i in range(1, shipments + 1)
+        ])
+        insert_rows(models.ShipmentArchive, [
+            {"id": shipments + i, "item_id": rng.randint(1, items), "quantity": rng.randint(1, 50), "origin": "Warehouse A",
+             "destination": "Warehouse B", "status": "Delivered", "estimated_delivery_date": today - timedelta(days=rng.randint(366, 1095))}
+            for i in range(1, shipments + 1)
+        ])
+        db.commit()
+        aggregates.rebuild(db)
+        forecasting.rebuild(db)
+    finally:
+        db.close()
+
+# --- Workloads ---
+
+def _first_batch(query):
+    """Execute a streaming export query and read only its first row."""
+    for _ in query:
+        break
+
+def _second_page(list_keyset, sort: str):
+    def run(db):
+        _, cursor = list_keyset(db, cursor="", limit=50, sort=sort)
+        list_keyset(db, cursor=cursor, limit=50, sort=sort)
+    return run
+
+def _with_archive(start_date: date):
+    def run(db):
+        filters = schemas.ShipmentFilters(start_date=start_date, include_archived=True)
+        archive = crud.ArchivePart(models.ShipmentArchive, crud.shipment_criteria(db, filters, models.ShipmentArchive))
+        rows = projections.row_query(projections.full(models.Shipment), always_load=("id",))
+        crud.get_shipments_keyset(db, cursor="", limit=50, criteria=crud.shipment_criteria(db, filters), rows=rows, archive=archive)
+    return run
+
+def workloads() -> Dict[str, Callable]:
+    """Every read path in crud.py, with representative arguments."""
+    today = date.today()
+    return {
+        "get_item": lambda db: crud.get_item(db, item_id=1),
+        "get_items": lambda db: crud.get_items(db, skip=0, limit=100),
+        "get_items sort=name": lambda db: crud.get_items(db, limit=100, sort="name"),
+        "get_items_keyset": _second_page(crud.get_items_keyset, "id"),
+        "get_items_keyset sort=category": _second_page(crud.get_items_keyset, "category"),
+        "get_supplier": lambda db: crud.get_supplier(db, supplier_id=1),
+        "get_suppliers sort=name": lambda db: crud.get_suppliers(db, limit=100, sort="name"),
+        "get_suppliers_keyset": _second_page(crud.get_suppliers_keyset, "id"),
+        "get_shipment": lambda db: crud.get_shipment(db, shipment_id=1),
+        "get_shipments": lambda db: crud.get_shipments(db, limit=100),
+        "get_shipments_keyset sort=-estimated_delivery_date": _second_page(crud.get_shipments_keyset, "-estimated_delivery_date"),
+        "get_shipments include_archived": _with_archive(today - timedelta(days=400)),
+        "archive_needed": lambda db: crud.archive_needed(db, start_date=today - timedelta(days=30)),
+        "get_shipments rows": lambda db: crud.get_shipments(db, limit=100, rows=projections.row_query(projections.full(models.Shipment))),
+        "count_rows": lambda db: crud.count_rows(db, models.Shipment),
+        "get_items q=": lambda db: crud.get_items(db, limit=20, criteria=crud.item_criteria(db, schemas.InventoryItemFilters(q="Item 12"))),
+        "get_items filters": lambda db: crud.get_items(db, limit=100, criteria=crud.item_criteria(
+            db, schemas.InventoryItemFilters(category="Hardware", min_quantity=10, max_quantity=20))),
+        "get_suppliers q=": lambda db: crud.get_suppliers(db, limit=20, criteria=crud.supplier_criteria(db, schemas.SupplierFilters(q="supplier4"))),
+        "get_shipments filters": lambda db: crud.get_shipments(db, limit=100, criteria=crud.shipment_criteria(
+            db, schemas.ShipmentFilters(status="Delayed", start_date=today - timedelta(days=7), end_date=today))),
+        "get_warehouse_stock": lambda db: crud.get_warehouse_stock(
+            db, 2, limit=100, rows=projections.row_query(projections.full(models.WarehouseStock))),
+        "get_warehouse_stock max_quantity": lambda db: crud.get_warehouse_stock(db, 2, limit=100, max_quantity=5),
+        "get_warehouse_shipments": lambda db: crud.get_warehouse_shipments(
+            db, 2, limit=100, rows=projections.row_query(projections.full(models.Shipment))),
+        "get_stock_movements": lambda db: crud.get_stock_movements(db, item_id=1, limit=100),
+        "jobs get_jobs status": lambda db: jobs.get_jobs(db, status=jobs.QUEUED, limit=100),
+        "get_low_stock_items": lambda db: crud.get_low_stock_items(db, threshold=10),
+        "get_stockout_alerts": lambda db: crud.get_stockout_alerts(db, days=14, limit=100),
+        "forecasting demand_matrix": lambda db: forecasting.demand_matrix(
+            db, forecasting._item_ids(db), today - timedelta(days=1), today - timedelta(days=1)),
+        "get_stock_by_category": lambda db: crud.get_stock_by_category(db),
+        "get_daily_shipments": lambda db: crud.get_daily_shipments(db, start_date=today - timedelta(days=30), end_date=today, status="Pending"),
+        "iter_items category": lambda db: _first_batch(crud.iter_items(db, category="Hardware")),
+        "iter_items supplier_id": lambda db: _first_batch(crud.iter_items(db, supplier_id=1)),
+        "iter_shipments window": lambda db: _first_batch(crud.iter_shipments(db, start_date=today - timedelta(days=7), end_date=today)),
+        "iter_shipments status": lambda db: _first_batch(crud.iter_shipments(db, status="Delayed")),
+    }
+
+def capture_statements(engine, session_factory) -> List[Tuple[str, str, object]]:
+    """Run each workload and record the SELECT statements it sends to the database."""
+    captured: List[Tuple[str, str, object]] = []
+    current = {"name": None}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            captured.append((current["name"], statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for name, run in workloads().items():
+            current["name"] = name
+            db = session_factory()
+            try:
+                run(db)
+            finally:
+                db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return captured
+
+# --- Plan Analysis ---
+
+def _sqlite_scans(conn, statement: str, parameters) -> Tuple[List[str], List[str]]:
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    details = [row[-1] for row in rows]
+    scans = []
+    for detail in details:
+        match = re.match(r"SCAN (\w+)", detail)
+        if match and "INDEX" not in detail:
+            scans.append(match.group(1))
+    return scans, details
+
+def _postgres_scans(conn, statement: str, parameters) -> Tuple[List[str], List[str]]:
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans, details = [], []
+
+    def walk(node, depth=0):
+        details.append("  " * depth + node["Node Type"] + (f" on {node['Relation Name']}" if "Relation Name" in node else ""))
+        if node["Node Type"] == "Seq Scan":
+            scans.append(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(plan[0]["Plan"])
+    return scans, details
+
+def _is_bounded(statement: str, details: List[str]) -> bool:
+    """A LIMIT without a sort step stops the scan early, so it is not a full-table read."""
+    return bool(re.search(r"\bLIMIT\b", statement, re.I)) and not any("TEMP B-TREE" in d or d.strip() == "Sort" for d in details)
+
+def analyse(engine, captured) -> List[Dict]:
+    """EXPLAIN each distinct captured statement and report the tables it scans in full."""
+    explain = _postgres_scans if engine.dialect.name == "postgresql" else _sqlite_scans
+    findings, seen = [], set()
+    with engine.connect() as conn:
+        for workload, statement, parameters in captured:
+            if statement in seen:
+                continue
+            seen.add(statement)
+            scans, details = explain(conn, statement, parameters)
+            flagged = [table for table in scans if table not in SMALL_TABLES]
+            findings.append({
+                "workload": workload,
+                "statement": " ".join(statement.split()),
+                "plan": details,
+                "sequential_scans": flagged if not _is_bounded(statement, details) else [],
+            })
+    return findings
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN every crud.py query against a seeded dataset and flag sequential scans.")
+    parser.add_argument("--database-url", help="Scratch database (recreated). Defaults to a temporary SQLite file.")
+    parser.add_argument("--suppliers", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--shipments", type=int, default=200000)
+    parser.add_argument("--verbose", action="store_true", help="Print the plan of every statement.")
+    args = parser.parse_args(argv)
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'index_advisor.db')}"
+    engine = create_engine(url, **engine_config.engine_kwargs(url))
+    engine_config.install_connect_hooks(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        search.drop_search_objects(conn)
+        search.create_search_objects(conn)
+    print(f"Seeding {args.suppliers} suppliers, {args.items} items, {args.shipments} shipments...")
+    # No API serves the scratch database, so its rebuilds skip cache invalidation.
+    with cache.versions_in(None):
+        seed(session_factory, args.suppliers, args.items, args.shipments)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    findings = analyse(engine, capture_statements(engine, session_factory))
+    flagged = [finding for finding in findings if finding["sequential_scans"]]
+    for finding in findings:
+        if finding["sequential_scans"] or args.verbose:
+            marker = "SEQ SCAN " + ", ".join(finding["sequential_scans"]) if finding["sequential_scans"] else "ok"
+            print(f"\n[{marker}] {finding['workload']}\n  {finding['statement']}")
+            for line in finding["plan"]:
+                print(f"    {line}")
+    print(f"\n{len(findings)} statements explained, {len(flagged)} with sequential scans.")
+    engine.dispose()
+    return 1 if flagged else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+# backend/app/inference.py
+"""
+CPU image inference for /predict_image/.
+
+    python -m app.inference build                       # index INFERENCE_REFERENCE_DIR into INFERENCE_INDEX_PATH
+    python -m app.inference build --reference-dir photos --output reference_index.npz
+
+Uploads are decoded and resized on a bounded thread pool (Pillow and NumPy
+release the GIL for the heavy parts), then concurrent requests are grouped
+into one model call by a micro-batcher. The model is either an ONNX
+classifier (INFERENCE_ONNX_MODEL + INFERENCE_LABELS, requires onnxruntime)
+or a nearest-neighbour index over reference photos of catalogue products,
+laid out as INFERENCE_REFERENCE_DIR/<product name>/<image>. `build` matches
+those folders to items in the catalogue by name, describes every photo by
+its colour and edge-orientation histograms, and saves the index so workers
+load it instead of decoding the photos. Without any model,
+predictions have no product (`product_name` null) and say why; set
+INFERENCE_REQUIRE_MODEL to answer 503 instead.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", min(4, os.cpu_count() or 1)))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", 16))
+INFERENCE_BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", 5))
+INFERENCE_IMAGE_SIZE = int(os.getenv("INFERENCE_IMAGE_SIZE", 64))
+INFERENCE_REFERENCE_DIR = os.getenv(
+    "INFERENCE_REFERENCE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "reference_images")
+)
+INFERENCE_INDEX_PATH = os.getenv(
+    "INFERENCE_INDEX_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "reference_index.npz")
+)
+INFERENCE_REQUIRE_MODEL = os.getenv("INFERENCE_REQUIRE_MODEL", "false").lower() in ("1", "true", "yes")
+INFERENCE_ONNX_MODEL = os.getenv("INFERENCE_ONNX_MODEL", "")
+INFERENCE_LABELS = os.getenv("INFERENCE_LABELS", "")
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", 10 * 1024 * 1024))
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", 40_000_000))
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", 64))
+
+class ImageError(ValueError):
+    """An upload that could not be decoded as an image."""
+
+class ModelUnavailable(RuntimeError):
+    """No model is configured."""
+
+# --- Preprocessing ---
+
+def load_image(source: Union[str, BinaryIO], size: int) -> np.ndarray:
+    """Decode `source` into a size x size RGB float32 array scaled to [0, 1]."""
+    try:
+        with Image.open(source) as image:
+            if image.width * image.height > MAX_IMAGE_PIXELS:
+                raise ImageError("Image dimensions are too large")
+            # JPEG decoders can downscale while decoding, which skips most of the work.
+            image.draft("RGB", (size, size))
+            resized = image.convert("RGB").resize((size, size), Image.Resampling.BILINEAR)
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ImageError("Could not decode image") from exc
+    return np.asarray(resized, dtype=np.float32) / 255.0
+
+# --- Features ---
+
+# Bumped whenever extract_features changes, so stale saved indexes are rebuilt rather than compared.
+FEATURE_VERSION = 1
+HUE_BINS, SATURATION_BINS = 12, 4
+ORIENTATION_BINS = 9
+# Edge histograms are taken over the whole image and over each quarter: coarse enough to tolerate framing.
+GRID_LEVELS = (1, 2)
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-6)
+
+def _colour_histograms(images: np.ndarray) -> np.ndarray:
+    """
+    Hue/saturation histogram per image, weighted by saturation, so grey and
+    white backgrounds count for little and lighting changes do not move pixels between bins.
+    """
+    red, green, blue = images[..., 0], images[..., 1], images[..., 2]
+    value = images.max(axis=-1)
+    chroma = value - images.min(axis=-1)
+    saturation = chroma / np.maximum(value, 1e-6)
+    safe_chroma = np.maximum(chroma, 1e-6)
+    hue = np.where(value == red, ((green - blue) / safe_chroma) % 6,
+                   np.where(value == green, (blue - red) / safe_chroma + 2, (red - green) / safe_chroma + 4)) / 6
+    bins = (np.minimum((hue * HUE_BINS).astype(np.int64), HUE_BINS - 1) * SATURATION_BINS
+            + np.minimum((saturation * SATURATION_BINS).astype(np.int64), SATURATION_BINS - 1))
+    size = HUE_BINS * SATURATION_BINS
+    offsets = np.arange(len(images)).reshape(-1, 1, 1) * size
+    histograms = np.bincount((bins + offsets).ravel(), weights=(saturation * saturation).ravel(), minlength=len(images) * size)
+    return _normalise(np.sqrt(histograms.reshape(len(images), size)).astype(np.float32))
+
+def _gradient_histograms(images: np.ndarray, cells: int) -> np.ndarray:
+    """Magnitude-weighted edge orientation histograms over a cells x cells grid (HOG-style): the product's outline."""
+    grey = images @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    gx = np.zeros_like(grey)
+    gy = np.zeros_like(grey)
+    gx[:, :, 1:-1] = grey[:, :, 2:] - grey[:, :, :-2]
+    gy[:, 1:-1, :] = grey[:, 2:, :] - grey[:, :-2, :]
+    magnitude = np.hypot(gx, gy)
+    orientation = np.minimum((np.arctan2(gy, gx) % np.pi / np.pi * ORIENTATION_BINS).astype(np.int64), ORIENTATION_BINS - 1)
+    count, height, width = grey.shape
+    rows = np.arange(height) * cells // height
+    cols = np.arange(width) * cells // width
+    size = cells * cells * ORIENTATION_BINS
+    bins = orientation + (rows.reshape(-1, 1) * cells + cols.reshape(1, -1)) * ORIENTATION_BINS + np.arange(count).reshape(-1, 1, 1) * size
+    histograms = np.bincount(bins.ravel(), weights=magnitude.ravel(), minlength=count * size)
+    histograms = _normalise(histograms.reshape(count, cells * cells, ORIENTATION_BINS))
+    return _normalise(histograms.reshape(count, size).astype(np.float32))
+
+def extract_features(images: np.ndarray) -> np.ndarray:
+    """
+    L2-normalised colour and shape descriptors for a batch of size x size RGB
+    images, so a dot product is cosine similarity. On photos of catalogue
+    products moved, rescaled and relit within the frame, they match far more
+    reliably than comparing raw pixels.
+    """
+    shape = _normalise(np.concatenate([_gradient_histograms(images, cells) for cells in GRID_LEVELS], axis=1))
+    return _normalise(np.concatenate([_colour_histograms(images), shape], axis=1))
+
+# --- Models ---
+
+class NearestNeighbourModel:
+    """Labels an image with the product of its most similar reference image."""
+
+    def __init__(self, labels: Sequence[str], embeddings: np.ndarray, image_size: int, item_ids: Optional[Dict[str, int]] = None):
+        self.labels = list(labels)
+        self.embeddings = embeddings
+        self.image_size = image_size
+        # Catalogue item id per label, for labels matched to an item by `build`.
+        self.item_ids = item_ids or {}
+
+    @classmethod
+    def from_directory(cls, path: str, image_size: int = INFERENCE_IMAGE_SIZE,
+                       catalogue: Optional[Dict[str, Tuple[int, str]]] = None) -> Optional["NearestNeighbourModel"]:
+        """
+        Index the photos under `path`, one folder per product. With `catalogue`
+        (casefolded item name -> (id, name)), folders are labelled with the
+        matching item's name and id.
+        """
+        if not os.path.isdir(path):
+            return None
+        labels, images, item_ids = [], [], {}
+        for folder in sorted(os.listdir(path)):
+            label_dir = os.path.join(path, folder)
+            if not os.path.isdir(label_dir):
+                continue
+            label = folder
+            if catalogue and folder.casefold() in catalogue:
+                item_id, label = catalogue[folder.casefold()]
+                item_ids[label] = item_id
+            for filename in sorted(os.listdir(label_dir)):
+                try:
+                    images.append(load_image(os.path.join(label_dir, filename), image_size))
+                except ImageError:
+                    continue
+                labels.append(label)
+        if not images:
+            return None
+        return cls(labels, extract_features(np.stack(images)), image_size, item_ids)
+
+    def save(self, path: str):
+        labels = sorted(self.item_ids)
+        np.savez(path, feature_version=FEATURE_VERSION, image_size=self.image_size, labels=np.array(self.labels),
+                 embeddings=self.embeddings, item_labels=np.array(labels, dtype=str),
+                 item_ids=np.array([self.item_ids[label] for label in labels], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path: str) -> Optional["NearestNeighbourModel"]:
+        """The index saved at `path`, or None when it is missing or was built by another FEATURE_VERSION."""
+        if not os.path.isfile(path):
+            return None
+        with np.load(path, allow_pickle=False) as index:
+            if int(index["feature_version"]) != FEATURE_VERSION:
+                return None
+            item_ids = dict(zip(index["item_labels"].tolist(), index["item_ids"].tolist()))
+            return cls(index["labels"].tolist(), index["embeddings"], int(index["image_size"]), item_ids)
+
+    def predict(self, images: np.ndarray) -> List[Tuple[str, float]]:
+        scores = extract_features(images) @ self.embeddings.T
+        best = scores.argmax(axis=1)
+        return [(self.labels[index], max(float(scores[row, index]), 0.0)) for row, index in enumerate(best)]
+
+class OnnxModel:
+    """An ONNX image classifier taking NCHW float input, run on the CPU provider."""
+
+    _MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    _STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+    def __init__(self, model_path: str, labels_path: str):
+        # Imported lazily so onnxruntime is only required when a model is configured.
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = INFERENCE_WORKERS
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        height = model_input.shape[2]
+        self.image_size = height if isinstance(height, int) else INFERENCE_IMAGE_SIZE
+        with open(labels_path) as labels_file:
+            self.labels = [line.strip() for line in labels_file if line.strip()]
+        self.item_ids: Dict[str, int] = {}
+
+    def predict(self, images: np.ndarray) -> List[Tuple[str, float]]:
+        batch = ((images - self._MEAN) / self._STD).transpose(0, 3, 1, 2).astype(np.float32)
+        logits = self.session.run(None, {self.input_name: batch})[0]
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        return [(self.labels[index], float(probabilities[row, index])) for row, index in enumerate(best)]
+
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+def _load_model():
+    if INFERENCE_ONNX_MODEL:
+        return OnnxModel(INFERENCE_ONNX_MODEL, INFERENCE_LABELS)
+    # A built index loads without decoding a photo; otherwise the reference photos are indexed in memory.
+    return NearestNeighbourModel.load(INFERENCE_INDEX_PATH) or NearestNeighbourModel.from_directory(INFERENCE_REFERENCE_DIR)
+
+def get_model():
+    """The configured model, loaded on first use; None when nothing is configured."""
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                _model = _load_model()
+                _model_loaded = True
+    return _model
+
+def set_model(model):
+    """Swap the model, e.g. for one built from in-memory reference images."""
+    global _model, _model_loaded
+    with _model_lock:
+        _model, _model_loaded = model, True
+
+# --- Micro-batching ---
+
+executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+
+class MicroBatcher:
+    """Collects concurrent submissions and runs them as one call on the executor.
+
+    A batch is dispatched once it holds `max_batch` items or `max_wait` seconds
+    after its first item arrived, whichever comes first.
+    """
+
+    def __init__(self, run_batch: Callable[[list], list], max_batch: int, max_wait: float):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run(self._queue))
+
+    async def submit(self, item):
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _run(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                results = await loop.run_in_executor(executor, self.run_batch, [item for item, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+def _predict_batch(images: List[np.ndarray]) -> List[Tuple[str, float]]:
+    return get_model().predict(np.stack(images))
+
+batcher = MicroBatcher(_predict_batch, INFERENCE_MAX_BATCH, INFERENCE_BATCH_WAIT_MS / 1000)
+
+NO_MODEL_DETAIL = "No image model is configured; add reference photos and run `python -m app.inference build`"
+
+async def predict(source: BinaryIO) -> dict:
+    """Identify the product in an image file without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    model = _model if _model_loaded else await loop.run_in_executor(executor, get_model)
+    if model is None:
+        if INFERENCE_REQUIRE_MODEL:
+            raise ModelUnavailable(NO_MODEL_DETAIL)
+        # The upload is still decoded, so a file that is not an image gets 400 either way.
+        await loop.run_in_executor(executor, load_image, source, INFERENCE_IMAGE_SIZE)
+        return {"product_name": None, "item_id": None, "confidence": 0.0, "detail": NO_MODEL_DETAIL}
+    image = await loop.run_in_executor(executor, load_image, source, model.image_size)
+    product_name, confidence = await batcher.submit(image)
+    return {"product_name": product_name, "item_id": model.item_ids.get(product_name), "confidence": round(confidence, 4)}
+
+# --- Index Build ---
+
+def load_catalogue() -> Dict[str, Tuple[int, str]]:
+    """Item names from the database, casefolded, mapped to (id, name); the lowest id wins for duplicate names."""
+    # Imported lazily so serving predictions needs no database session.
+    from . import models
+    from .database import SessionLocal
+
+    catalogue: Dict[str, Tuple[int, str]] = {}
+    with SessionLocal() as db:
+        for item_id, name in db.query(models.InventoryItem.id, models.InventoryItem.name).order_by(models.InventoryItem.id):
+            catalogue.setdefault(name.casefold(), (item_id, name))
+    return catalogue
+
+def build(reference_dir: str = INFERENCE_REFERENCE_DIR, output: str = INFERENCE_INDEX_PATH,
+          catalogue: Optional[Dict[str, Tuple[int, str]]] = None) -> dict:
+    """Index the reference photos against the catalogue and save the index to `output`."""
+    catalogue = load_catalogue() if catalogue is None else catalogue
+    model = NearestNeighbourModel.from_directory(reference_dir, INFERENCE_IMAGE_SIZE, catalogue)
+    if model is None:
+        raise ValueError(f"No decodable reference photos under {reference_dir}")
+    model.save(output)
+    labels = set(model.labels)
+    return {
+        "photos": len(model.labels),
+        "products": len(labels),
+        "matched_items": len(model.item_ids),
+        "unmatched_folders": sorted(labels - set(model.item_ids)),
+        "items_without_photos": len(catalogue) - len(model.item_ids),
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build the reference photo index used by /predict_image/.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--reference-dir", default=INFERENCE_REFERENCE_DIR)
+    parser.add_argument("--output", default=INFERENCE_INDEX_PATH)
+    args = parser.parse_args(argv)
+
+    try:
+        report = build(args.reference_dir, args.output)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Indexed {report['photos']} photo(s) of {report['products']} product(s) into {args.output}; "
+          f"{report['matched_items']} matched catalogue items, {report['items_without_photos']} item(s) have no photos.")
+    if report["unmatched_folders"]:
+        print("Folders not matching any item name: " + ", ".join(report["unmatched_folders"]))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
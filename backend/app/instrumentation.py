@@ -0,0 +1,282 @@
+# backend/app/instrumentation.py
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from . import engine_config
+
+# Per-request timings and SQL counts. Cursor listeners on the engines add each
+# statement's time to the current request's stats (a context variable, which
+# follows the request into the threadpool); the ASGI middleware turns them into
+# a Server-Timing header and Prometheus metrics served at /metrics. Metrics are
+# per process, so scrape each worker.
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 10))  # identical statements per request
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+class RequestStats:
+    """Database and serialization time accumulated while serving one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.statements: Counter = Counter()
+        self.endpoint_returned: Optional[float] = None
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+# --- Metrics ---
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+class _Metric:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        self._lock = threading.Lock()
+
+class CounterMetric(_Metric):
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+class HistogramMetric(_Metric):
+    def __init__(self, name, help_text, labels=(), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            counts = self._counts.setdefault(labels, [0] * (len(self.buckets) + 1))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[labels] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        label_names = self.label_names + ("le",)
+        with self._lock:
+            for labels, counts in sorted(self._counts.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{self.name}_bucket{_labels(label_names, labels + (le,))} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {self._sums[labels]:.6f}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+REQUESTS = CounterMetric("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+REQUEST_LATENCY = HistogramMetric("http_request_duration_seconds", "Time to first response byte by route.", ("method", "route"))
+SERIALIZATION = HistogramMetric("http_serialization_duration_seconds", "Response encoding time by route.", ("method", "route"))
+REQUEST_QUERIES = HistogramMetric("http_request_db_queries", "SQL statements per request by route.", ("method", "route"), QUERY_COUNT_BUCKETS)
+QUERY_LATENCY = HistogramMetric("db_query_duration_seconds", "SQL statement execution time.")
+SLOW_QUERIES = CounterMetric("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.")
+N_PLUS_ONE = CounterMetric("db_n_plus_one_total", "Requests that repeated one statement at least N_PLUS_ONE_THRESHOLD times.", ("method", "route"))
+
+_METRICS = [REQUESTS, REQUEST_LATENCY, SERIALIZATION, REQUEST_QUERIES, QUERY_LATENCY, SLOW_QUERIES, N_PLUS_ONE]
+_engines: Dict[str, Engine] = {}
+
+def render_metrics() -> str:
+    """All metrics, plus current connection pool usage, in the Prometheus text format."""
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for gauge in ("size", "checkedout", "overflow"):
+        name = f"db_pool_{gauge}"
+        lines += [f"# HELP {name} Connection pool {gauge} per engine.", f"# TYPE {name} gauge"]
+        for engine_name, engine in _engines.items():
+            status = engine_config.pool_status(engine)
+            if gauge in status:
+                lines.append(f'{name}{{engine="{engine_name}"}} {status[gauge]}')
+    return "\n".join(lines) + "\n"
+
+# --- SQL Listeners ---
+
+def _format_parameters(parameters, executemany: bool) -> str:
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    text = repr(parameters)
+    return text if len(text) <= 500 else text[:500] + "..."
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    QUERY_LATENCY.observe(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        if not executemany:
+            stats.statements[statement] += 1
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        logger.warning("Slow query (%.1f ms): %s | parameters: %s", elapsed * 1000, " ".join(statement.split()),
+                       _format_parameters(parameters, executemany))
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute.
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+def install(engine: Engine, name: str = "sync") -> Engine:
+    """Time every statement on `engine` (pass `async_engine.sync_engine` for async engines) and report its pool."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    _engines[name] = engine
+    return engine
+
+# --- Serialization Timing ---
+
+@contextmanager
+def serializing():
+    """Count the enclosed block as serialization time for the current request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current.get()
+        if stats is not None:
+            stats.serialize_seconds += time.perf_counter() - started
+
+def _mark_return(endpoint):
+    """Record when the endpoint returns; everything the route does after that is response serialization."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            _returned()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            _returned()
+            return result
+    return timed
+
+def _returned():
+    stats = _current.get()
+    if stats is not None:
+        stats.endpoint_returned = time.perf_counter()
+
+class InstrumentedRoute(APIRoute):
+    """Route class that attributes the time between the endpoint returning and the response being built to serialization."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _mark_return(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            stats = _current.get()
+            if stats is not None and stats.endpoint_returned is not None:
+                stats.serialize_seconds += time.perf_counter() - stats.endpoint_returned
+                stats.endpoint_returned = None
+            return response
+
+        return timed_handler
+
+# --- Middleware ---
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label so arbitrary URLs cannot grow the metric set.
+    return getattr(route, "path", None) or "unmatched"
+
+def _server_timing(stats: RequestStats, total: float) -> bytes:
+    return (f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+            f'serialize;dur={stats.serialize_seconds * 1000:.1f}, total;dur={total * 1000:.1f}').encode()
+
+class InstrumentationMiddleware:
+    """ASGI middleware that times each HTTP request, adds Server-Timing and records route metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = {"code": 500, "latency": None}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                status["latency"] = time.perf_counter() - stats.started
+                if SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(stats, status["latency"])))
+                    headers.append((b"timing-allow-origin", b"*"))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._record(scope, stats, status)
+
+    def _record(self, scope, stats: RequestStats, status: Dict):
+        method, route = scope["method"], _route_label(scope)
+        latency = status["latency"] if status["latency"] is not None else time.perf_counter() - stats.started
+        REQUESTS.inc(method, route, str(status["code"]))
+        REQUEST_LATENCY.observe(latency, method, route)
+        SERIALIZATION.observe(stats.serialize_seconds, method, route)
+        REQUEST_QUERIES.observe(stats.queries, method, route)
+        if stats.statements:
+            statement, repeats = stats.statements.most_common(1)[0]
+            if repeats >= N_PLUS_ONE_THRESHOLD:
+                N_PLUS_ONE.inc(method, route)
+                logger.warning("Possible N+1 on %s %s: statement ran %d times: %s", method, route, repeats, " ".join(statement.split()))
@@ -0,0 +1,522 @@
+# backend/app/jobs.py
+"""
+Run imports, exports and rebuilds in the background, outside API requests.
+
+    python -m app.jobs worker                     # run queued jobs until stopped, JOBS_CONCURRENCY at a time
+    python -m app.jobs worker --concurrency 4 --once   # run what is runnable now, then exit
+    python -m app.jobs evict                      # delete finished jobs older than JOBS_RETENTION_DAYS
+
+Jobs are rows in the jobs table, submitted through /jobs. A worker claims the
+oldest runnable job with a single UPDATE ... RETURNING. On PostgreSQL the
+candidate is selected FOR UPDATE SKIP LOCKED, so any number of workers share
+the queue without waiting on each other. SQLite runs one writer at a time, so
+the same statement is safe there without row locks. Idle workers poll every
+JOBS_POLL_SECONDS on both. A job that raises is retried with exponential
+backoff until it has run max_attempts times. While a worker is alive it
+heartbeats its running jobs. If it stops for JOBS_STALE_SECONDS, another
+worker puts those jobs back in the queue.
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from . import aggregates, archive, cache, crud, export, ledger, models, schemas
+from .database import SessionLocal, run_migrations
+
+logger = logging.getLogger(__name__)
+
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", 2))
+JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", 1))
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", 3))
+# Delay before the first retry; each later retry waits twice as long.
+JOBS_RETRY_BACKOFF_SECONDS = float(os.getenv("JOBS_RETRY_BACKOFF_SECONDS", 30))
+JOBS_HEARTBEAT_SECONDS = float(os.getenv("JOBS_HEARTBEAT_SECONDS", 10))
+JOBS_STALE_SECONDS = float(os.getenv("JOBS_STALE_SECONDS", 60))
+# Minimum time between progress writes of one job.
+JOBS_PROGRESS_INTERVAL_SECONDS = float(os.getenv("JOBS_PROGRESS_INTERVAL_SECONDS", 1))
+JOBS_RETENTION_DAYS = int(os.getenv("JOBS_RETENTION_DAYS", 7))
+JOBS_EVICT_INTERVAL_SECONDS = float(os.getenv("JOBS_EVICT_INTERVAL_SECONDS", 3600))
+# Export jobs allowed to run at once across all workers; imports and rebuilds run one at a time per kind.
+JOBS_EXPORT_LIMIT = int(os.getenv("JOBS_EXPORT_LIMIT", 2))
+# Worker threads started inside each API process (0 = run `python -m app.jobs worker` separately).
+JOBS_EMBEDDED_WORKERS = int(os.getenv("JOBS_EMBEDDED_WORKERS", 0))
+# Rows validated and inserted per transaction by import jobs.
+JOBS_IMPORT_CHUNK_ROWS = int(os.getenv("JOBS_IMPORT_CHUNK_ROWS", crud.BULK_CHUNK_SIZE))
+# Size of the job_result_chunks rows exports are written to and streamed back from.
+JOBS_RESULT_CHUNK_BYTES = int(os.getenv("JOBS_RESULT_CHUNK_BYTES", 1024 * 1024))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED_STATUSES = (SUCCEEDED, FAILED)
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class JobFailed(Exception):
+    """Raised by a job for a failure that retrying cannot fix, such as a malformed upload."""
+
+class JobLost(Exception):
+    """The job was put back in the queue (its worker looked stale) and may now run elsewhere."""
+
+class JobResult(NamedTuple):
+    body: Optional[bytes]  # None when the output was written with store_chunks
+    media_type: str
+
+def json_result(value) -> JobResult:
+    return JobResult(json.dumps(value, default=str).encode(), "application/json")
+
+# --- Job Kinds ---
+
+class JobKind(NamedTuple):
+    run: Callable[[Session, models.Job, BaseModel, "Progress"], Optional[JobResult]]
+    params: Type[BaseModel]
+    max_running: int  # Across all workers, checked when a job is claimed
+    invalidates: Tuple[str, ...]  # Cache namespaces bumped once a run ends
+
+KINDS: Dict[str, JobKind] = {}
+
+def register(kind: str, params: Type[BaseModel] = schemas.NoJobParams, max_running: int = 1, invalidates: Tuple[str, ...] = ()):
+    """
+    Register a function `run(db, job, params, progress)` as the handler of a job kind.
+    `invalidates` lists the response cache namespaces whose data the job writes.
+    """
+    def decorator(run):
+        KINDS[kind] = JobKind(run, params, max_running, invalidates)
+        return run
+    return decorator
+
+# --- Queue ---
+
+def submit(db: Session, kind: str, params: Optional[dict] = None, payload: Optional[bytes] = None,
+           max_attempts: Optional[int] = None) -> models.Job:
+    """Queue a job after validating its parameters; raises ValueError for an unknown kind or bad parameters."""
+    spec = KINDS.get(kind)
+    if spec is None:
+        raise ValueError(f"Unknown job kind '{kind}'; expected one of: {', '.join(sorted(KINDS))}")
+    if max_attempts is not None and max_attempts < 1:
+        raise ValueError("max_attempts must be at least 1")
+    try:
+        validated = spec.params.model_validate(params or {})
+    except ValidationError as e:
+        raise ValueError("; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+    now = _now()
+    job = models.Job(kind=kind, params=validated.model_dump(mode="json"), payload=payload, status=QUEUED, attempts=0,
+                     max_attempts=max_attempts or JOBS_MAX_ATTEMPTS, run_after=now, created_at=now)
+    db.add(job)
+    db.commit()
+    return job
+
+def get_job(db: Session, job_id: int) -> Optional[models.Job]:
+    return db.get(models.Job, job_id)
+
+def get_jobs(db: Session, status: Optional[str] = None, kind: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[models.Job]:
+    """Jobs, newest first."""
+    query = db.query(models.Job)
+    if status is not None:
+        query = query.filter(models.Job.status == status)
+    if kind is not None:
+        query = query.filter(models.Job.kind == kind)
+    return query.order_by(models.Job.id.desc()).offset(skip).limit(limit).all()
+
+def load_result(db: Session, job_id: int) -> Optional[bytes]:
+    return db.query(models.Job.result).filter(models.Job.id == job_id).scalar()
+
+def has_result_chunks(db: Session, job_id: int) -> bool:
+    return db.query(models.JobResultChunk.seq).filter(models.JobResultChunk.job_id == job_id).first() is not None
+
+def iter_result_chunks(job_id: int) -> Iterator[bytes]:
+    """
+    Yield a job's stored output one chunk at a time. The generator opens its own
+    session because it keeps running after the endpoint has returned.
+    """
+    chunk = models.JobResultChunk
+    db = SessionLocal()
+    try:
+        # One row fetched at a time, so only the chunk being sent is held in memory.
+        for (data,) in db.query(chunk.data).filter(chunk.job_id == job_id).order_by(chunk.seq).yield_per(1):
+            yield data
+    finally:
+        db.close()
+
+def store_chunks(job_id: int, pieces: Iterable[bytes]) -> int:
+    """
+    Write `pieces` to job_result_chunks in JOBS_RESULT_CHUNK_BYTES rows, replacing
+    those of an earlier attempt; returns the number of rows. Each row commits in
+    its own session, so the job's read session keeps its cursor and SQLite's
+    write lock is held only briefly.
+    """
+    chunk = models.JobResultChunk
+    with SessionLocal() as db:
+        db.execute(delete(chunk).where(chunk.job_id == job_id))
+        db.commit()
+        buffer, seq = bytearray(), 0
+        for piece in pieces:
+            buffer += piece
+            while len(buffer) >= JOBS_RESULT_CHUNK_BYTES:
+                db.add(chunk(job_id=job_id, seq=seq, data=bytes(buffer[:JOBS_RESULT_CHUNK_BYTES])))
+                db.commit()
+                del buffer[:JOBS_RESULT_CHUNK_BYTES]
+                seq += 1
+        # An empty output still gets one row, so it is served as an empty file.
+        if buffer or seq == 0:
+            db.add(chunk(job_id=job_id, seq=seq, data=bytes(buffer)))
+            db.commit()
+            seq += 1
+    return seq
+
+def requeue_stale(db: Session) -> int:
+    """Put running jobs whose worker stopped heartbeating back in the queue, or fail them if out of attempts."""
+    cutoff = _now() - timedelta(seconds=JOBS_STALE_SECONDS)
+    stale = [models.Job.status == RUNNING, models.Job.heartbeat_at < cutoff]
+    error = "Worker stopped responding"
+    failed = db.execute(
+        update(models.Job).where(*stale, models.Job.attempts >= models.Job.max_attempts)
+        .values(status=FAILED, error=error, worker=None, finished_at=_now())
+    ).rowcount
+    requeued = db.execute(
+        update(models.Job).where(*stale).values(status=QUEUED, error=error, worker=None, run_after=_now())
+    ).rowcount
+    db.commit()
+    return failed + requeued
+
+def claim(db: Session, worker: str) -> Optional[models.Job]:
+    """
+    Mark the oldest runnable job as running on `worker` and return it, or None.
+    Kinds at their max_running limit are skipped; two workers claiming at the
+    same instant can briefly exceed a limit by one.
+    """
+    requeue_stale(db)
+    running = dict(db.query(models.Job.kind, func.count()).filter(models.Job.status == RUNNING).group_by(models.Job.kind))
+    kinds = [kind for kind, spec in KINDS.items() if running.get(kind, 0) < spec.max_running]
+    if not kinds:
+        return None
+    now = _now()
+    candidate = aliased(models.Job)
+    next_id = (
+        select(candidate.id)
+        .where(candidate.status == QUEUED, candidate.run_after <= now, candidate.kind.in_(kinds))
+        .order_by(candidate.run_after, candidate.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    job = db.execute(
+        update(models.Job)
+        .where(models.Job.id == next_id, models.Job.status == QUEUED)
+        .values(status=RUNNING, worker=worker, attempts=models.Job.attempts + 1, started_at=now, heartbeat_at=now,
+                progress=None, message=None)
+        .returning(models.Job)
+    ).scalar_one_or_none()
+    db.commit()
+    return job
+
+def heartbeat(worker: str):
+    with SessionLocal() as db:
+        db.execute(update(models.Job).where(models.Job.worker == worker, models.Job.status == RUNNING).values(heartbeat_at=_now()))
+        db.commit()
+
+def evict_finished(db: Session) -> int:
+    """Delete succeeded and failed jobs that finished more than JOBS_RETENTION_DAYS ago; returns how many."""
+    cutoff = _now() - timedelta(days=JOBS_RETENTION_DAYS)
+    expired = [models.Job.status.in_(FINISHED_STATUSES), models.Job.finished_at < cutoff]
+    db.execute(delete(models.JobResultChunk).where(models.JobResultChunk.job_id.in_(select(models.Job.id).where(*expired))))
+    removed = db.execute(delete(models.Job).where(*expired)).rowcount
+    db.commit()
+    return removed
+
+def _owned(job: models.Job, worker: str) -> list:
+    """Criteria matching `job` only while it is still running on `worker`."""
+    return [models.Job.id == job.id, models.Job.worker == worker, models.Job.status == RUNNING]
+
+class Progress:
+    """
+    Reports a running job's progress. Calls write in their own short transaction,
+    at most every JOBS_PROGRESS_INTERVAL_SECONDS, so make them between the job's
+    own write transactions (SQLite allows one writer at a time).
+    """
+
+    def __init__(self, job: models.Job, worker: str):
+        self.job = job
+        self.worker = worker
+        self._last = 0.0
+        self._pending = None
+
+    def __call__(self, fraction: Optional[float] = None, message: Optional[str] = None):
+        if time.monotonic() - self._last < JOBS_PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last = time.monotonic()
+        with SessionLocal() as db:
+            db.execute(update(models.Job).where(*_owned(self.job, self.worker))
+                       .values(progress=fraction, message=message, heartbeat_at=_now()))
+            db.commit()
+
+    def checkpoint_on_commit(self, db: Session, state: Callable[[], dict], fraction: Optional[float] = None,
+                             message: Optional[str] = None):
+        """
+        Open a transaction on `db` and save `state()` as the job's checkpoint
+        when it commits, so a retry resumes exactly after the work that
+        committed. Raises JobLost if the job no longer belongs to this worker.
+        """
+        # Writing first also starts a real transaction on SQLite, where releasing
+        # an outermost SAVEPOINT would otherwise commit part of the work early.
+        owned = update(models.Job).where(*_owned(self.job, self.worker))
+        if db.execute(owned.values(heartbeat_at=_now())).rowcount == 0:
+            raise JobLost(self.job.id)
+        self._pending = (owned, state, fraction, message)
+        if not event.contains(db, "before_commit", self._save_checkpoint):
+            event.listen(db, "before_commit", self._save_checkpoint)
+
+    def _save_checkpoint(self, session: Session):
+        # before_commit also fires when a SAVEPOINT is released; only the outer commit counts.
+        if self._pending is None or session.in_nested_transaction():
+            return
+        owned, state, fraction, message = self._pending
+        self._pending = None
+        session.execute(owned.values(checkpoint=state(), progress=fraction, message=message))
+
+# --- Running Jobs ---
+
+def run_job(job: models.Job, worker: str):
+    """Run a claimed job and record its result, or queue its retry."""
+    spec = KINDS[job.kind]
+    try:
+        with SessionLocal() as db:
+            output = spec.run(db, job, spec.params.model_validate(job.params), Progress(job, worker))
+    except JobLost:
+        logger.warning("Job %s was requeued while running on %s; dropping this run", job.id, worker)
+        return
+    except Exception as e:
+        logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        _record_failure(job, worker, e, retry=not isinstance(e, JobFailed))
+        return
+    finally:
+        # A failed run may already have committed some chunks or batches, so bump after every run.
+        # The versions live in the shared store, which invalidates every API process's entries.
+        cache.invalidate(*spec.invalidates)
+    values = {"status": SUCCEEDED, "progress": 1.0, "error": None, "payload": None, "finished_at": _now(), "heartbeat_at": _now()}
+    if output is not None:
+        values.update(result=output.body, result_media_type=output.media_type)
+    with SessionLocal() as db:
+        db.execute(update(models.Job).where(*_owned(job, worker)).values(**values))
+        db.commit()
+
+def _record_failure(job: models.Job, worker: str, error: Exception, retry: bool):
+    message = str(error) or type(error).__name__
+    if retry and job.attempts < job.max_attempts:
+        backoff = JOBS_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+        values = {"status": QUEUED, "error": message, "worker": None, "run_after": _now() + timedelta(seconds=backoff)}
+    else:
+        values = {"status": FAILED, "error": message, "finished_at": _now()}
+    with SessionLocal() as db:
+        db.execute(update(models.Job).where(*_owned(job, worker)).values(**values))
+        db.commit()
+
+class Worker:
+    """Claims and runs jobs on `concurrency` threads, heartbeating the ones in progress."""
+
+    def __init__(self, concurrency: int = JOBS_CONCURRENCY, name: Optional[str] = None):
+        self.concurrency = concurrency
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = threading.Event()
+        self._runners: List[threading.Thread] = []
+
+    def start(self, once: bool = False) -> "Worker":
+        """Start the worker threads; with `once`, each thread exits when nothing is runnable."""
+        self._runners = [
+            threading.Thread(target=self._run, args=(once,), name=f"jobs-{index}", daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in self._runners:
+            thread.start()
+        threading.Thread(target=self._heartbeat, name="jobs-heartbeat", daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop claiming jobs; jobs already running finish first."""
+        self._stopping.set()
+
+    def join(self):
+        for thread in self._runners:
+            thread.join()
+        self._stopping.set()
+
+    def _run(self, once: bool):
+        while not self._stopping.is_set():
+            try:
+                with SessionLocal() as db:
+                    job = claim(db, self.name)
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job = None
+            if job is None:
+                if once:
+                    return
+                self._stopping.wait(JOBS_POLL_SECONDS)
+                continue
+            run_job(job, self.name)
+
+    def _heartbeat(self):
+        last_eviction = 0.0
+        while not self._stopping.wait(JOBS_HEARTBEAT_SECONDS):
+            try:
+                heartbeat(self.name)
+                if time.monotonic() - last_eviction >= JOBS_EVICT_INTERVAL_SECONDS:
+                    last_eviction = time.monotonic()
+                    with SessionLocal() as db:
+                        evict_finished(db)
+            except Exception:
+                logger.exception("Job heartbeat failed")
+
+# --- Exports ---
+
+def _counted(rows: Iterable, progress: Progress) -> Iterable:
+    for count, row in enumerate(rows, 1):
+        if count % crud.EXPORT_BATCH_SIZE == 0:
+            progress(None, f"{count} rows exported")
+        yield row
+
+def _export(job: models.Job, rows: Iterable, params, model, relations, progress: Progress) -> JobResult:
+    """Encode the rows straight into job_result_chunks, so memory stays flat however large the export."""
+    encoded = export.encode_rows(_counted(rows, progress), params.format, model, relations)
+    store_chunks(job.id, (text.encode() for text in encoded))
+    return JobResult(None, export.EXPORT_MEDIA_TYPES[params.format])
+
+@register("export.items", schemas.ItemExportJobParams, max_running=JOBS_EXPORT_LIMIT)
+def export_items(db: Session, job: models.Job, params: schemas.ItemExportJobParams, progress: Progress) -> JobResult:
+    rows = crud.iter_items(db, category=params.category, supplier_id=params.supplier_id, include_relations=params.include_relations)
+    return _export(job, rows, params, models.InventoryItem, ("supplier",) if params.include_relations else (), progress)
+
+@register("export.shipments", schemas.ShipmentExportJobParams, max_running=JOBS_EXPORT_LIMIT)
+def export_shipments(db: Session, job: models.Job, params: schemas.ShipmentExportJobParams, progress: Progress) -> JobResult:
+    rows = crud.iter_shipments(db, start_date=params.start_date, end_date=params.end_date, status=params.status,
+                               include_relations=params.include_relations, include_archived=params.include_archived)
+    return _export(job, rows, params, models.Shipment, ("item",) if params.include_relations else (), progress)
+
+# --- Imports ---
+
+def _parse_rows(payload: bytes, fmt: str) -> List[dict]:
+    """Decode an uploaded JSON array, NDJSON or CSV file into row dicts; empty CSV cells are left out."""
+    try:
+        text = payload.decode("utf-8-sig")
+        if fmt == "csv":
+            return [{key: value for key, value in row.items() if value not in ("", None)} for row in csv.DictReader(io.StringIO(text))]
+        if fmt == "ndjson":
+            return [json.loads(line) for line in text.splitlines() if line.strip()]
+        rows = json.loads(text)
+    except ValueError as e:
+        raise JobFailed(f"Could not parse the {fmt} upload: {e}")
+    if not isinstance(rows, list):
+        raise JobFailed("A json upload must be an array of rows")
+    return rows
+
+def _import(schema: Type[BaseModel], bulk_create: Callable):
+    """
+    Build a handler that validates and inserts uploaded rows JOBS_IMPORT_CHUNK_ROWS
+    at a time. Each chunk commits with a checkpoint, so a retry skips the chunks already imported.
+    """
+    def run(db: Session, job: models.Job, params: schemas.ImportJobParams, progress: Progress) -> JobResult:
+        payload = db.query(models.Job.payload).filter(models.Job.id == job.id).scalar() or b""
+        raw_rows = _parse_rows(payload, params.format)
+        state = job.checkpoint or {"next_row": 0, "succeeded": 0, "errors": []}
+        options = {"upsert_on": params.upsert_on} if getattr(params, "upsert_on", None) else {}
+        for start in range(state["next_row"], len(raw_rows), JOBS_IMPORT_CHUNK_ROWS):
+            chunk = raw_rows[start:start + JOBS_IMPORT_CHUNK_ROWS]
+            result = schemas.BulkResult(ids=[None] * len(chunk))
+            rows = []
+            for offset, raw in enumerate(chunk):
+                try:
+                    rows.append((offset, schema.model_validate(raw)))
+                except ValidationError as e:
+                    detail = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                    result.errors.append(schemas.BulkRowError(index=offset, detail=detail))
+            end = start + len(chunk)
+
+            def chunk_state(result=result, start=start, end=end):
+                return {
+                    "next_row": end,
+                    "succeeded": state["succeeded"] + sum(1 for new_id in result.ids if new_id is not None),
+                    "errors": state["errors"] + [{"index": start + error.index, "detail": error.detail} for error in result.errors],
+                }
+
+            progress.checkpoint_on_commit(db, chunk_state, end / len(raw_rows), f"{end} of {len(raw_rows)} rows imported")
+            bulk_create(db, rows, result, **options)
+            state = chunk_state()
+        errors = sorted(state["errors"], key=lambda error: error["index"])
+        return json_result({"rows": len(raw_rows), "succeeded": state["succeeded"], "errors": errors})
+    return run
+
+register("import.items", schemas.ImportJobParams, invalidates=crud.ITEM_CACHE_NAMESPACES)(
+    _import(schemas.InventoryItemCreate, crud.bulk_create_items))
+register("import.suppliers", schemas.SupplierImportJobParams, invalidates=crud.SUPPLIER_CACHE_NAMESPACES)(
+    _import(schemas.SupplierCreate, crud.bulk_create_suppliers))
+register("import.shipments", schemas.ImportJobParams, invalidates=crud.SHIPMENT_CACHE_NAMESPACES)(
+    _import(schemas.ShipmentCreate, crud.bulk_create_shipments))
+
+# --- Maintenance ---
+
+@register("aggregates.rebuild", invalidates=(cache.ANALYTICS,))
+def rebuild_aggregates(db: Session, job: models.Job, params: BaseModel, progress: Progress) -> None:
+    aggregates.rebuild(db)
+
+@register("forecasting.refresh", invalidates=(cache.ANALYTICS,))
+def refresh_forecasts(db: Session, job: models.Job, params: BaseModel, progress: Progress) -> JobResult:
+    # Imported lazily so NumPy is only loaded by processes that fit forecasts.
+    from . import forecasting
+
+    return json_result({"computed_through": forecasting.refresh(db)})
+
+@register("forecasting.rebuild", invalidates=(cache.ANALYTICS,))
+def rebuild_forecasts(db: Session, job: models.Job, params: BaseModel, progress: Progress) -> JobResult:
+    from . import forecasting
+
+    return json_result({"computed_through": forecasting.rebuild(db)})
+
+@register("ledger.snapshot")
+def snapshot_ledger(db: Session, job: models.Job, params: BaseModel, progress: Progress) -> JobResult:
+    return json_result({"snapshots": ledger.snapshot(db)})
+
+@register("archive.shipments", schemas.ArchiveJobParams, invalidates=(cache.SHIPMENTS,))
+def archive_shipments(db: Session, job: models.Job, params: schemas.ArchiveJobParams, progress: Progress) -> JobResult:
+    older_than_days = archive.ARCHIVE_AFTER_DAYS if params.older_than_days is None else params.older_than_days
+    return json_result({"archived": archive.archive_shipments(db, older_than_days)})
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run background jobs or clean up finished ones.")
+    parser.add_argument("command", choices=["worker", "evict"])
+    parser.add_argument("--concurrency", type=int, default=JOBS_CONCURRENCY)
+    parser.add_argument("--once", action="store_true", help="Exit once no job is runnable.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run_migrations()
+    if args.command == "evict":
+        with SessionLocal() as db:
+            print(f"{evict_finished(db)} finished job(s) deleted.")
+        return 0
+
+    worker = Worker(args.concurrency)
+    # SIGTERM (e.g. a deploy) stops claiming; running jobs finish before the process exits.
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    worker.start(once=args.once)
+    try:
+        worker.join()
+    except KeyboardInterrupt:
+        worker.stop()
+        worker.join()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
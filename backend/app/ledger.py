@@ -0,0 +1,143 @@
+# backend/app/ledger.py
+"""
+Snapshot and verify the stock movement ledger.
+
+    python -m app.ledger snapshot   # record every item's ledger balance
+    python -m app.ledger verify     # report items and warehouse stock that disagree with the ledger, exit 1 if any
+
+A balance is the item's latest snapshot plus the movements posted after it, so
+replaying the ledger stays cheap however long it grows. Run `snapshot`
+periodically (e.g. nightly from cron). Per-warehouse stock is checked against a
+full replay of each warehouse's movements, and against the item totals.
+"""
+import argparse
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from . import crud, models
+from .database import SessionLocal, run_migrations
+
+def _latest_snapshots(db: Session):
+    latest_ids = db.query(func.max(models.StockSnapshot.id).label("id")).group_by(models.StockSnapshot.item_id).subquery()
+    return (
+        db.query(models.StockSnapshot.item_id, models.StockSnapshot.quantity, models.StockSnapshot.last_movement_id)
+        .join(latest_ids, models.StockSnapshot.id == latest_ids.c.id)
+        .subquery()
+    )
+
+def compute_balances(db: Session, up_to: Optional[int] = None) -> Dict[int, int]:
+    """Replay the ledger, from each item's latest snapshot, into an on-hand quantity per item id."""
+    snapshots = _latest_snapshots(db)
+    balances = {item_id: quantity for item_id, quantity, _ in db.query(snapshots)}
+    movements = (
+        db.query(models.StockMovement.item_id, func.sum(models.StockMovement.quantity_delta))
+        .outerjoin(snapshots, snapshots.c.item_id == models.StockMovement.item_id)
+        .filter(models.StockMovement.id > func.coalesce(snapshots.c.last_movement_id, 0))
+    )
+    if up_to is not None:
+        movements = movements.filter(models.StockMovement.id <= up_to)
+    for item_id, delta in movements.group_by(models.StockMovement.item_id):
+        balances[item_id] = balances.get(item_id, 0) + int(delta)
+    return balances
+
+def verify(db: Session) -> List[str]:
+    """Return a description of every item whose quantity disagrees with its ledger balance."""
+    balances = compute_balances(db)
+    quantities = dict(db.query(models.InventoryItem.id, func.coalesce(models.InventoryItem.quantity, 0)))
+    return [
+        f"items[{item_id}]: quantity={quantities.get(item_id)} ledger={balances.get(item_id, 0)}"
+        for item_id in sorted(set(quantities) | set(balances))
+        if quantities.get(item_id) != balances.get(item_id, 0)
+    ]
+
+def compute_warehouse_balances(db: Session) -> Dict[Tuple[int, int], int]:
+    """Replay the whole ledger into an on-hand quantity per (warehouse_id, item_id)."""
+    warehouse_id = func.coalesce(models.StockMovement.warehouse_id, crud.DEFAULT_WAREHOUSE_ID)
+    rows = (
+        db.query(warehouse_id, models.StockMovement.item_id, func.sum(models.StockMovement.quantity_delta))
+        .group_by(warehouse_id, models.StockMovement.item_id)
+    )
+    return {(warehouse, item_id): int(total) for warehouse, item_id, total in rows}
+
+def verify_warehouses(db: Session) -> List[str]:
+    """Return a description of every warehouse stock row that disagrees with its ledger or with its item's total quantity."""
+    stock = models.WarehouseStock
+    balances = compute_warehouse_balances(db)
+    quantities = {(warehouse_id, item_id): quantity for warehouse_id, item_id, quantity in db.query(stock.warehouse_id, stock.item_id, stock.quantity)}
+    drift = [
+        f"warehouse_stock[{warehouse_id}, {item_id}]: quantity={quantities.get((warehouse_id, item_id))} ledger={balances.get((warehouse_id, item_id), 0)}"
+        for warehouse_id, item_id in sorted(set(quantities) | set(balances))
+        if quantities.get((warehouse_id, item_id), 0) != balances.get((warehouse_id, item_id), 0)
+    ]
+    totals = dict(db.query(stock.item_id, func.sum(stock.quantity)).group_by(stock.item_id))
+    item_quantities = dict(db.query(models.InventoryItem.id, func.coalesce(models.InventoryItem.quantity, 0)))
+    drift += [
+        f"items[{item_id}]: quantity={item_quantities.get(item_id)} warehouse_total={int(totals.get(item_id) or 0)}"
+        for item_id in sorted(set(item_quantities) | set(totals))
+        if item_quantities.get(item_id) != int(totals.get(item_id) or 0)
+    ]
+    return drift
+
+def _watermark(db: Session) -> int:
+    """
+    The highest movement id such that every movement up to it has committed.
+    On PostgreSQL a transaction can insert a movement, and so draw an id below
+    one that has already committed, and commit it later. A snapshot taken at
+    that max(id) would skip the late movement, and later snapshots would too.
+    A SHARE lock waits for ledger writes in flight and holds new ones back
+    until the max is read; ids drawn after it is released are higher. SQLite
+    runs one writer at a time, so its max(id) is already safe.
+    """
+    locked = db.get_bind().dialect.name == "postgresql"
+    if locked:
+        db.execute(text(f"LOCK TABLE {models.StockMovement.__tablename__} IN SHARE MODE"))
+    last_movement_id = db.query(func.coalesce(func.max(models.StockMovement.id), 0)).scalar()
+    if locked:
+        # Releases the lock: the replay below reads only committed rows at or below the watermark.
+        db.commit()
+    return last_movement_id
+
+def snapshot(db: Session) -> int:
+    """Record the ledger balance of every item whose balance moved since its last snapshot; returns the rows written."""
+    last_movement_id = _watermark(db)
+    snapshots = _latest_snapshots(db)
+    moved = {
+        item_id for (item_id,) in db.query(models.StockMovement.item_id).distinct()
+        .outerjoin(snapshots, snapshots.c.item_id == models.StockMovement.item_id)
+        .filter(models.StockMovement.id > func.coalesce(snapshots.c.last_movement_id, 0))
+        .filter(models.StockMovement.id <= last_movement_id)
+    }
+    balances = compute_balances(db, up_to=last_movement_id)
+    rows = [
+        models.StockSnapshot(item_id=item_id, quantity=balances[item_id], last_movement_id=last_movement_id)
+        for item_id in sorted(moved)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return len(rows)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Snapshot or verify the stock movement ledger.")
+    parser.add_argument("command", choices=["snapshot", "verify"])
+    args = parser.parse_args(argv)
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        if args.command == "snapshot":
+            print(f"{snapshot(db)} item snapshot(s) written.")
+            return 0
+        drift = verify(db)
+        warehouse_drift = verify_warehouses(db)
+        for line in drift + warehouse_drift:
+            print(line)
+        print(f"{len(drift)} item(s) and {len(warehouse_drift)} warehouse stock row(s) disagree with the ledger.")
+        return 1 if drift or warehouse_drift else 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,42 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+from fastapi import FastAPI, Depends, Header, HTTPException, UploadFile, File, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict
-import random
+from pydantic import TypeAdapter, ValidationError
+from typing import List, Dict, Literal, Optional
+from contextlib import asynccontextmanager
+from datetime import date
+import asyncio
+import json
 import os
 
-from . import crud, models, schemas
-from .database import SessionLocal, engine, get_db
+from . import async_crud, cache, crud, engine_config, events, export, idempotency, instrumentation, jobs, models, projections, schemas, startup
+from .database import ASYNC_DATABASE, async_engine, engine, get_db, get_read_db
 
-# Create all database tables
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-worker startup (see app/startup.py) and, if configured, an embedded job worker."""
+    await startup.start(app)
+    # Optionally run a job worker inside each API process (e.g. a single Render service); the queue is shared either way.
+    worker = jobs.Worker(jobs.JOBS_EMBEDDED_WORKERS).start() if jobs.JOBS_EMBEDDED_WORKERS else None
+    yield
+    if worker is not None:
+        worker.stop()
+    await startup.stop()
 
 app = FastAPI(
     title="Warehouse Inventory API",
     description="API for managing warehouse inventory, shipments, and suppliers.",
     version="1.0.0",
+    lifespan=lifespan,
 )
+# Routes record when their endpoint returns, so response serialization can be timed separately.
+app.router.route_class = instrumentation.InstrumentedRoute
+
+# --- Idempotency Middleware ---
+# Added first so it sits innermost: stored responses leave out the CORS and timing headers, which replays get afresh.
+app.add_middleware(idempotency.IdempotencyMiddleware)
 
 # --- CORS Middleware ---
 # A single list for all allowed origins (local and deployed)
@@ -38,14 +59,194 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag", "Server-Timing", "Idempotent-Replayed", "Location"],
 )
 
+# --- Instrumentation Middleware ---
+# Added last so it wraps CORS too: per-route latency, SQL counts and the Server-Timing header.
+app.add_middleware(instrumentation.InstrumentationMiddleware)
+
+# --- Pagination ---
+
+def _paginate(response: Response, db: Session, model, offset_query, keyset_query, skip: int, limit: int,
+              cursor: Optional[str], sort: str, include_total: bool, rows: projections.RowQuery, criteria: list = (),
+              archive: Optional[crud.ArchivePart] = None):
+    """
+    Run a list query in offset mode, or in keyset mode when `cursor` is given
+    (an empty cursor starts from the first page). The next cursor and the
+    optional total are returned as `X-Next-Cursor` / `X-Total-Count` headers.
+    With `archive`, the archived rows are listed and counted too.
+    """
+    extra = {} if archive is None else {"archive": archive}
+    try:
+        if cursor is None:
+            page = offset_query(db, skip=skip, limit=limit, sort=sort, criteria=criteria, rows=rows, **extra)
+        else:
+            page, next_cursor = keyset_query(db, cursor=cursor, limit=limit, sort=sort, criteria=criteria, rows=rows, **extra)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if include_total:
+        total = crud.count_rows(db, model, criteria)
+        if archive is not None:
+            total += crud.count_rows(db, archive.model, archive.criteria)
+        response.headers["X-Total-Count"] = str(total)
+    return page
+
+async def _paginate_async(response: Response, db, model, offset_query, keyset_query, skip: int, limit: int,
+                          cursor: Optional[str], sort: str, include_total: bool, rows: projections.RowQuery, criteria: list = (),
+                          archive: Optional[crud.ArchivePart] = None):
+    """`_paginate` on an AsyncSession, with the `async_crud` list queries."""
+    extra = {} if archive is None else {"archive": archive}
+    try:
+        if cursor is None:
+            page = await offset_query(db, rows, skip=skip, limit=limit, sort=sort, criteria=criteria, **extra)
+        else:
+            page, next_cursor = await keyset_query(db, rows, cursor=cursor, limit=limit, sort=sort, criteria=criteria, **extra)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if include_total:
+        total = await async_crud.count_rows(db, model, criteria)
+        if archive is not None:
+            total += await async_crud.count_rows(db, archive.model, archive.criteria)
+        response.headers["X-Total-Count"] = str(total)
+    return page
+
+async def _read_page(response: Response, db, model, sync_queries: tuple, async_queries: tuple, *args):
+    """
+    One list page: on the async engine when enabled, otherwise `_paginate` in a
+    single threadpool call. `args` are `_paginate`'s arguments after the queries.
+    """
+    if ASYNC_DATABASE:
+        return await _paginate_async(response, db, model, *async_queries, *args)
+    return await run_in_threadpool(_paginate, response, db, model, *sync_queries, *args)
+
+# --- Projections ---
+
+def _projection(model, fields: Optional[str], expand: Optional[str]):
+    """
+    Parse a detail endpoint's `fields=` / `expand=` into a projection and
+    matching loader options, or (None, None) for the full default response.
+    """
+    try:
+        projection = projections.parse(model, fields, expand)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if projection is None:
+        return None, None
+    # The row version is always loaded for the ETag header.
+    return projection, projections.query_options(projection, always_load=("version",))
+
+def _list_rows(model, fields: Optional[str], expand: Optional[str], sort: str = "id") -> projections.RowQuery:
+    """
+    The flat row query a list endpoint selects: the `fields=` / `expand=`
+    projection, or the full response shape. Rows are encoded straight to JSON
+    without building ORM objects or validating them through Pydantic.
+    """
+    try:
+        projection = projections.parse(model, fields, expand) or projections.full(model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return projections.row_query(projection, always_load=(sort.lstrip("-"),))
+
+def _projected_response(obj, projection) -> Response:
+    return Response(content=projections.dumps(projections.to_dict(obj, projection)), media_type="application/json")
+
+# --- Row Versions ---
+
+def _with_version_etag(response: Response, obj) -> Response:
+    """Set `ETag` to the row's version, which a later PUT can send back as If-Match."""
+    response.headers["ETag"] = f'"{obj.version}"'
+    return response
+
+def _expected_version(if_match: Optional[str]) -> Optional[int]:
+    """The version an If-Match header requires, or None for no header or `*`."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip()
+    tag = tag[2:] if tag.startswith("W/") else tag
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=412, detail="If-Match must be a single ETag returned by this API")
+
+# --- Sync/Async Read Dispatch ---
+
+async def _read(db, sync_query, async_query, **kwargs):
+    """Run a read query on the async engine when enabled, otherwise on the threadpool."""
+    if ASYNC_DATABASE:
+        return await async_query(db, **kwargs)
+    return await run_in_threadpool(sync_query, db, **kwargs)
+
+# --- Response Encoders ---
+
+def _json_encoder(response_type):
+    """Build an encoder that validates a query result against `response_type` and dumps it to JSON bytes."""
+    adapter = TypeAdapter(response_type)
+    return lambda result: adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+
+_encode_totals = _json_encoder(Dict[str, int])
+
+# --- Bulk Request Parsing ---
+
+def _bulk_rows(schema):
+    """
+    Build a dependency that parses a bulk request body (a JSON array, or NDJSON
+    when the content type says so) and validates each row independently.
+    Returns the valid `(index, row)` pairs and a result pre-filled with the
+    per-row validation errors.
+    """
+    async def parse(request: Request):
+        body = await request.body()
+        try:
+            if "ndjson" in request.headers.get("content-type", ""):
+                raw_rows = [json.loads(line) for line in body.splitlines() if line.strip()]
+            else:
+                raw_rows = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+        if not isinstance(raw_rows, list):
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+
+        result = schemas.BulkResult(ids=[None] * len(raw_rows))
+        rows = []
+        for index, raw in enumerate(raw_rows):
+            try:
+                rows.append((index, schema.model_validate(raw)))
+            except ValidationError as e:
+                detail = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                result.errors.append(schemas.BulkRowError(index=index, detail=detail))
+        return rows, result
+    return parse
+
 # --- API Endpoints ---
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Warehouse Inventory API"}
 
+@app.get("/health/db", tags=["Health"])
+def database_health():
+    """Report connection pool usage for the sync (and, if enabled, async) engine."""
+    status = {"dialect": engine.dialect.name, "pool": engine_config.pool_status(engine)}
+    if async_engine is not None:
+        status["async_pool"] = engine_config.pool_status(async_engine.sync_engine)
+    return status
+
+@app.get("/health/ready", tags=["Health"])
+def readiness():
+    """200 once this worker has finished starting up and can reach the database, 503 until then."""
+    ready, status = startup.readiness()
+    return JSONResponse(status, status_code=200 if ready else 503)
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+def metrics():
+    """Prometheus metrics for this worker: route latency, SQL counts and time, serialization time and pool usage."""
+    return PlainTextResponse(instrumentation.render_metrics(), media_type="text/plain; version=0.0.4")
+
 # --- Inventory Item Endpoints ---
 
 @app.post("/items/", response_model=schemas.InventoryItem, tags=["Inventory"])
@@ -56,28 +257,67 @@ def create_item(item: schemas.InventoryItemCreate, db: Session = Depends(get_db)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/items/", response_model=List[schemas.InventoryItem], tags=["Inventory"])
-def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Retrieve all inventory items."""
-    items = crud.get_items(db, skip=skip, limit=limit)
-    return items
-
-@app.get("/items/{item_id}", response_model=schemas.InventoryItem, tags=["Inventory"])
-def read_item(item_id: int, db: Session = Depends(get_db)):
-    """Retrieve a single inventory item by ID."""
-    db_item = crud.get_item(db, item_id=item_id)
+@app.post("/items/bulk", response_model=schemas.BulkResult, tags=["Inventory"])
+def bulk_create_items(parsed=Depends(_bulk_rows(schemas.InventoryItemCreate)), db: Session = Depends(get_db)):
+    """Create many inventory items from a JSON array or NDJSON body; failing rows are reported, not fatal."""
+    rows, result = parsed
+    return crud.bulk_create_items(db, rows, result)
+
+@app.get("/items/", response_model=List[schemas.InventoryItemResponse], tags=["Inventory"])
+async def read_items(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    include_total: bool = False,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    filters: schemas.InventoryItemFilters = Depends(),
+    db=Depends(get_read_db),
+):
+    """
+    Retrieve all inventory items, paged by offset or by keyset `cursor`.
+    `fields` and `expand` narrow each row to the listed columns and relations;
+    the remaining parameters filter and search the rows.
+    """
+    rows = _list_rows(models.InventoryItem, fields, expand, sort)
+    return await cache.cached_json_async(
+        request, (cache.ITEMS,),
+        lambda: _read_page(response, db, models.InventoryItem, (crud.get_items, crud.get_items_keyset),
+                           (async_crud.get_items, async_crud.get_items_keyset),
+                           skip, limit, cursor, sort, include_total, rows, crud.item_criteria(db, filters)),
+        rows.encode, response,
+    )
+
+@app.get("/items/{item_id}", response_model=schemas.InventoryItemResponse, tags=["Inventory"])
+async def read_item(item_id: int, response: Response, fields: Optional[str] = None, expand: Optional[str] = None, db=Depends(get_read_db)):
+    """Retrieve a single inventory item by ID, optionally narrowed by `fields` / `expand`."""
+    projection, options = _projection(models.InventoryItem, fields, expand)
+    db_item = await _read(db, crud.get_item, async_crud.get_item, item_id=item_id, options=options)
     if db_item is None:
         raise HTTPException(status_code=404, detail="Item not found")
+    if projection is not None:
+        return _with_version_etag(_projected_response(db_item, projection), db_item)
+    _with_version_etag(response, db_item)
     return db_item
 
 @app.put("/items/{item_id}", response_model=schemas.InventoryItem, tags=["Inventory"])
-def update_item(item_id: int, item: schemas.InventoryItemCreate, db: Session = Depends(get_db)):
-    """Update an existing inventory item."""
+def update_item(item_id: int, item: schemas.InventoryItemCreate, response: Response, if_match: Optional[str] = Header(None),
+                db: Session = Depends(get_db)):
+    """
+    Update an existing inventory item. With `If-Match` set to the ETag of a previous
+    read, the update only applies if nobody has changed it since (412 otherwise).
+    """
     try:
-        db_item = crud.update_item(db, item_id=item_id, item=item)
+        db_item = crud.update_item(db, item_id=item_id, item=item, expected_version=_expected_version(if_match))
         if db_item is None:
             raise HTTPException(status_code=404, detail="Item not found")
+        _with_version_etag(response, db_item)
         return db_item
+    except crud.VersionConflict as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -89,6 +329,23 @@ def delete_item(item_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Item not found")
     return db_item
 
+@app.post("/items/{item_id}/stock_movements", response_model=schemas.StockMovement, tags=["Inventory"])
+def create_stock_movement(item_id: int, movement: schemas.StockMovementCreate, db: Session = Depends(get_db)):
+    """Post a receipt, write-off or correction to an item's stock ledger."""
+    if crud.get_item(db, item_id=item_id) is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    try:
+        return crud.create_stock_movement(db, item_id=item_id, movement=movement)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/items/{item_id}/stock_movements", response_model=List[schemas.StockMovement], tags=["Inventory"])
+def read_stock_movements(item_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """Retrieve an item's stock ledger, newest first."""
+    if crud.get_item(db, item_id=item_id) is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return crud.get_stock_movements(db, item_id=item_id, skip=skip, limit=limit)
+
 
 # --- Supplier Endpoints ---
 
@@ -100,28 +357,74 @@ def create_supplier(supplier: schemas.SupplierCreate, db: Session = Depends(get_
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/suppliers/", response_model=List[schemas.Supplier], tags=["Suppliers"])
-def read_suppliers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Retrieve all suppliers."""
-    suppliers = crud.get_suppliers(db, skip=skip, limit=limit)
-    return suppliers
+@app.post("/suppliers/bulk", response_model=schemas.BulkResult, tags=["Suppliers"])
+def bulk_create_suppliers(
+    upsert_on: Optional[Literal["name", "email"]] = None,
+    parsed=Depends(_bulk_rows(schemas.SupplierCreate)),
+    db: Session = Depends(get_db),
+):
+    """Create many suppliers; with `upsert_on`, rows matching an existing name/email update it instead."""
+    rows, result = parsed
+    try:
+        return crud.bulk_create_suppliers(db, rows, result, upsert_on=upsert_on)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/suppliers/{supplier_id}", response_model=schemas.Supplier, tags=["Suppliers"])
-def read_supplier(supplier_id: int, db: Session = Depends(get_db)):
-    """Retrieve a single supplier by ID."""
-    db_supplier = crud.get_supplier(db, supplier_id=supplier_id)
+@app.get("/suppliers/", response_model=List[schemas.SupplierResponse], tags=["Suppliers"])
+async def read_suppliers(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    include_total: bool = False,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    filters: schemas.SupplierFilters = Depends(),
+    db=Depends(get_read_db),
+):
+    """
+    Retrieve all suppliers, paged by offset or by keyset `cursor`.
+    `fields` and `expand` narrow each row to the listed columns and relations;
+    the remaining parameters filter and search the rows.
+    """
+    rows = _list_rows(models.Supplier, fields, expand, sort)
+    return await cache.cached_json_async(
+        request, (cache.SUPPLIERS,),
+        lambda: _read_page(response, db, models.Supplier, (crud.get_suppliers, crud.get_suppliers_keyset),
+                           (async_crud.get_suppliers, async_crud.get_suppliers_keyset),
+                           skip, limit, cursor, sort, include_total, rows, crud.supplier_criteria(db, filters)),
+        rows.encode, response,
+    )
+
+@app.get("/suppliers/{supplier_id}", response_model=schemas.SupplierResponse, tags=["Suppliers"])
+async def read_supplier(supplier_id: int, response: Response, fields: Optional[str] = None, expand: Optional[str] = None, db=Depends(get_read_db)):
+    """Retrieve a single supplier by ID, optionally narrowed by `fields` / `expand`."""
+    projection, options = _projection(models.Supplier, fields, expand)
+    db_supplier = await _read(db, crud.get_supplier, async_crud.get_supplier, supplier_id=supplier_id, options=options)
     if db_supplier is None:
         raise HTTPException(status_code=404, detail="Supplier not found")
+    if projection is not None:
+        return _with_version_etag(_projected_response(db_supplier, projection), db_supplier)
+    _with_version_etag(response, db_supplier)
     return db_supplier
 
 @app.put("/suppliers/{supplier_id}", response_model=schemas.Supplier, tags=["Suppliers"])
-def update_supplier(supplier_id: int, supplier: schemas.SupplierCreate, db: Session = Depends(get_db)):
-    """Update an existing supplier."""
+def update_supplier(supplier_id: int, supplier: schemas.SupplierCreate, response: Response, if_match: Optional[str] = Header(None),
+                    db: Session = Depends(get_db)):
+    """
+    Update an existing supplier. With `If-Match` set to the ETag of a previous
+    read, the update only applies if nobody has changed it since (412 otherwise).
+    """
     try:
-        db_supplier = crud.update_supplier(db, supplier_id=supplier_id, supplier=supplier)
+        db_supplier = crud.update_supplier(db, supplier_id=supplier_id, supplier=supplier, expected_version=_expected_version(if_match))
         if db_supplier is None:
             raise HTTPException(status_code=404, detail="Supplier not found")
+        _with_version_etag(response, db_supplier)
         return db_supplier
+    except crud.VersionConflict as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -144,28 +447,72 @@ def create_shipment(shipment: schemas.ShipmentCreate, db: Session = Depends(get_
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/shipments/", response_model=List[schemas.Shipment], tags=["Shipments"])
-def read_shipments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Retrieve all shipments."""
-    shipments = crud.get_shipments(db, skip=skip, limit=limit)
-    return shipments
-
-@app.get("/shipments/{shipment_id}", response_model=schemas.Shipment, tags=["Shipments"])
-def read_shipment(shipment_id: int, db: Session = Depends(get_db)):
-    """Retrieve a single shipment by ID."""
-    db_shipment = crud.get_shipment(db, shipment_id=shipment_id)
+@app.post("/shipments/bulk", response_model=schemas.BulkResult, tags=["Shipments"])
+def bulk_create_shipments(parsed=Depends(_bulk_rows(schemas.ShipmentCreate)), db: Session = Depends(get_db)):
+    """Create many shipments from a JSON array or NDJSON body; failing rows are reported, not fatal."""
+    rows, result = parsed
+    return crud.bulk_create_shipments(db, rows, result)
+
+@app.get("/shipments/", response_model=List[schemas.ShipmentResponse], tags=["Shipments"])
+async def read_shipments(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    include_total: bool = False,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    filters: schemas.ShipmentFilters = Depends(),
+    db=Depends(get_read_db),
+):
+    """
+    Retrieve all shipments, paged by offset or by keyset `cursor`.
+    `fields` and `expand` narrow each row to the listed columns and relations;
+    the remaining parameters filter and search the rows. Archived shipments are
+    included with `include_archived`, or when `start_date` reaches back into the archive.
+    """
+    rows = _list_rows(models.Shipment, fields, expand, sort)
+
+    async def compute():
+        archive = None
+        if await _read(db, crud.archive_needed, async_crud.archive_needed,
+                       start_date=filters.start_date, status=filters.status, include_archived=filters.include_archived):
+            archive = crud.ArchivePart(models.ShipmentArchive, crud.shipment_criteria(db, filters, models.ShipmentArchive))
+        return await _read_page(response, db, models.Shipment, (crud.get_shipments, crud.get_shipments_keyset),
+                                (async_crud.get_shipments, async_crud.get_shipments_keyset),
+                                skip, limit, cursor, sort, include_total, rows, crud.shipment_criteria(db, filters), archive)
+
+    return await cache.cached_json_async(request, (cache.SHIPMENTS,), compute, rows.encode, response)
+
+@app.get("/shipments/{shipment_id}", response_model=schemas.ShipmentResponse, tags=["Shipments"])
+async def read_shipment(shipment_id: int, response: Response, fields: Optional[str] = None, expand: Optional[str] = None, db=Depends(get_read_db)):
+    """Retrieve a single shipment by ID, optionally narrowed by `fields` / `expand`."""
+    projection, options = _projection(models.Shipment, fields, expand)
+    db_shipment = await _read(db, crud.get_shipment, async_crud.get_shipment, shipment_id=shipment_id, options=options)
     if db_shipment is None:
         raise HTTPException(status_code=404, detail="Shipment not found")
+    if projection is not None:
+        return _with_version_etag(_projected_response(db_shipment, projection), db_shipment)
+    _with_version_etag(response, db_shipment)
     return db_shipment
 
 @app.put("/shipments/{shipment_id}", response_model=schemas.Shipment, tags=["Shipments"])
-def update_shipment(shipment_id: int, shipment: schemas.ShipmentCreate, db: Session = Depends(get_db)):
-    """Update an existing shipment."""
+def update_shipment(shipment_id: int, shipment: schemas.ShipmentCreate, response: Response, if_match: Optional[str] = Header(None),
+                    db: Session = Depends(get_db)):
+    """
+    Update an existing shipment. With `If-Match` set to the ETag of a previous
+    read, the update only applies if nobody has changed it since (412 otherwise).
+    """
     try:
-        db_shipment = crud.update_shipment(db, shipment_id=shipment_id, shipment=shipment)
+        db_shipment = crud.update_shipment(db, shipment_id=shipment_id, shipment=shipment, expected_version=_expected_version(if_match))
         if db_shipment is None:
             raise HTTPException(status_code=404, detail="Shipment not found")
+        _with_version_etag(response, db_shipment)
         return db_shipment
+    except crud.VersionConflict as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -178,53 +525,361 @@ def delete_shipment(shipment_id: int, db: Session = Depends(get_db)):
     return db_shipment
 
 
-# --- AI & Analytics Endpoints ---
+# --- Warehouse Endpoints ---
 
-@app.post("/predict_image/", tags=["AI Features"])
-async def predict_product_from_image(file: UploadFile = File(...)):
+_WAREHOUSE_STOCK_ROWS = projections.row_query(projections.full(models.WarehouseStock))
+_WAREHOUSE_SHIPMENT_ROWS = projections.row_query(projections.full(models.Shipment))
+
+@app.post("/warehouses/", response_model=schemas.Warehouse, tags=["Warehouses"])
+def create_warehouse(warehouse: schemas.WarehouseCreate, db: Session = Depends(get_db)):
+    """Create a new warehouse."""
+    try:
+        return crud.create_warehouse(db=db, warehouse=warehouse)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/warehouses/", response_model=List[schemas.Warehouse], tags=["Warehouses"])
+def read_warehouses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """Retrieve all warehouses."""
+    return crud.get_warehouses(db, skip=skip, limit=limit)
+
+@app.get("/warehouses/{warehouse_id}", response_model=schemas.Warehouse, tags=["Warehouses"])
+def read_warehouse(warehouse_id: int, db: Session = Depends(get_db)):
+    """Retrieve a single warehouse by ID."""
+    db_warehouse = crud.get_warehouse(db, warehouse_id=warehouse_id)
+    if db_warehouse is None:
+        raise HTTPException(status_code=404, detail="Warehouse not found")
+    return db_warehouse
+
+@app.put("/warehouses/{warehouse_id}", response_model=schemas.Warehouse, tags=["Warehouses"])
+def update_warehouse(warehouse_id: int, warehouse: schemas.WarehouseCreate, db: Session = Depends(get_db)):
+    """Update an existing warehouse."""
+    try:
+        db_warehouse = crud.update_warehouse(db, warehouse_id=warehouse_id, warehouse=warehouse)
+        if db_warehouse is None:
+            raise HTTPException(status_code=404, detail="Warehouse not found")
+        return db_warehouse
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/warehouses/{warehouse_id}/items", response_model=List[schemas.WarehouseStock], tags=["Warehouses"])
+def read_warehouse_items(
+    request: Request,
+    warehouse_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    max_quantity: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """Retrieve the stock held at one warehouse, with each item; `max_quantity` lists only rows at or below it."""
+    if crud.get_warehouse(db, warehouse_id=warehouse_id) is None:
+        raise HTTPException(status_code=404, detail="Warehouse not found")
+    return cache.cached_json(
+        request, (cache.WAREHOUSES, cache.ITEMS),
+        lambda: crud.get_warehouse_stock(db, warehouse_id, skip=skip, limit=limit, max_quantity=max_quantity,
+                                         rows=_WAREHOUSE_STOCK_ROWS),
+        _WAREHOUSE_STOCK_ROWS.encode,
+    )
+
+@app.get("/warehouses/{warehouse_id}/shipments", response_model=List[schemas.Shipment], tags=["Warehouses"])
+def read_warehouse_shipments(
+    request: Request,
+    warehouse_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Retrieve shipments leaving from or arriving at one warehouse, newest first."""
+    if crud.get_warehouse(db, warehouse_id=warehouse_id) is None:
+        raise HTTPException(status_code=404, detail="Warehouse not found")
+    return cache.cached_json(
+        request, (cache.WAREHOUSES, cache.SHIPMENTS),
+        lambda: crud.get_warehouse_shipments(db, warehouse_id, skip=skip, limit=limit, status=status,
+                                             rows=_WAREHOUSE_SHIPMENT_ROWS),
+        _WAREHOUSE_SHIPMENT_ROWS.encode,
+    )
+
+# --- Change Feed Endpoints ---
+
+def _event_types(types: Optional[str]) -> List[str]:
+    return [prefix.strip() for prefix in (types or "").split(",") if prefix.strip()]
+
+@app.get("/events", tags=["Events"])
+async def stream_events(request: Request, types: Optional[str] = None):
+    """
+    Server-Sent Events feed of committed changes, e.g. `item.quantity_changed`,
+    `item.low_stock`, `shipment.status_changed`. `types` is a comma-separated
+    list of type prefixes to receive. A `resync` event means the client fell
+    behind and should refetch.
     """
-    AI Feature: Accepts an image upload and returns a mock product prediction.
+    prefixes = _event_types(types)
+    queue = events.broadcaster.subscribe()
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), events.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if events.matches(message, prefixes):
+                    yield events.format_sse(message)
+        finally:
+            events.broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.websocket("/events/ws")
+async def websocket_events(websocket: WebSocket, types: Optional[str] = None):
+    """The /events feed over a WebSocket, one JSON message `{id, type, data}` per event."""
+    prefixes = _event_types(types)
+    await websocket.accept()
+    queue = events.broadcaster.subscribe()
+
+    async def forward():
+        while True:
+            message = await queue.get()
+            if events.matches(message, prefixes):
+                await websocket.send_text(json.dumps(message, default=str))
+
+    sender = asyncio.create_task(forward())
+    try:
+        # Incoming messages are ignored; receiving is how a disconnect is noticed.
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        events.broadcaster.unsubscribe(queue)
+
+# --- Export Endpoints ---
+
+@app.get("/export/items", tags=["Export"])
+def export_items(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    category: Optional[str] = None,
+    supplier_id: Optional[int] = None,
+    include_relations: bool = False,
+):
+    """Stream every matching inventory item as NDJSON or CSV without buffering the table in memory."""
+    rows = export.stream_export(
+        lambda db: crud.iter_items(db, category=category, supplier_id=supplier_id, include_relations=include_relations),
+        format,
+        models.InventoryItem,
+        relations=("supplier",) if include_relations else (),
+    )
+    return StreamingResponse(rows, media_type=export.EXPORT_MEDIA_TYPES[format],
+                             headers={"Content-Disposition": f"attachment; filename=items.{format}"})
+
+@app.get("/export/shipments", tags=["Export"])
+def export_shipments(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    include_relations: bool = False,
+    include_archived: bool = False,
+):
+    """
+    Stream every matching shipment as NDJSON or CSV without buffering the table in memory,
+    followed by archived ones with `include_archived` or when `start_date` reaches the archive.
+    """
+    rows = export.stream_export(
+        lambda db: crud.iter_shipments(db, start_date=start_date, end_date=end_date, status=status, include_relations=include_relations,
+                                       include_archived=include_archived),
+        format,
+        models.Shipment,
+        relations=("item",) if include_relations else (),
+    )
+    return StreamingResponse(rows, media_type=export.EXPORT_MEDIA_TYPES[format],
+                             headers={"Content-Disposition": f"attachment; filename=shipments.{format}"})
+
+# --- Job Endpoints ---
+
+def _accepted(response: Response, job: models.Job) -> models.Job:
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
+
+@app.post("/jobs/", response_model=schemas.Job, status_code=202, tags=["Jobs"])
+def submit_job(job: schemas.JobCreate, response: Response, db: Session = Depends(get_db)):
+    """Queue an export, rebuild or other background job; poll the returned job for progress."""
+    try:
+        return _accepted(response, jobs.submit(db, job.kind, job.params, max_attempts=job.max_attempts))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/jobs/import/{resource}", response_model=schemas.Job, status_code=202, tags=["Jobs"])
+async def submit_import_job(
+    resource: Literal["items", "suppliers", "shipments"],
+    request: Request,
+    response: Response,
+    upsert_on: Optional[Literal["name", "email"]] = None,
+    max_attempts: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
     """
-    if not file.content_type.startswith('image/'):
+    Queue an import of the request body: a JSON array, NDJSON (`application/x-ndjson`)
+    or CSV with a header row (`text/csv`). The job's result lists the rows that failed.
+    """
+    content_type = request.headers.get("content-type", "")
+    params = {"format": "csv" if "csv" in content_type else "ndjson" if "ndjson" in content_type else "json"}
+    if upsert_on is not None:
+        params["upsert_on"] = upsert_on
+    payload = await request.body()
+    try:
+        job = await run_in_threadpool(jobs.submit, db, f"import.{resource}", params, payload, max_attempts)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _accepted(response, job)
+
+@app.get("/jobs/", response_model=List[schemas.Job], tags=["Jobs"])
+def read_jobs(status: Optional[str] = None, kind: Optional[str] = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """List jobs, newest first."""
+    return jobs.get_jobs(db, status=status, kind=kind, skip=skip, limit=limit)
+
+@app.get("/jobs/{job_id}", response_model=schemas.Job, tags=["Jobs"])
+def read_job(job_id: int, db: Session = Depends(get_db)):
+    """A job's status, progress and last error."""
+    job = jobs.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/result", tags=["Jobs"])
+def read_job_result(job_id: int, db: Session = Depends(get_db)):
+    """Download a succeeded job's output; 409 until it has succeeded, 204 for jobs without output."""
+    job = jobs.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != jobs.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    headers = {}
+    if job.kind.startswith("export."):
+        headers["Content-Disposition"] = f"attachment; filename={job.kind.split('.', 1)[1]}-{job.id}.{job.params['format']}"
+    body = jobs.load_result(db, job_id)
+    if body is None and jobs.has_result_chunks(db, job_id):
+        # Exports are streamed back chunk by chunk rather than loaded whole.
+        return StreamingResponse(jobs.iter_result_chunks(job_id), media_type=job.result_media_type, headers=headers)
+    if body is None:
+        return Response(status_code=204)
+    return Response(body, media_type=job.result_media_type, headers=headers)
+
+# --- AI & Analytics Endpoints ---
+
+# `inference` is imported lazily in these endpoints so NumPy and Pillow are only loaded once an image is uploaded.
+
+def _check_upload(file: UploadFile):
+    from . import inference
+
+    if not (file.content_type or "").startswith('image/'):
         raise HTTPException(status_code=400, detail="File must be an image")
+    if file.size is not None and file.size > inference.MAX_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
 
-    mock_products = ["Laptop", "Keyboard", "Mouse", "Monitor", "Webcam"]
-    predicted_product = random.choice(mock_products)
-    estimated_quantity = random.randint(1, 50)
+async def _predict_upload(file: UploadFile) -> dict:
+    """Prediction for one upload; the spooled file is read in place rather than copied."""
+    from . import inference
 
     return {
         "filename": file.filename,
         "content_type": file.content_type,
-        "prediction": {
-            "product_name": predicted_product,
-            "estimated_quantity": estimated_quantity,
-        },
+        "prediction": await inference.predict(file.file),
     }
 
-@app.get("/analytics/low_stock_alerts/", response_model=List[schemas.InventoryItem], tags=["Analytics"])
-def get_low_stock_items(threshold: int = 10, db: Session = Depends(get_db)):
+@app.post("/predict_image/", tags=["AI Features"])
+async def predict_product_from_image(file: UploadFile = File(...)):
     """
-    Predictive Feature: Identifies items with stock levels below a given threshold.
+    AI Feature: Accepts an image upload and identifies the product in it.
     """
-    items = db.query(models.InventoryItem).filter(models.InventoryItem.quantity < threshold).all()
-    return items
+    from . import inference
+
+    _check_upload(file)
+    try:
+        return await _predict_upload(file)
+    except inference.ImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except inference.ModelUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.post("/predict_image/batch", tags=["AI Features"])
+async def predict_products_from_images(files: List[UploadFile] = File(...)):
+    """Identifies the products in many images; undecodable images are reported per file."""
+    from . import inference
+
+    if len(files) > inference.MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {inference.MAX_BATCH_FILES} images per request")
+
+    async def predict_one(file: UploadFile) -> dict:
+        try:
+            _check_upload(file)
+            return await _predict_upload(file)
+        except HTTPException as e:
+            return {"filename": file.filename, "content_type": file.content_type, "error": e.detail}
+        except inference.ImageError as e:
+            return {"filename": file.filename, "content_type": file.content_type, "error": str(e)}
+
+    try:
+        return await asyncio.gather(*(predict_one(file) for file in files))
+    except inference.ModelUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+_LOW_STOCK_ROWS = projections.row_query(projections.full(models.InventoryItem))
+_STOCK_ALERT_FIELDS = ("daily_demand", "reorder_point", "days_of_cover")
+
+def _encode_stock_alerts(rows) -> bytes:
+    """Encode alert rows: the item columns nested as in row mode, then its forecast columns."""
+    build, width = _LOW_STOCK_ROWS.build, len(_LOW_STOCK_ROWS.columns)
+    return projections.dumps([{**build(row), **dict(zip(_STOCK_ALERT_FIELDS, row[width:]))} for row in rows])
+
+@app.get("/analytics/low_stock_alerts/", response_model=List[schemas.StockAlert], tags=["Analytics"])
+async def get_low_stock_items(
+    request: Request,
+    days: int = crud.FORECAST_HORIZON_DAYS,
+    limit: int = 100,
+    threshold: Optional[int] = None,
+    db=Depends(get_read_db),
+):
+    """
+    Predictive Feature: Identifies items forecast to run out of stock within `days`,
+    fewest days of cover first, from demand rates precomputed by `app.forecasting`.
+    Items with no forecast yet or no demand alert below LOW_STOCK_THRESHOLD.
+    With `threshold`, or before any forecast exists, lists items below that quantity instead.
+    """
+    async def compute():
+        if threshold is None and await _read(db, crud.has_forecasts, async_crud.has_forecasts):
+            return await _read(db, crud.get_stockout_alerts, async_crud.get_stockout_alerts, days=days, limit=limit, rows=_LOW_STOCK_ROWS)
+        return await _read(db, crud.get_low_stock_items, async_crud.get_low_stock_items,
+                           threshold=events.LOW_STOCK_THRESHOLD if threshold is None else threshold, rows=_LOW_STOCK_ROWS)
+
+    return await cache.cached_json_async(request, (cache.ANALYTICS,), compute, _encode_stock_alerts)
 
 @app.get("/analytics/stock_by_category/", response_model=Dict[str, int], tags=["Analytics"])
-def get_stock_by_category(db: Session = Depends(get_db)):
+async def get_stock_by_category(request: Request, db=Depends(get_read_db)):
     """Provides data for the 'Stock Levels by Category' chart."""
-    items = crud.get_items(db, limit=1000)
-    category_stock = {}
-    for item in items:
-        category_stock[item.category] = category_stock.get(item.category, 0) + item.quantity
-    return category_stock
+    return await cache.cached_json_async(
+        request, (cache.ANALYTICS,),
+        lambda: _read(db, crud.get_stock_by_category, async_crud.get_stock_by_category),
+        _encode_totals,
+    )
 
 @app.get("/analytics/daily_shipments/", response_model=Dict[str, int], tags=["Analytics"])
-def get_daily_shipments(db: Session = Depends(get_db)):
-    """Provides data for the 'Daily Shipments Trend' chart."""
-    shipments = crud.get_shipments(db, limit=1000)
-    shipment_counts = {}
-    for shipment in shipments:
-        if shipment.estimated_delivery_date:
-            date_str = shipment.estimated_delivery_date.isoformat()
-            shipment_counts[date_str] = shipment_counts.get(date_str, 0) + shipment.quantity
-    return shipment_counts
\ No newline at end of file
+async def get_daily_shipments(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    db=Depends(get_read_db),
+):
+    """Provides data for the 'Daily Shipments Trend' chart, optionally filtered by date window and status."""
+    return await cache.cached_json_async(
+        request, (cache.ANALYTICS,),
+        lambda: _read(db, crud.get_daily_shipments, async_crud.get_daily_shipments,
+                      start_date=start_date, end_date=end_date, status=status),
+        _encode_totals,
+    )
@@ -1,7 +1,7 @@
 # backend/app/models.py
 
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import JSON, Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, LargeBinary, func
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
 
 class InventoryItem(Base):
@@ -13,13 +13,20 @@ class InventoryItem(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
-    quantity = Column(Integer, default=0)
+    quantity = Column(Integer, default=0, index=True)
     category = Column(String, index=True)
     price = Column(Float, default=0.0)
-    supplier_id = Column(Integer, ForeignKey("suppliers.id"))
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), index=True)
+    # Bumped by every write, stock movements included; PUT compares it with If-Match.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     supplier = relationship("Supplier")
 
+    __table_args__ = (
+        # Per-category stock totals and low-stock filters within a category
+        Index("ix_items_category_quantity", "category", "quantity"),
+    )
+
 class Shipment(Base):
     """
     SQLAlchemy model for a shipment.
@@ -28,15 +35,53 @@ class Shipment(Base):
     __tablename__ = "shipments"
 
     id = Column(Integer, primary_key=True, index=True)
-    item_id = Column(Integer, ForeignKey("items.id"))
+    item_id = Column(Integer, ForeignKey("items.id"), index=True)
     quantity = Column(Integer)
     origin = Column(String)
     destination = Column(String)
     status = Column(String, default="Pending") # e.g., Pending, In Transit, Delivered
-    estimated_delivery_date = Column(Date)
+    # The partition key on PostgreSQL, where the table is RANGE-partitioned by month.
+    estimated_delivery_date = Column(Date, index=True, nullable=False)
+    # Stock leaves the origin warehouse on dispatch; delivery to a destination warehouse makes it a transfer.
+    origin_warehouse_id = Column(Integer, ForeignKey("warehouses.id"), index=True)
+    destination_warehouse_id = Column(Integer, ForeignKey("warehouses.id"), index=True)
+    # Bumped by every update; PUT compares it with If-Match.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     item = relationship("InventoryItem")
 
+    __table_args__ = (
+        # Status filters combined with the delivery-date window on the daily trend
+        Index("ix_shipments_status_delivery_date", "status", "estimated_delivery_date"),
+    )
+
+class ShipmentArchive(Base):
+    """
+    A delivered shipment moved out of 'shipments' by `python -m app.archive`.
+    Represents the 'shipments_archive' table; rows keep their original ids.
+    """
+    __tablename__ = "shipments_archive"
+
+    # The delivery date is part of the key so PostgreSQL can RANGE-partition the table by it.
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    estimated_delivery_date = Column(Date, primary_key=True)
+    # Not a foreign key: archived history outlives the items it names.
+    item_id = Column(Integer, index=True)
+    quantity = Column(Integer)
+    origin = Column(String)
+    destination = Column(String)
+    status = Column(String)
+    origin_warehouse_id = Column(Integer)
+    destination_warehouse_id = Column(Integer)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    item = relationship("InventoryItem", primaryjoin="foreign(ShipmentArchive.item_id) == InventoryItem.id", viewonly=True)
+
+    __table_args__ = (
+        Index("ix_shipments_archive_estimated_delivery_date", "estimated_delivery_date"),
+    )
+
 class Supplier(Base):
     """
     SQLAlchemy model for a supplier.
@@ -48,4 +93,195 @@ class Supplier(Base):
     name = Column(String, index=True, unique=True, nullable=False)
     contact_person = Column(String)
     email = Column(String, unique=True, index=True)
-    phone = Column(String)
\ No newline at end of file
+    phone = Column(String)
+    # Bumped by every update; PUT compares it with If-Match.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+class Warehouse(Base):
+    """
+    SQLAlchemy model for a warehouse (stock location).
+    Represents the 'warehouses' table in the database.
+    """
+    __tablename__ = "warehouses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+    location = Column(String)
+
+# On PostgreSQL warehouse_stock is LIST-partitioned by warehouse: one partition per warehouse plus a default.
+STOCK_PARTITION_PREFIX = "warehouse_stock_"
+
+class WarehouseStock(Base):
+    """
+    On-hand quantity of an item at one warehouse.
+    Represents the 'warehouse_stock' table; an item's quantity is the sum of its rows.
+    """
+    __tablename__ = "warehouse_stock"
+
+    # Warehouse first, so one warehouse's stock is a contiguous key range (and a partition on PostgreSQL).
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"), primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id"), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+
+    item = relationship("InventoryItem")
+
+    __table_args__ = (
+        Index("ix_warehouse_stock_item_id", "item_id"),
+    )
+
+class CategoryStock(Base):
+    """
+    Incrementally maintained stock total per category.
+    Represents the 'category_stock' summary table, kept in step with 'items'.
+    """
+    __tablename__ = "category_stock"
+
+    category = Column(String, primary_key=True)
+    total_quantity = Column(Integer, nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
+
+class DailyShipmentTotal(Base):
+    """
+    Incrementally maintained shipped quantity per delivery date and status.
+    Represents the 'daily_shipment_totals' summary table, kept in step with 'shipments'.
+    """
+    __tablename__ = "daily_shipment_totals"
+
+    delivery_date = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    total_quantity = Column(Integer, nullable=False, default=0)
+    shipment_count = Column(Integer, nullable=False, default=0)
+
+class StockMovement(Base):
+    """
+    Append-only ledger entry changing an item's on-hand quantity.
+    Represents the 'stock_movements' table; items.quantity is the running total of these rows.
+    """
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"))
+    # Not a foreign key: ledger rows outlive the shipments that caused them.
+    shipment_id = Column(Integer, index=True)
+    quantity_delta = Column(Integer, nullable=False)
+    reason = Column(String, nullable=False)  # e.g., initial, adjustment, shipment, received
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # An item's history in ledger order, and movements after a snapshot
+        Index("ix_stock_movements_item_id_id", "item_id", "id"),
+    )
+
+class StockSnapshot(Base):
+    """
+    Point-in-time on-hand quantity of an item, covering ledger rows up to last_movement_id.
+    Represents the 'stock_snapshots' table written by `python -m app.ledger snapshot`.
+    """
+    __tablename__ = "stock_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    last_movement_id = Column(Integer, nullable=False, default=0)
+    taken_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_stock_snapshots_item_id_id", "item_id", "id"),
+    )
+
+class ItemForecast(Base):
+    """
+    Per-item demand rate and reorder point, fitted from shipment history.
+    Represents the 'item_forecasts' table written by `python -m app.forecasting refresh`.
+    """
+    __tablename__ = "item_forecasts"
+
+    item_id = Column(Integer, ForeignKey("items.id"), primary_key=True)
+    # Exponentially weighted mean and variance of units shipped per day
+    daily_demand = Column(Float, nullable=False, default=0)
+    demand_variance = Column(Float, nullable=False, default=0)
+    safety_stock = Column(Float, nullable=False, default=0)
+    reorder_point = Column(Float, nullable=False, default=0)
+    # The item's quantity over daily_demand (NULL without demand), kept current by every
+    # stock write so stockout alerts read it from an index instead of sorting every forecast.
+    days_of_cover = Column(Float)
+    # Last day of shipments folded into the averages; the next refresh continues from here.
+    computed_through = Column(Date, nullable=False)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_item_forecasts_days_of_cover", "days_of_cover", "item_id"),
+    )
+
+class IdempotencyKey(Base):
+    """
+    The stored outcome of a write sent with an Idempotency-Key header, replayed to retries.
+    Represents the 'idempotency_keys' table; rows expire after IDEMPOTENCY_TTL_SECONDS.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    # Hash of the method, path and body, so a key reused for a different request is rejected.
+    fingerprint = Column(String, nullable=False)
+    # NULL while the first request is still running.
+    status_code = Column(Integer)
+    headers = Column(String)
+    body = Column(LargeBinary)
+    created_at = Column(DateTime, nullable=False, index=True)
+
+class Job(Base):
+    """
+    A queued or finished unit of background work (import, export, rebuild).
+    Represents the 'jobs' table, claimed and run by `python -m app.jobs worker`.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # e.g., export.items, import.shipments, aggregates.rebuild
+    params = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    # Fraction done, when the job can tell; None while it cannot.
+    progress = Column(Float)
+    message = Column(String)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    error = Column(String)
+    # Where a retried job resumes, saved in the same transaction as the work it covers.
+    checkpoint = Column(JSON)
+    # Uploaded input and stored output; deferred so status polls do not load them.
+    payload = deferred(Column(LargeBinary))
+    result = deferred(Column(LargeBinary))
+    result_media_type = Column(String)
+    run_after = Column(DateTime, nullable=False)
+    worker = Column(String)
+    heartbeat_at = Column(DateTime)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # Claiming: the oldest runnable queued job; stale checks scan running ones.
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+class JobResultChunk(Base):
+    """
+    One piece of a job output too large to hold in memory, such as an export.
+    Represents the 'job_result_chunks' table; a job's pieces are read back in `seq` order.
+    """
+    __tablename__ = "job_result_chunks"
+
+    job_id = Column(Integer, ForeignKey("jobs.id"), primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+
+class CacheVersion(Base):
+    """
+    The current version of one response cache namespace, bumped by every write that affects it.
+    Represents the 'cache_versions' table, shared by every process using the database.
+    """
+    __tablename__ = "cache_versions"
+
+    namespace = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
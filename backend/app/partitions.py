@@ -0,0 +1,85 @@
+# backend/app/partitions.py
+import os
+import re
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import text
+
+from . import models
+
+# PostgreSQL declarative partitioning. warehouse_stock is LIST-partitioned by
+# warehouse so each site's stock lives in its own table (and can be moved to
+# its own tablespace, vacuumed or detached on its own). shipments and
+# shipments_archive are RANGE-partitioned by estimated_delivery_date, one
+# partition per month plus a default, so date-window queries only touch the
+# months they ask for. Other dialects keep plain tables, so every helper here
+# is a no-op for them.
+
+RANGE_PARTITIONED_TABLES = ("shipments", "shipments_archive")
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))
+
+_MONTHLY_PARTITION = re.compile(r"^(shipments|shipments_archive)_(\d{4}_\d{2}|default)$")
+
+def _is_postgres(bind) -> bool:
+    dialect = getattr(bind, "dialect", None) or bind.get_bind().dialect
+    return dialect.name == "postgresql"
+
+def stock_partition_name(warehouse_id: int) -> str:
+    return f"{models.STOCK_PARTITION_PREFIX}w{int(warehouse_id)}"
+
+def create_stock_partition(bind, warehouse_id: int):
+    """Give a new warehouse its own warehouse_stock partition; `bind` is a Connection or Session."""
+    if not _is_postgres(bind):
+        return
+    bind.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {stock_partition_name(warehouse_id)} "
+        f"PARTITION OF warehouse_stock FOR VALUES IN ({int(warehouse_id)})"
+    ))
+
+def is_partition_table(name: str) -> bool:
+    """Whether `name` is a partition these helpers manage (and so is not in the ORM metadata)."""
+    return name.startswith(models.STOCK_PARTITION_PREFIX) or _MONTHLY_PARTITION.match(name) is not None
+
+def _month(day: date) -> date:
+    return day.replace(day=1)
+
+def add_months(day: date, months: int) -> date:
+    """The first of the month `months` after (or before, if negative) `day`'s month."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def monthly_partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+def create_monthly_partition(bind, table: str, month: date):
+    """
+    Give `table` a partition for the month starting at `month`. Rows the default
+    partition already holds for that month are moved into it, since PostgreSQL
+    refuses to attach a range the default partition overlaps.
+    """
+    if not _is_postgres(bind):
+        return
+    name = monthly_partition_name(table, month)
+    if bind.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return
+    bounds = {"lower": month, "upper": add_months(month, 1)}
+    in_month = "estimated_delivery_date >= :lower AND estimated_delivery_date < :upper"
+    bind.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    bind.execute(text(f"INSERT INTO {name} SELECT * FROM {table}_default WHERE {in_month}"), bounds)
+    bind.execute(text(f"DELETE FROM {table}_default WHERE {in_month}"), bounds)
+    bind.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{bounds['lower']}') TO ('{bounds['upper']}')"))
+
+def ensure_monthly_partitions(bind, table: str, start: Optional[date], end: Optional[date]):
+    """Create `table`'s monthly partitions covering `start` through `end` (no-op when either is None)."""
+    if start is None or end is None or not _is_postgres(bind):
+        return
+    month = _month(start)
+    while month <= end:
+        create_monthly_partition(bind, table, month)
+        month = add_months(month, 1)
+
+def ensure_upcoming_partitions(bind, today: Optional[date] = None):
+    """Create the live shipments partitions from this month through PARTITION_MONTHS_AHEAD months ahead."""
+    today = today or date.today()
+    ensure_monthly_partitions(bind, "shipments", _month(today), add_months(today, PARTITION_MONTHS_AHEAD))
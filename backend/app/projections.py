@@ -0,0 +1,179 @@
+# backend/app/projections.py
+
+import json
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, load_only
+
+from . import models, schemas
+
+try:
+    # Optional: orjson encodes list pages several times faster than the stdlib.
+    import orjson
+except ImportError:
+    orjson = None
+
+# Relations that `expand=` may include, per model.
+RELATIONS = {
+    models.InventoryItem: {"supplier": models.Supplier},
+    models.Shipment: {"item": models.InventoryItem},
+    models.ShipmentArchive: {"item": models.InventoryItem},
+    models.Supplier: {},
+    models.WarehouseStock: {"item": models.InventoryItem},
+}
+
+# Response schema per model, and the relations its default (unnarrowed) response nests.
+RESPONSE_SHAPES = {
+    models.Supplier: (schemas.Supplier, ()),
+    models.InventoryItem: (schemas.InventoryItem, ("supplier",)),
+    models.Shipment: (schemas.Shipment, ("item",)),
+    models.ShipmentArchive: (schemas.Shipment, ("item",)),
+    models.WarehouseStock: (schemas.WarehouseStock, ("item",)),
+}
+
+class Projection(NamedTuple):
+    """The columns to load and return for a model, plus projections of expanded relations."""
+    model: type
+    columns: tuple
+    relations: Dict[str, "Projection"]
+
+def _split(value: Optional[str]) -> List[List[str]]:
+    return [part.strip().split(".") for part in (value or "").split(",") if part.strip()]
+
+def _build(model, field_paths: Optional[List[List[str]]], expand_paths: List[List[str]]) -> Projection:
+    available = RELATIONS.get(model, {})
+    column_keys = [column.key for column in model.__table__.columns]
+
+    relation_names = {path[0] for path in expand_paths}
+    relation_names |= {path[0] for path in field_paths or [] if len(path) > 1}
+    for name in relation_names:
+        if name not in available:
+            raise ValueError(f"Cannot expand '{name}' on {model.__tablename__}; expected one of: {', '.join(available) or 'none'}")
+
+    if field_paths is None:
+        columns = tuple(column_keys)
+    else:
+        requested = {path[0] for path in field_paths if len(path) == 1}
+        unknown = requested - set(column_keys)
+        if unknown:
+            raise ValueError(f"Unknown field(s) for {model.__tablename__}: {', '.join(sorted(unknown))}")
+        columns = tuple(key for key in column_keys if key in requested or key == "id")
+
+    relations = {}
+    for name in sorted(relation_names):
+        nested_fields = [path[1:] for path in field_paths or [] if len(path) > 1 and path[0] == name]
+        nested_expand = [path[1:] for path in expand_paths if len(path) > 1 and path[0] == name]
+        relations[name] = _build(available[name], nested_fields or None, nested_expand)
+    return Projection(model, columns, relations)
+
+def parse(model, fields: Optional[str], expand: Optional[str]) -> Optional[Projection]:
+    """
+    Build a projection from `fields=` (comma-separated columns, dotted for
+    nested ones such as `item.name`) and `expand=` (relations to include, such
+    as `item` or `item.supplier`). Returns None when neither is given, meaning
+    the full default response.
+    """
+    if fields is None and expand is None:
+        return None
+    return _build(model, _split(fields) if fields is not None else None, _split(expand))
+
+def full(model) -> Projection:
+    """The projection of the default response: every schema field, with the relations the schema nests."""
+    schema, relations = RESPONSE_SHAPES[model]
+    columns = tuple(key for key in schema.model_fields if key in model.__table__.columns)
+    return Projection(model, columns, {name: full(RELATIONS[model][name]) for name in relations})
+
+def query_options(projection: Projection, always_load: Iterable[str] = ()) -> list:
+    """Loader options that fetch only the projected columns and join only the expanded relations."""
+    model = projection.model
+    keys = set(projection.columns) | set(always_load)
+    options = [load_only(*[getattr(model, key) for key in keys if key in projection.columns or key in model.__table__.columns])]
+    for name, nested in projection.relations.items():
+        options.append(joinedload(getattr(model, name)).options(*query_options(nested)))
+    return options
+
+def to_dict(obj, projection: Projection) -> Dict:
+    """Serialize the projected columns and relations of an ORM object."""
+    row = {key: getattr(obj, key) for key in projection.columns}
+    for name, nested in projection.relations.items():
+        related = getattr(obj, name)
+        row[name] = None if related is None else to_dict(related, nested)
+    return row
+
+def dumps(value) -> bytes:
+    """Encode JSON with orjson when installed; dates become ISO strings either way."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=str).encode()
+
+# --- Row Mode ---
+
+class RowQuery(NamedTuple):
+    """
+    A projection flattened for row mode: list queries select `columns` through
+    outer `joins` as plain row tuples, and `build` nests each tuple into the
+    response dict, skipping ORM object and Pydantic model construction.
+    """
+    model: type
+    columns: list
+    joins: list
+    build: Callable
+
+    def select(self):
+        """The equivalent Core SELECT, for async sessions."""
+        statement = select(*self.columns).select_from(self.model)
+        for relation in self.joins:
+            statement = statement.outerjoin(relation)
+        return statement
+
+    def encode(self, rows) -> bytes:
+        build = self.build
+        return dumps([build(row) for row in rows])
+
+def row_query(projection: Projection, always_load: Iterable[str] = ()) -> RowQuery:
+    """
+    Flatten `projection` into labelled columns (nested ones as `item__supplier__name`)
+    plus a builder that nests rows back by position. `always_load` columns, such
+    as the keyset sort column, are selected under their own key but not returned.
+    """
+    model = projection.model
+    table_columns = model.__table__.columns
+    extra = [key for key in always_load if key in table_columns and key not in projection.columns]
+    columns = [getattr(model, key).label(key) for key in projection.columns + tuple(extra)]
+    joins = []
+
+    def plan(proj: Projection, positions: List[int], prefix: str):
+        keys = list(zip(proj.columns, positions))
+        nested = []
+        for name, sub in proj.relations.items():
+            joins.append(getattr(proj.model, name))
+            start = len(columns)
+            columns.extend(getattr(sub.model, key).label(f"{prefix}{name}__{key}") for key in sub.columns)
+            sub_positions = list(range(start, len(columns)))
+            # Every projection includes `id`, so a NULL id means the outer join found no related row.
+            nested.append((name, sub_positions[sub.columns.index("id")], plan(sub, sub_positions, f"{prefix}{name}__")))
+
+        def build(row):
+            obj = {key: row[position] for key, position in keys}
+            for name, id_position, build_nested in nested:
+                obj[name] = None if row[id_position] is None else build_nested(row)
+            return obj
+        return build
+
+    build = plan(projection, list(range(len(projection.columns))), "")
+    return RowQuery(model, columns, joins, build)
+
+def retarget(rows: RowQuery, model) -> RowQuery:
+    """
+    `rows` selecting from `model`, a table with the same columns (the shipment
+    archive), instead: the same labelled columns in the same order and the
+    same joins, so both can be combined with UNION ALL and share `build`.
+    """
+    source = rows.model.__table__
+    columns = [
+        getattr(model, column.element.key).label(column.name) if getattr(column.element, "table", None) is source else column
+        for column in rows.columns
+    ]
+    joins = [getattr(model, relation.key) if relation.class_ is rows.model else relation for relation in rows.joins]
+    return RowQuery(model, columns, joins, rows.build)
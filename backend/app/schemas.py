@@ -1,8 +1,8 @@
 # backend/app/schemas.py
 
 from pydantic import BaseModel
-from typing import Optional
-from datetime import date
+from typing import Any, Dict, List, Literal, Optional, Union
+from datetime import date, datetime
 
 # --- Supplier Schemas ---
 class SupplierBase(BaseModel):
@@ -16,6 +16,7 @@ class SupplierCreate(SupplierBase):
 
 class Supplier(SupplierBase):
     id: int
+    version: int = 1  # Send back as If-Match to update only this version
 
     class Config:
         from_attributes = True # <-- This was changed
@@ -33,11 +34,18 @@ class InventoryItemCreate(InventoryItemBase):
 
 class InventoryItem(InventoryItemBase):
     id: int
+    version: int = 1  # Send back as If-Match to update only this version
     supplier: Optional[Supplier] = None
 
     class Config:
         from_attributes = True # <-- This was changed
 
+class StockAlert(InventoryItem):
+    """An item in the low stock alerts, with its forecast demand (units per day) when one has been fitted."""
+    daily_demand: Optional[float] = None
+    reorder_point: Optional[float] = None
+    days_of_cover: Optional[float] = None
+
 # --- Shipment Schemas ---
 class ShipmentBase(BaseModel):
     item_id: int
@@ -46,13 +54,180 @@ class ShipmentBase(BaseModel):
     destination: str
     status: str
     estimated_delivery_date: date
+    origin_warehouse_id: Optional[int] = None  # Defaults to the default warehouse
+    destination_warehouse_id: Optional[int] = None  # Set for transfers between warehouses
 
 class ShipmentCreate(ShipmentBase):
     pass
 
 class Shipment(ShipmentBase):
     id: int
+    version: int = 1  # Send back as If-Match to update only this version
+    item: InventoryItem
+
+    class Config:
+        from_attributes = True # <-- This was changed
+
+# --- Warehouse Schemas ---
+class WarehouseBase(BaseModel):
+    name: str
+    location: Optional[str] = None
+
+class WarehouseCreate(WarehouseBase):
+    pass
+
+class Warehouse(WarehouseBase):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+class WarehouseStock(BaseModel):
+    warehouse_id: int
+    item_id: int
+    quantity: int  # On hand at this warehouse
     item: InventoryItem
 
     class Config:
-        from_attributes = True # <-- This was changed
\ No newline at end of file
+        from_attributes = True
+
+# --- Stock Ledger Schemas ---
+class StockMovementCreate(BaseModel):
+    quantity_delta: int  # Positive for receipts, negative for write-offs
+    reason: str = "adjustment"
+    warehouse_id: Optional[int] = None  # Defaults to the default warehouse
+
+class StockMovement(StockMovementCreate):
+    id: int
+    item_id: int
+    shipment_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# --- List Filter Schemas (query parameters) ---
+class SupplierFilters(BaseModel):
+    q: Optional[str] = None  # Search over name and email
+
+class InventoryItemFilters(BaseModel):
+    q: Optional[str] = None  # Search over item name and supplier name/email
+    category: Optional[str] = None
+    supplier_id: Optional[int] = None
+    min_quantity: Optional[int] = None
+    max_quantity: Optional[int] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+class ShipmentFilters(BaseModel):
+    q: Optional[str] = None  # Search over item name and supplier name/email
+    item_id: Optional[int] = None
+    status: Optional[str] = None
+    start_date: Optional[date] = None  # Estimated delivery window, inclusive
+    end_date: Optional[date] = None
+    origin: Optional[str] = None  # Case-insensitive substring match
+    destination: Optional[str] = None
+    include_archived: bool = False  # Also list archived shipments; a start_date before the archive horizon implies it
+
+# --- Projected Schemas (fields= / expand=) ---
+# Shapes returned when a client narrows a response; every field but `id` may be absent.
+class SupplierPartial(BaseModel):
+    id: int
+    name: Optional[str] = None
+    contact_person: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    version: Optional[int] = None
+
+class InventoryItemPartial(BaseModel):
+    id: int
+    name: Optional[str] = None
+    quantity: Optional[int] = None
+    category: Optional[str] = None
+    price: Optional[float] = None
+    supplier_id: Optional[int] = None
+    version: Optional[int] = None
+    supplier: Optional[SupplierPartial] = None
+
+class ShipmentPartial(BaseModel):
+    id: int
+    item_id: Optional[int] = None
+    quantity: Optional[int] = None
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    status: Optional[str] = None
+    estimated_delivery_date: Optional[date] = None
+    origin_warehouse_id: Optional[int] = None
+    destination_warehouse_id: Optional[int] = None
+    version: Optional[int] = None
+    item: Optional[InventoryItemPartial] = None
+
+SupplierResponse = Union[Supplier, SupplierPartial]
+InventoryItemResponse = Union[InventoryItem, InventoryItemPartial]
+ShipmentResponse = Union[Shipment, ShipmentPartial]
+
+# --- Bulk Operation Schemas ---
+class BulkRowError(BaseModel):
+    index: int
+    detail: str
+
+class BulkResult(BaseModel):
+    ids: List[Optional[int]]  # New id per input row, None where the row failed
+    succeeded: int = 0
+    errors: List[BulkRowError] = []
+
+# --- Job Schemas ---
+class JobCreate(BaseModel):
+    kind: str  # One of the kinds registered in app.jobs, e.g. export.items
+    params: Dict[str, Any] = {}
+    max_attempts: Optional[int] = None  # Defaults to JOBS_MAX_ATTEMPTS
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    params: Dict[str, Any]
+    status: str  # queued, running, succeeded or failed
+    progress: Optional[float] = None  # Fraction done, when known
+    message: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None  # Last failure; kept while a retry is queued
+    result_media_type: Optional[str] = None
+    run_after: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Parameters of each job kind, validated when the job is submitted.
+class JobParams(BaseModel):
+    class Config:
+        extra = "forbid"  # A misspelled parameter is an error, not silently ignored
+
+class ItemExportJobParams(JobParams):
+    format: Literal["ndjson", "csv"] = "ndjson"
+    category: Optional[str] = None
+    supplier_id: Optional[int] = None
+    include_relations: bool = False
+
+class ShipmentExportJobParams(JobParams):
+    format: Literal["ndjson", "csv"] = "ndjson"
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    status: Optional[str] = None
+    include_relations: bool = False
+    include_archived: bool = False
+
+class ImportJobParams(JobParams):
+    format: Literal["json", "ndjson", "csv"] = "json"
+
+class SupplierImportJobParams(ImportJobParams):
+    upsert_on: Optional[Literal["name", "email"]] = None  # Update existing suppliers matching on this column
+
+class ArchiveJobParams(JobParams):
+    older_than_days: Optional[int] = None  # Defaults to ARCHIVE_AFTER_DAYS
+
+class NoJobParams(JobParams):
+    pass
@@ -0,0 +1,111 @@
+# backend/app/search.py
+import re
+from sqlalchemy import Integer, column, or_, select, text
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Full-text lookup for `q=` on the list endpoints: FTS5 tables kept in sync by
+# triggers on SQLite, pg_trgm GIN indexes serving ILIKE on PostgreSQL.
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(name, content='items', content_rowid='id', prefix='2 3')",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF name ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name);
+    END""",
+    "INSERT INTO items_fts(items_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS suppliers_fts USING fts5(name, email, content='suppliers', content_rowid='id', prefix='2 3')",
+    """CREATE TRIGGER IF NOT EXISTS suppliers_fts_ai AFTER INSERT ON suppliers BEGIN
+        INSERT INTO suppliers_fts(rowid, name, email) VALUES (new.id, new.name, new.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS suppliers_fts_ad AFTER DELETE ON suppliers BEGIN
+        INSERT INTO suppliers_fts(suppliers_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS suppliers_fts_au AFTER UPDATE OF name, email ON suppliers BEGIN
+        INSERT INTO suppliers_fts(suppliers_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email);
+        INSERT INTO suppliers_fts(rowid, name, email) VALUES (new.id, new.name, new.email);
+    END""",
+    "INSERT INTO suppliers_fts(suppliers_fts) VALUES ('rebuild')",
+]
+
+_SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS items_fts_ai",
+    "DROP TRIGGER IF EXISTS items_fts_ad",
+    "DROP TRIGGER IF EXISTS items_fts_au",
+    "DROP TABLE IF EXISTS items_fts",
+    "DROP TRIGGER IF EXISTS suppliers_fts_ai",
+    "DROP TRIGGER IF EXISTS suppliers_fts_ad",
+    "DROP TRIGGER IF EXISTS suppliers_fts_au",
+    "DROP TABLE IF EXISTS suppliers_fts",
+]
+
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_items_name_trgm ON items USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_suppliers_name_trgm ON suppliers USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_suppliers_email_trgm ON suppliers USING gin (email gin_trgm_ops)",
+]
+
+_POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_suppliers_email_trgm",
+    "DROP INDEX IF EXISTS ix_suppliers_name_trgm",
+    "DROP INDEX IF EXISTS ix_items_name_trgm",
+]
+
+# Tables created here that are not part of the ORM metadata (FTS5 adds shadow tables too).
+SEARCH_TABLE_PREFIXES = ("items_fts", "suppliers_fts")
+
+def create_search_objects(connection):
+    """Create the dialect's search tables/indexes and index existing rows."""
+    statements = {"sqlite": _SQLITE_DDL, "postgresql": _POSTGRES_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.execute(text(statement))
+
+def drop_search_objects(connection):
+    statements = {"sqlite": _SQLITE_DROP, "postgresql": _POSTGRES_DROP}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.execute(text(statement))
+
+def _fts_query(q: str) -> str:
+    """Turn free text into an FTS5 prefix query: every word must match the start of a token."""
+    words = re.findall(r"\w+", q)
+    return " ".join(f'"{word}"*' for word in words)
+
+def like_pattern(q: str) -> str:
+    """A LIKE pattern matching `q` anywhere, with wildcards in `q` escaped by backslash."""
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def matching_supplier_ids(db: Session, q: str):
+    """Subquery of supplier ids whose name or email matches `q`."""
+    if db.get_bind().dialect.name == "sqlite":
+        return text("SELECT rowid FROM suppliers_fts WHERE suppliers_fts MATCH :supplier_q").bindparams(
+            supplier_q=_fts_query(q)
+        ).columns(column("rowid", Integer))
+    pattern = like_pattern(q)
+    return select(models.Supplier.id).where(
+        or_(models.Supplier.name.ilike(pattern, escape="\\"), models.Supplier.email.ilike(pattern, escape="\\"))
+    )
+
+def matching_item_ids(db: Session, q: str):
+    """Subquery of item ids whose name, or whose supplier's name or email, matches `q`."""
+    if db.get_bind().dialect.name == "sqlite":
+        by_name = text("SELECT rowid FROM items_fts WHERE items_fts MATCH :item_q").bindparams(
+            item_q=_fts_query(q)
+        ).columns(column("rowid", Integer))
+        by_name_ids = models.InventoryItem.id.in_(by_name)
+    else:
+        by_name_ids = models.InventoryItem.name.ilike(like_pattern(q), escape="\\")
+    by_supplier = models.InventoryItem.supplier_id.in_(matching_supplier_ids(db, q))
+    return select(models.InventoryItem.id).where(or_(by_name_ids, by_supplier))
+
+def has_terms(q: str) -> bool:
+    """Whether `q` contains anything searchable."""
+    return bool(re.search(r"\w", q))
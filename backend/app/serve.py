@@ -0,0 +1,112 @@
+# backend/app/serve.py
+"""
+Run the API with preforked workers.
+
+    python -m app.serve                           # WEB_CONCURRENCY workers on $PORT (default 8000)
+    python -m app.serve --workers 4 --migrate     # apply migrations once, then fork 4 workers
+    python -m app.serve --server uvicorn          # uvicorn's own process manager, without gunicorn
+
+With gunicorn installed (the default `--server auto` uses it when present),
+the app is imported once in the master process and the workers are forked
+from it, so each worker starts with FastAPI, SQLAlchemy and every route
+already loaded instead of importing them itself. The master opens no
+database connections; each worker fills its own pool and prewarms its
+endpoints in the lifespan (see app/startup.py). Without gunicorn, uvicorn
+spawns the workers and each one imports the app.
+
+Each worker has its own response cache and event broadcaster. Cache entries
+stay coherent across workers because namespace versions live in the database
+or Redis. Events only cross workers over the PostgreSQL bridge, so with more
+than one worker and no bridge, a warning is logged at startup.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+APP = "app.main:app"
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+PORT = int(os.getenv("PORT", 8000))
+# Seconds a gunicorn worker may take to start or to finish in-flight requests on shutdown.
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+
+def _uvicorn_worker_class() -> str:
+    # uvicorn.workers is deprecated in favour of the separate uvicorn-worker package.
+    if importlib.util.find_spec("uvicorn_worker") is not None:
+        return "uvicorn_worker.UvicornWorker"
+    return "uvicorn.workers.UvicornWorker"
+
+def serve_gunicorn(host: str, port: int, workers: int):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", _uvicorn_worker_class())
+            self.cfg.set("preload_app", True)
+            self.cfg.set("graceful_timeout", GRACEFUL_TIMEOUT)
+
+        def load(self):
+            from .main import app
+
+            return app
+
+    Application().run()
+
+def serve_uvicorn(host: str, port: int, workers: int):
+    import uvicorn
+
+    uvicorn.run(APP, host=host, port=port, workers=workers if workers > 1 else None)
+
+def check_workers(workers: int):
+    """Log how the per-worker cache and event broadcaster behave across `workers` processes."""
+    if workers <= 1:
+        return
+    # Imported lazily so a single worker does not load these settings in the launcher.
+    from . import cache, events
+
+    if cache.CACHE_BACKEND == "memory":
+        logger.info("Each of the %s workers caches responses in memory; writes invalidate all of them "
+                    "through the cache_versions table.", workers)
+    if events.BRIDGE == "none":
+        logger.warning("No events bridge (EVENTS_BRIDGE resolved to none): /events subscribers on each of the %s "
+                       "workers only see that worker's writes. Use PostgreSQL with asyncpg, or --workers 1, "
+                       "when the live pages must be complete.", workers)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the API with preforked workers.")
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--server", choices=["auto", "gunicorn", "uvicorn"], default="auto")
+    parser.add_argument("--migrate", action="store_true", help="Apply migrations once before starting the workers.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.migrate:
+        from . import startup
+        from .database import engine
+
+        startup.migrate()
+        # Close the connection migrating used so no socket is shared with forked workers.
+        engine.dispose()
+        # Already done here, so the workers (forked or spawned) do not each try again.
+        startup.MIGRATE_ON_STARTUP = False
+        os.environ["MIGRATE_ON_STARTUP"] = "false"
+
+    check_workers(args.workers)
+    server = args.server
+    if server == "auto":
+        server = "gunicorn" if importlib.util.find_spec("gunicorn") is not None else "uvicorn"
+    if server == "gunicorn":
+        serve_gunicorn(args.host, args.port, args.workers)
+    else:
+        serve_uvicorn(args.host, args.port, args.workers)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# backend/app/startup.py
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from starlette.concurrency import run_in_threadpool
+
+from . import engine_config
+from .database import SessionLocal, async_engine, engine, run_migrations
+
+# Process startup and shutdown, run from the app's lifespan. Schema changes are
+# opt-in: deploys apply migrations once (`alembic upgrade head` or
+# `python -m app.serve --migrate`) instead of every worker racing to run them
+# on each cold start. After startup the pool is filled and a few read
+# endpoints are requested in-process, so SQLAlchemy's compiled statement cache,
+# FastAPI's lazily built middleware stack and the response cache are warm
+# before real traffic arrives. /health/ready reports 503 until that finishes.
+
+logger = logging.getLogger(__name__)
+
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+STARTUP_PREWARM = os.getenv("STARTUP_PREWARM", "background")  # background | blocking | off
+# Connections opened at startup; the pool keeps up to DB_POOL_SIZE of them.
+PREWARM_CONNECTIONS = int(os.getenv("PREWARM_CONNECTIONS", min(engine_config.POOL_SIZE, 4)))
+# GET requests replayed in-process at startup, one per hot read path.
+PREWARM_PATHS = (
+    "/items/?limit=1",
+    "/suppliers/?limit=1",
+    "/shipments/?limit=1",
+    "/warehouses/?limit=1",
+    "/items/1",
+    "/shipments/1",
+    "/analytics/stock_by_category/",
+    "/analytics/daily_shipments/",
+    "/analytics/low_stock_alerts/",
+)
+
+_state: Dict = {"ready": False, "startup_ms": None, "prewarm_ms": None, "schema_revision": None, "error": None}
+_prewarm_task: Optional[asyncio.Task] = None
+
+def migrate():
+    """Upgrade the schema and backfill the analytics summary tables for databases that predate them."""
+    from . import aggregates
+
+    run_migrations()
+    with SessionLocal() as db:
+        aggregates.ensure_built(db)
+
+def schema_revision() -> Optional[str]:
+    """The Alembic revision the database is at, or None before the first migration."""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        return None
+
+def prewarm_pool(count: int = PREWARM_CONNECTIONS):
+    """Open `count` connections at once and return them to the pool."""
+    def connect(_):
+        connection = engine.connect()
+        connection.execute(text("SELECT 1"))
+        return connection
+
+    if count <= 0:
+        return
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        connections = list(executor.map(connect, range(count)))
+    for connection in connections:
+        connection.close()
+
+async def _prewarm_async_pool(count: int = PREWARM_CONNECTIONS):
+    connections = await asyncio.gather(*(async_engine.connect() for _ in range(max(count, 1))))
+    for connection in connections:
+        await connection.execute(text("SELECT 1"))
+        await connection.close()
+
+async def _get(app, path: str) -> int:
+    """Send one GET through the full ASGI stack in-process and return its status code."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+    }
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0] if status else 500
+
+async def prewarm(app):
+    """Fill the connection pool(s) and run the PREWARM_PATHS requests."""
+    started = time.perf_counter()
+    try:
+        await run_in_threadpool(prewarm_pool)
+        if async_engine is not None:
+            await _prewarm_async_pool()
+        for path in PREWARM_PATHS:
+            status = await _get(app, path)
+            if status >= 500:
+                logger.warning("Prewarm request %s returned %s", path, status)
+    except Exception:
+        logger.exception("Prewarm failed; serving cold")
+    _state["prewarm_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+async def start(app):
+    """Run from the lifespan: migrate if asked, check the schema, then prewarm per STARTUP_PREWARM."""
+    global _prewarm_task
+    started = time.perf_counter()
+    # Connections inherited from a preforking parent must not be shared; drop them without closing the parent's sockets.
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+    if MIGRATE_ON_STARTUP:
+        await run_in_threadpool(migrate)
+    _state["schema_revision"] = await run_in_threadpool(schema_revision)
+    if _state["schema_revision"] is None:
+        _state["error"] = "Database schema is missing; run `alembic upgrade head` or set MIGRATE_ON_STARTUP=true"
+        logger.error(_state["error"])
+
+    async def finish():
+        if STARTUP_PREWARM != "off" and _state["error"] is None:
+            await prewarm(app)
+        _state["ready"] = _state["error"] is None
+        _state["startup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    if STARTUP_PREWARM == "background":
+        _prewarm_task = asyncio.get_running_loop().create_task(finish())
+    else:
+        await finish()
+
+async def stop():
+    """Run from the lifespan on shutdown: stop any prewarm still running and close pooled connections."""
+    if _prewarm_task is not None and not _prewarm_task.done():
+        _prewarm_task.cancel()
+    _state["ready"] = False
+    engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+def readiness() -> Tuple[bool, Dict]:
+    """Whether this worker should receive traffic: startup finished and the database answers."""
+    status = {key: value for key, value in _state.items() if value is not None}
+    if not _state["ready"]:
+        status.setdefault("status", "unavailable" if _state["error"] else "starting")
+        return False, status
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except DBAPIError as e:
+        return False, {**status, "status": "unavailable", "error": str(e.orig)}
+    return True, {**status, "status": "ready"}
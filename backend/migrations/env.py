@@ -0,0 +1,43 @@
+# backend/migrations/env.py
+from alembic import context
+
+from app import models, partitions, search
+from app.database import engine
+
+config = context.config
+target_metadata = models.Base.metadata
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Keep autogenerate away from the search tables and table partitions, which live outside the ORM metadata."""
+    return not (type_ == "table" and (name.startswith(search.SEARCH_TABLE_PREFIXES) or partitions.is_partition_table(name)))
+
+def run_migrations_offline():
+    """Emit SQL to stdout instead of applying it (`alembic upgrade head --sql`)."""
+    context.configure(url=str(engine.url), target_metadata=target_metadata, literal_binds=True, include_object=include_object)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    """Apply migrations on the connection passed in by the app, or on the app's engine."""
+    connection = config.attributes.get("connection")
+    if connection is None:
+        with engine.connect() as connection:
+            _run(connection)
+    else:
+        _run(connection)
+
+def _run(connection):
+    # Batch mode lets ALTER-style operations work on SQLite by copying the table.
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,59 @@
+"""Initial schema, as originally created by create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "suppliers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("contact_person", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("phone", sa.String()),
+    )
+    op.create_index("ix_suppliers_id", "suppliers", ["id"])
+    op.create_index("ix_suppliers_name", "suppliers", ["name"], unique=True)
+    op.create_index("ix_suppliers_email", "suppliers", ["email"], unique=True)
+
+    op.create_table(
+        "items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer()),
+        sa.Column("category", sa.String()),
+        sa.Column("price", sa.Float()),
+        sa.Column("supplier_id", sa.Integer(), sa.ForeignKey("suppliers.id")),
+    )
+    op.create_index("ix_items_id", "items", ["id"])
+    op.create_index("ix_items_name", "items", ["name"])
+    op.create_index("ix_items_category", "items", ["category"])
+
+    op.create_table(
+        "shipments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("item_id", sa.Integer(), sa.ForeignKey("items.id")),
+        sa.Column("quantity", sa.Integer()),
+        sa.Column("origin", sa.String()),
+        sa.Column("destination", sa.String()),
+        sa.Column("status", sa.String()),
+        sa.Column("estimated_delivery_date", sa.Date()),
+    )
+    op.create_index("ix_shipments_id", "shipments", ["id"])
+
+
+def downgrade():
+    op.drop_table("shipments")
+    op.drop_table("items")
+    op.drop_table("suppliers")
@@ -0,0 +1,35 @@
+"""Add the incrementally maintained analytics summary tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "category_stock",
+        sa.Column("category", sa.String(), primary_key=True),
+        sa.Column("total_quantity", sa.Integer(), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "daily_shipment_totals",
+        sa.Column("delivery_date", sa.Date(), primary_key=True),
+        sa.Column("status", sa.String(), primary_key=True),
+        sa.Column("total_quantity", sa.Integer(), nullable=False),
+        sa.Column("shipment_count", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("daily_shipment_totals")
+    op.drop_table("category_stock")
@@ -0,0 +1,31 @@
+"""Add foreign-key and composite indexes used by joins, filters and analytics
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_items_supplier_id", "items", ["supplier_id"])
+    op.create_index("ix_items_quantity", "items", ["quantity"])
+    op.create_index("ix_items_category_quantity", "items", ["category", "quantity"])
+    op.create_index("ix_shipments_item_id", "shipments", ["item_id"])
+    op.create_index("ix_shipments_estimated_delivery_date", "shipments", ["estimated_delivery_date"])
+    op.create_index("ix_shipments_status_delivery_date", "shipments", ["status", "estimated_delivery_date"])
+
+
+def downgrade():
+    op.drop_index("ix_shipments_status_delivery_date", table_name="shipments")
+    op.drop_index("ix_shipments_estimated_delivery_date", table_name="shipments")
+    op.drop_index("ix_shipments_item_id", table_name="shipments")
+    op.drop_index("ix_items_category_quantity", table_name="items")
+    op.drop_index("ix_items_quantity", table_name="items")
+    op.drop_index("ix_items_supplier_id", table_name="items")
@@ -0,0 +1,23 @@
+"""Add full-text search: FTS5 tables on SQLite, pg_trgm indexes on PostgreSQL
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+from app import search
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    search.create_search_objects(op.get_bind())
+
+
+def downgrade():
+    search.drop_search_objects(op.get_bind())
@@ -0,0 +1,50 @@
+"""Add the stock movement ledger and snapshots, opening a balance for every existing item
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "stock_movements",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("item_id", sa.Integer(), sa.ForeignKey("items.id"), nullable=False),
+        sa.Column("shipment_id", sa.Integer(), nullable=True),
+        sa.Column("quantity_delta", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_stock_movements_shipment_id", "stock_movements", ["shipment_id"])
+    op.create_index("ix_stock_movements_item_id_id", "stock_movements", ["item_id", "id"])
+    op.create_table(
+        "stock_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("item_id", sa.Integer(), sa.ForeignKey("items.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("last_movement_id", sa.Integer(), nullable=False),
+        sa.Column("taken_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_stock_snapshots_item_id_id", "stock_snapshots", ["item_id", "id"])
+    # Existing quantities become the opening balance the ledger starts from.
+    op.execute(
+        "INSERT INTO stock_movements (item_id, quantity_delta, reason) "
+        "SELECT id, quantity, 'initial' FROM items WHERE quantity IS NOT NULL AND quantity <> 0"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_stock_snapshots_item_id_id", table_name="stock_snapshots")
+    op.drop_table("stock_snapshots")
+    op.drop_index("ix_stock_movements_item_id_id", table_name="stock_movements")
+    op.drop_index("ix_stock_movements_shipment_id", table_name="stock_movements")
+    op.drop_table("stock_movements")
@@ -0,0 +1,81 @@
+"""Add warehouses with per-warehouse stock, moving existing stock into a default warehouse
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app import partitions
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    op.create_table(
+        "warehouses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+        sa.Column("location", sa.String()),
+    )
+    op.create_index("ix_warehouses_id", "warehouses", ["id"])
+
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "CREATE TABLE warehouse_stock ("
+            "warehouse_id INTEGER NOT NULL REFERENCES warehouses (id), "
+            "item_id INTEGER NOT NULL REFERENCES items (id), "
+            "quantity INTEGER NOT NULL, "
+            "PRIMARY KEY (warehouse_id, item_id)"
+            ") PARTITION BY LIST (warehouse_id)"
+        )
+        op.execute("CREATE TABLE warehouse_stock_default PARTITION OF warehouse_stock DEFAULT")
+    else:
+        op.create_table(
+            "warehouse_stock",
+            sa.Column("warehouse_id", sa.Integer(), sa.ForeignKey("warehouses.id"), primary_key=True),
+            sa.Column("item_id", sa.Integer(), sa.ForeignKey("items.id"), primary_key=True),
+            sa.Column("quantity", sa.Integer(), nullable=False),
+        )
+    op.create_index("ix_warehouse_stock_item_id", "warehouse_stock", ["item_id"])
+
+    with op.batch_alter_table("shipments") as batch:
+        batch.add_column(sa.Column("origin_warehouse_id", sa.Integer()))
+        batch.add_column(sa.Column("destination_warehouse_id", sa.Integer()))
+        batch.create_foreign_key("fk_shipments_origin_warehouse_id", "warehouses", ["origin_warehouse_id"], ["id"])
+        batch.create_foreign_key("fk_shipments_destination_warehouse_id", "warehouses", ["destination_warehouse_id"], ["id"])
+        batch.create_index("ix_shipments_origin_warehouse_id", ["origin_warehouse_id"])
+        batch.create_index("ix_shipments_destination_warehouse_id", ["destination_warehouse_id"])
+    with op.batch_alter_table("stock_movements") as batch:
+        batch.add_column(sa.Column("warehouse_id", sa.Integer()))
+        batch.create_foreign_key("fk_stock_movements_warehouse_id", "warehouses", ["warehouse_id"], ["id"])
+
+    # Everything on hand so far sits in one default warehouse (id 1, the first row of the new table).
+    op.execute("INSERT INTO warehouses (name) VALUES ('Main')")
+    partitions.create_stock_partition(bind, 1)
+    op.execute("INSERT INTO warehouse_stock (warehouse_id, item_id, quantity) SELECT 1, id, quantity FROM items WHERE quantity IS NOT NULL")
+    op.execute("UPDATE stock_movements SET warehouse_id = 1")
+    op.execute("UPDATE shipments SET origin_warehouse_id = 1")
+
+
+def downgrade():
+    with op.batch_alter_table("stock_movements") as batch:
+        batch.drop_constraint("fk_stock_movements_warehouse_id", type_="foreignkey")
+        batch.drop_column("warehouse_id")
+    with op.batch_alter_table("shipments") as batch:
+        batch.drop_index("ix_shipments_destination_warehouse_id")
+        batch.drop_index("ix_shipments_origin_warehouse_id")
+        batch.drop_constraint("fk_shipments_destination_warehouse_id", type_="foreignkey")
+        batch.drop_constraint("fk_shipments_origin_warehouse_id", type_="foreignkey")
+        batch.drop_column("destination_warehouse_id")
+        batch.drop_column("origin_warehouse_id")
+    op.drop_index("ix_warehouse_stock_item_id", table_name="warehouse_stock")
+    op.drop_table("warehouse_stock")
+    op.drop_index("ix_warehouses_id", table_name="warehouses")
+    op.drop_table("warehouses")
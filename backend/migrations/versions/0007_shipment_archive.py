@@ -0,0 +1,133 @@
+"""Add the shipments archive and, on PostgreSQL, range-partition shipments by delivery month
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+from app import partitions
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Months of live partitions created up front; older rows land in the default partition until archived.
+MONTHS_BACK = 24
+
+SHIPMENT_COLUMNS = (
+    "id, item_id, quantity, origin, destination, status, estimated_delivery_date, origin_warehouse_id, destination_warehouse_id"
+)
+
+SHIPMENT_INDEXES = (
+    ("ix_shipments_id", ["id"]),
+    ("ix_shipments_item_id", ["item_id"]),
+    ("ix_shipments_estimated_delivery_date", ["estimated_delivery_date"]),
+    ("ix_shipments_status_delivery_date", ["status", "estimated_delivery_date"]),
+    ("ix_shipments_origin_warehouse_id", ["origin_warehouse_id"]),
+    ("ix_shipments_destination_warehouse_id", ["destination_warehouse_id"]),
+)
+
+
+def _shipments_ddl(sequence: str, partitioned: bool) -> str:
+    key = "PRIMARY KEY (id, estimated_delivery_date)" if partitioned else "PRIMARY KEY (id)"
+    return (
+        "CREATE TABLE shipments ("
+        f"id INTEGER NOT NULL DEFAULT nextval('{sequence}'::regclass), "
+        "item_id INTEGER, "
+        "quantity INTEGER, "
+        "origin VARCHAR, "
+        "destination VARCHAR, "
+        "status VARCHAR, "
+        "estimated_delivery_date DATE NOT NULL, "
+        "origin_warehouse_id INTEGER, "
+        "destination_warehouse_id INTEGER, "
+        f"{key}, "
+        "CONSTRAINT shipments_item_id_fkey FOREIGN KEY (item_id) REFERENCES items (id), "
+        "CONSTRAINT fk_shipments_origin_warehouse_id FOREIGN KEY (origin_warehouse_id) REFERENCES warehouses (id), "
+        "CONSTRAINT fk_shipments_destination_warehouse_id FOREIGN KEY (destination_warehouse_id) REFERENCES warehouses (id)"
+        ")" + (" PARTITION BY RANGE (estimated_delivery_date)" if partitioned else "")
+    )
+
+
+def _rebuild_shipments(bind, partitioned: bool):
+    """Recreate shipments (partitioned or plain), copying every row and keeping its id sequence."""
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('shipments', 'id')")).scalar()
+    op.execute("ALTER TABLE shipments RENAME TO shipments_rebuild")
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.execute(_shipments_ddl(sequence, partitioned))
+    if partitioned:
+        op.execute("CREATE TABLE shipments_default PARTITION OF shipments DEFAULT")
+        today = date.today()
+        first = bind.execute(sa.text("SELECT MIN(estimated_delivery_date) FROM shipments_rebuild")).scalar()
+        start = max(first or today, partitions.add_months(today, -MONTHS_BACK))
+        partitions.ensure_monthly_partitions(bind, "shipments", start, partitions.add_months(today, partitions.PARTITION_MONTHS_AHEAD))
+    op.execute(f"INSERT INTO shipments ({SHIPMENT_COLUMNS}) SELECT {SHIPMENT_COLUMNS} FROM shipments_rebuild")
+    op.execute("DROP TABLE shipments_rebuild")
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY shipments.id")
+    for name, columns in SHIPMENT_INDEXES:
+        op.create_index(name, "shipments", columns)
+
+
+def upgrade():
+    bind = op.get_bind()
+    missing = bind.execute(sa.text("SELECT COUNT(*) FROM shipments WHERE estimated_delivery_date IS NULL")).scalar()
+    if missing:
+        raise RuntimeError(f"{missing} shipment(s) have no estimated_delivery_date; set one before upgrading")
+
+    if bind.dialect.name == "postgresql":
+        _rebuild_shipments(bind, partitioned=True)
+        op.execute(
+            "CREATE TABLE shipments_archive ("
+            "id INTEGER NOT NULL, "
+            "estimated_delivery_date DATE NOT NULL, "
+            "item_id INTEGER, "
+            "quantity INTEGER, "
+            "origin VARCHAR, "
+            "destination VARCHAR, "
+            "status VARCHAR, "
+            "origin_warehouse_id INTEGER, "
+            "destination_warehouse_id INTEGER, "
+            "archived_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(), "
+            "PRIMARY KEY (id, estimated_delivery_date)"
+            ") PARTITION BY RANGE (estimated_delivery_date)"
+        )
+        op.execute("CREATE TABLE shipments_archive_default PARTITION OF shipments_archive DEFAULT")
+    else:
+        with op.batch_alter_table("shipments") as batch:
+            batch.alter_column("estimated_delivery_date", existing_type=sa.Date(), nullable=False)
+        op.create_table(
+            "shipments_archive",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("estimated_delivery_date", sa.Date(), primary_key=True),
+            sa.Column("item_id", sa.Integer()),
+            sa.Column("quantity", sa.Integer()),
+            sa.Column("origin", sa.String()),
+            sa.Column("destination", sa.String()),
+            sa.Column("status", sa.String()),
+            sa.Column("origin_warehouse_id", sa.Integer()),
+            sa.Column("destination_warehouse_id", sa.Integer()),
+            sa.Column("archived_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+    op.create_index("ix_shipments_archive_item_id", "shipments_archive", ["item_id"])
+    op.create_index("ix_shipments_archive_estimated_delivery_date", "shipments_archive", ["estimated_delivery_date"])
+
+
+def downgrade():
+    bind = op.get_bind()
+    # Archived rows go back to the live table so no shipment is lost.
+    op.execute(f"INSERT INTO shipments ({SHIPMENT_COLUMNS}) SELECT {SHIPMENT_COLUMNS} FROM shipments_archive")
+    op.drop_index("ix_shipments_archive_estimated_delivery_date", table_name="shipments_archive")
+    op.drop_index("ix_shipments_archive_item_id", table_name="shipments_archive")
+    op.drop_table("shipments_archive")
+    if bind.dialect.name == "postgresql":
+        _rebuild_shipments(bind, partitioned=False)
+        op.execute("ALTER TABLE shipments ALTER COLUMN estimated_delivery_date DROP NOT NULL")
+    else:
+        with op.batch_alter_table("shipments") as batch:
+            batch.alter_column("estimated_delivery_date", existing_type=sa.Date(), nullable=True)
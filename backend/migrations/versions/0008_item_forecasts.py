@@ -0,0 +1,31 @@
+"""Add per-item demand forecasts and reorder points
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "item_forecasts",
+        sa.Column("item_id", sa.Integer(), sa.ForeignKey("items.id"), primary_key=True),
+        sa.Column("daily_demand", sa.Float(), nullable=False),
+        sa.Column("demand_variance", sa.Float(), nullable=False),
+        sa.Column("safety_stock", sa.Float(), nullable=False),
+        sa.Column("reorder_point", sa.Float(), nullable=False),
+        sa.Column("computed_through", sa.Date(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("item_forecasts")
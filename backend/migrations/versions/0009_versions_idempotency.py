@@ -0,0 +1,40 @@
+"""Add row versions for conditional updates and the idempotency key store
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ("items", "suppliers", "shipments", "shipments_archive")
+
+
+def upgrade():
+    # Existing rows start at version 1. On PostgreSQL the column reaches every partition of a partitioned table.
+    for table in VERSIONED_TABLES:
+        op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("status_code", sa.Integer()),
+        sa.Column("headers", sa.String()),
+        sa.Column("body", sa.LargeBinary()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_idempotency_keys_created_at", "idempotency_keys", ["created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_idempotency_keys_created_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
+    # A plain DROP COLUMN (SQLite 3.35+) keeps the search triggers a batch table copy would lose.
+    for table in VERSIONED_TABLES:
+        op.drop_column(table, "version")
@@ -0,0 +1,30 @@
+"""Add shared response cache namespace versions
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# One row per namespace in app/cache.py; bumps only update existing rows.
+NAMESPACES = ("items", "suppliers", "shipments", "analytics", "warehouses")
+
+
+def upgrade():
+    table = op.create_table(
+        "cache_versions",
+        sa.Column("namespace", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.bulk_insert(table, [{"namespace": namespace, "version": 0} for namespace in NAMESPACES])
+
+
+def downgrade():
+    op.drop_table("cache_versions")
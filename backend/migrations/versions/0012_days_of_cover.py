@@ -0,0 +1,28 @@
+"""Store each forecast's days of cover for stockout alerts
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("item_forecasts", sa.Column("days_of_cover", sa.Float()))
+    op.execute(
+        "UPDATE item_forecasts SET days_of_cover = "
+        "(SELECT quantity FROM items WHERE items.id = item_forecasts.item_id) / NULLIF(daily_demand, 0)"
+    )
+    op.create_index("ix_item_forecasts_days_of_cover", "item_forecasts", ["days_of_cover", "item_id"])
+
+
+def downgrade():
+    op.drop_index("ix_item_forecasts_days_of_cover", table_name="item_forecasts")
+    op.drop_column("item_forecasts", "days_of_cover")
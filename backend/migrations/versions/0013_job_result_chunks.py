@@ -0,0 +1,27 @@
+"""Store large job outputs in chunks
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job_result_chunks",
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id"), primary_key=True),
+        sa.Column("seq", sa.Integer(), primary_key=True),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("job_result_chunks")
@@ -0,0 +1,59 @@
+# backend/tests/conftest.py
+import os
+import tempfile
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+# The app reads its settings at import time, so point it at a throwaway
+# database before anything from `app` is imported.
+_tmpdir = tempfile.mkdtemp(prefix="inventory-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'test.db')}"
+os.environ["MIGRATE_ON_STARTUP"] = "true"
+os.environ["STARTUP_PREWARM"] = "off"
+os.environ["CACHE_BACKEND"] = "none"
+os.environ.setdefault("ASYNC_DATABASE", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import main  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def make_item(client):
+    """Create an inventory item with a unique name and return its JSON."""
+    def make(quantity=10, **fields):
+        payload = {"name": f"item-{uuid.uuid4().hex[:8]}", "quantity": quantity, "category": "Tests", "price": 1.5}
+        payload.update(fields)
+        response = client.post("/items/", json=payload)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return make
+
+@pytest.fixture
+def shipment_payload():
+    """Build a shipment body; the default status dispatches stock from the item."""
+    def build(item_id, quantity, status="In Transit"):
+        return {
+            "item_id": item_id,
+            "quantity": quantity,
+            "origin": "Main",
+            "destination": "Customer",
+            "status": status,
+            "estimated_delivery_date": (date.today() + timedelta(days=3)).isoformat(),
+        }
+    return build
@@ -0,0 +1,70 @@
+# backend/tests/test_writes.py
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app import aggregates, ledger, models
+
+def test_stale_if_match_is_rejected(client, make_item):
+    item = make_item()
+    etag = client.get(f"/items/{item['id']}").headers["etag"]
+    update = {**{k: item[k] for k in ("name", "category", "price")}, "quantity": 12}
+
+    first = client.put(f"/items/{item['id']}", json=update, headers={"If-Match": etag})
+    assert first.status_code == 200, first.text
+    assert first.headers["etag"] != etag
+
+    stale = client.put(f"/items/{item['id']}", json={**update, "quantity": 3}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert client.get(f"/items/{item['id']}").json()["quantity"] == 12
+
+def test_idempotent_replay_returns_the_stored_response(client, db):
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+    payload = {"name": f"item-{uuid.uuid4().hex[:8]}", "quantity": 4, "category": "Tests", "price": 2.0}
+
+    first = client.post("/items/", json=payload, headers=key)
+    replay = client.post("/items/", json=payload, headers=key)
+    assert first.status_code == replay.status_code == 200
+    assert replay.json() == first.json()
+    assert replay.headers.get("idempotent-replayed") == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert db.query(models.InventoryItem).filter(models.InventoryItem.name == payload["name"]).count() == 1
+
+    changed = client.post("/items/", json={**payload, "quantity": 5}, headers=key)
+    assert changed.status_code == 422
+
+def test_concurrent_dispatches_never_oversell(client, make_item, shipment_payload, db):
+    stock = 10
+    item = make_item(quantity=stock)
+
+    def dispatch(_):
+        return client.post("/shipments/", json=shipment_payload(item["id"], 1)).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(dispatch, range(stock + 15)))
+
+    assert set(statuses) <= {200, 400}
+    assert statuses.count(200) == stock
+    assert client.get(f"/items/{item['id']}").json()["quantity"] == 0
+    assert ledger.verify(db) == []
+    assert ledger.verify_warehouses(db) == []
+
+def test_mixed_writes_leave_no_drift(client, make_item, shipment_payload, db):
+    supplier = client.post("/suppliers/", json={"name": f"supplier-{uuid.uuid4().hex[:8]}", "email": "ops@example.com"}).json()
+    kept = make_item(quantity=30, supplier_id=supplier["id"])
+    removed = make_item(quantity=5, category="Other")
+
+    etag = client.get(f"/items/{kept['id']}").headers["etag"]
+    update = {**{k: kept[k] for k in ("name", "price", "supplier_id")}, "quantity": 40, "category": "Moved"}
+    assert client.put(f"/items/{kept['id']}", json=update, headers={"If-Match": etag}).status_code == 200
+
+    shipped = client.post("/shipments/", json=shipment_payload(kept["id"], 6)).json()
+    pending = client.post("/shipments/", json=shipment_payload(kept["id"], 2, status="Pending")).json()
+    assert client.post("/shipments/", json=shipment_payload(kept["id"], 500)).status_code == 400
+    assert client.delete(f"/shipments/{pending['id']}").status_code == 200
+    assert client.post(f"/items/{kept['id']}/stock_movements", json={"quantity_delta": 7, "reason": "recount"}).status_code == 200
+    assert client.delete(f"/items/{removed['id']}").status_code == 200
+
+    assert client.get(f"/items/{kept['id']}").json()["quantity"] == 40 - shipped["quantity"] + 7
+    assert ledger.verify(db) == []
+    assert ledger.verify_warehouses(db) == []
+    assert aggregates.verify(db) == []
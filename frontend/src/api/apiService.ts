@@ -1,6 +1,6 @@
 // frontend/src/api/apiService.ts
 import axios from 'axios';
-import { IInventoryItem, IShipment, ISupplier, ITip } from '../types';
+import { IChangeEvent, IInventoryItem, IShipment, ISupplier, ITip } from '../types';
 
 // The base URL for your FastAPI backend
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000';
@@ -40,9 +40,16 @@ export const createSupplier = async (payload: Omit<ISupplier, 'id'>) => {
 
 /**
  * Fetches all shipments from the backend.
+ * Only the item's name is needed for the table, so the nested item is narrowed to it
+ * and the supplier join is skipped.
  */
 export const getShipments = async (): Promise<IShipment[]> => {
-  const response = await apiClient.get('/shipments/');
+  const response = await apiClient.get('/shipments/', {
+    params: {
+      expand: 'item',
+      fields: 'id,item_id,quantity,origin,destination,status,estimated_delivery_date,item.name',
+    },
+  });
   return response.data;
 };
 
@@ -74,6 +81,24 @@ export const getStockByCategory = () => apiClient.get('/analytics/stock_by_categ
 export const getDailyShipments = () => apiClient.get('/analytics/daily_shipments/');
 export const getLowStockAlerts = () => apiClient.get('/analytics/low_stock_alerts/');
 
+/**
+ * Subscribes to the server's change feed (Server-Sent Events).
+ * @param types Event type prefixes to receive, e.g. ['item.', 'shipment.status_changed'].
+ * @param onEvent Called for each event; a 'resync' event means the view should refetch.
+ * @returns A function that closes the subscription.
+ */
+export const subscribeToEvents = (types: string[], onEvent: (event: IChangeEvent) => void) => {
+  const source = new EventSource(`${API_BASE_URL}/events?types=${encodeURIComponent(types.join(','))}`);
+  const handler = (message: MessageEvent) => onEvent({ type: message.type, data: JSON.parse(message.data) });
+  const eventTypes = [
+    'item.created', 'item.updated', 'item.deleted', 'item.quantity_changed', 'item.low_stock', 'item.bulk_created',
+    'shipment.created', 'shipment.updated', 'shipment.deleted', 'shipment.status_changed', 'shipment.bulk_created',
+    'resync',
+  ];
+  eventTypes.forEach((type) => source.addEventListener(type, handler));
+  return () => source.close();
+};
+
 /**
  * Fetches static tips from the JSON server.
  */
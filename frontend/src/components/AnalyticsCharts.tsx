@@ -3,7 +3,7 @@ import React, { useEffect, useState } from 'react';
 import { Bar, Line } from 'react-chartjs-2';
 import { Chart as ChartJS, CategoryScale, LinearScale, BarElement, LineElement, PointElement, Title, Tooltip, Legend, ChartData } from 'chart.js';
 import { Typography, Box } from '@mui/material';
-import { getStockByCategory, getDailyShipments } from '../api/apiService';
+import { getStockByCategory, getDailyShipments, subscribeToEvents } from '../api/apiService';
 
 // Register Chart.js components
 ChartJS.register(CategoryScale, LinearScale, BarElement, LineElement, PointElement, Title, Tooltip, Legend);
@@ -17,9 +17,9 @@ const AnalyticsCharts: React.FC = () => {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    const fetchData = async () => {
+    const fetchData = async (showLoading = true) => {
       try {
-        setLoading(true);
+        if (showLoading) setLoading(true);
         const [stockRes, shipmentRes] = await Promise.all([
             getStockByCategory(),
             getDailyShipments()
@@ -57,6 +57,21 @@ const AnalyticsCharts: React.FC = () => {
     };
     
     fetchData();
+
+    // Refresh when stock or shipments change, at most once per second during bursts of writes.
+    let refreshTimer: ReturnType<typeof setTimeout> | undefined;
+    const unsubscribe = subscribeToEvents(['item.', 'shipment.'], () => {
+      if (refreshTimer === undefined) {
+        refreshTimer = setTimeout(() => {
+          refreshTimer = undefined;
+          fetchData(false);
+        }, 1000);
+      }
+    });
+    return () => {
+      unsubscribe();
+      clearTimeout(refreshTimer);
+    };
   }, []);
 
   return (
@@ -4,8 +4,9 @@ import { Button, Input, Box, Typography, Alert } from '@mui/material';
 import { uploadProductImage } from '../api/apiService';
 
 interface PredictionResult {
-    product_name: string;
-    estimated_quantity: number;
+    product_name: string | null;
+    confidence: number;
+    detail?: string;
 }
 
 /**
@@ -34,8 +35,8 @@ const ImageUploadAI: React.FC = () => {
       const response = await uploadProductImage(selectedFile);
       setPrediction(response.prediction);
       setError('');
-    } catch (err) {
-      setError('Upload failed. Please try again.');
+    } catch (err: any) {
+      setError(err.response?.data?.detail || 'Upload failed. Please try again.');
       console.error(err);
     }
   };
@@ -43,7 +44,7 @@ const ImageUploadAI: React.FC = () => {
   return (
     <Box>
       <Typography variant="body1" gutterBottom>
-        Upload an image of a product to identify it and estimate the quantity.
+        Upload an image of a product to identify it.
       </Typography>
       <Input
         type="file"
@@ -57,10 +58,16 @@ const ImageUploadAI: React.FC = () => {
       
       {error && <Alert severity="error" sx={{ mt: 2 }}>{error}</Alert>}
 
-      {prediction && (
+      {prediction && prediction.product_name === null && (
+        <Alert severity="info" sx={{ mt: 2 }}>
+          {prediction.detail || 'No product could be identified.'}
+        </Alert>
+      )}
+
+      {prediction && prediction.product_name !== null && (
         <Alert severity="success" sx={{ mt: 2 }}>
           <Typography><strong>Product Detected:</strong> {prediction.product_name}</Typography>
-          <Typography><strong>Estimated Quantity:</strong> {prediction.estimated_quantity}</Typography>
+          <Typography><strong>Confidence:</strong> {(prediction.confidence * 100).toFixed(1)}%</Typography>
         </Alert>
       )}
     </Box>
@@ -2,7 +2,7 @@
 import React, { useEffect, useState } from 'react';
 import { Box, Typography, Button, Paper, Alert, Snackbar } from '@mui/material';
 import { DataGrid, GridColDef, GridRenderCellParams } from '@mui/x-data-grid';
-import { createInventoryItem, getInventoryItems } from '../api/apiService';
+import { createInventoryItem, getInventoryItems, subscribeToEvents } from '../api/apiService';
 import { IInventoryItem } from '../types';
 import CreateDialog from '../components/CreateDialog';
 import InventoryForm, { InventoryFormValues } from '../components/InventoryForm';
@@ -36,6 +36,19 @@ const InventoryPage: React.FC = () => {
     fetchItems();
   }, []);
 
+  // Live updates: stock changes are applied in place, anything else refetches the list.
+  useEffect(() => {
+    return subscribeToEvents(['item.'], (event) => {
+      if (event.type === 'item.quantity_changed') {
+        setItems((current) => current.map((item) => (
+          item.id === event.data.id ? { ...item, quantity: event.data.quantity } : item
+        )));
+      } else if (event.type !== 'item.low_stock') {
+        fetchItems();
+      }
+    });
+  }, []);
+
   const handleOpen = () => setOpen(true);
   const handleClose = () => {
     setOpen(false);
@@ -1,9 +1,9 @@
 // frontend/src/pages/ShipmentsPage.tsx
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { Box, Typography, Button, Paper, Alert, Snackbar } from '@mui/material';
 // FIX: Import GridRenderCellParams for consistency
 import { DataGrid, GridColDef, GridRenderCellParams } from '@mui/x-data-grid';
-import { createShipment, getShipments } from '../api/apiService';
+import { createShipment, getShipments, subscribeToEvents } from '../api/apiService';
 import { IShipment } from '../types';
 import CreateDialog from '../components/CreateDialog';
 import ShipmentForm, { ShipmentFormValues } from '../components/ShipmentForm';
@@ -37,6 +37,28 @@ const ShipmentsPage: React.FC = () => {
     fetchItems();
   }, []);
 
+  // Live updates: edits that keep the same item are merged in place, anything else refetches the list.
+  const itemsRef = useRef<IShipment[]>([]);
+  itemsRef.current = items;
+
+  useEffect(() => {
+    return subscribeToEvents(['shipment.'], (event) => {
+      if (event.type === 'shipment.status_changed') {
+        return; // Also delivered as shipment.updated
+      }
+      if (event.type === 'shipment.updated') {
+        const existing = itemsRef.current.find((shipment) => shipment.id === event.data.id);
+        if (existing && existing.item_id === event.data.item_id) {
+          setItems((current) => current.map((shipment) => (
+            shipment.id === event.data.id ? { ...shipment, ...event.data } : shipment
+          )));
+          return;
+        }
+      }
+      fetchItems();
+    });
+  }, []);
+
   const handleOpen = () => setOpen(true);
   const handleClose = () => {
     setOpen(false);
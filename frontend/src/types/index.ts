@@ -32,6 +32,12 @@ export interface IShipment {
   estimated_delivery_date: string; // Comes as string from API
 }
 
+// A change pushed by the backend's /events feed
+export interface IChangeEvent {
+  type: string; // e.g. item.quantity_changed, shipment.status_changed, resync
+  data: Record<string, any>;
+}
+
 // Represents a mock tip/alert from JSON Server
 export interface ITip {
   id: number;